@@ -0,0 +1,31 @@
+"""Benchmark the single-pass ageing report on 10k parties.
+
+Run with ``python -m benchmarks.bench_ageing [parties]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.reports.ageing import compute_ageing
+
+
+def main(parties: int = 10_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed(f"seed {parties} parties"):
+            db = seed_database(
+                Path(tmp) / "bench.sqlite",
+                lines=parties * 50,
+                buyers=parties,
+                payments=parties * 10,
+            )
+        with timed("compute_ageing"):
+            rows = compute_ageing(db, as_of="2025-01-01")
+        print(f"{len(rows)} parties with open balances")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
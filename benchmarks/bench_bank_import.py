@@ -0,0 +1,53 @@
+"""Benchmark matching and posting a 10k-line bank statement.
+
+Run with ``python -m benchmarks.bench_bank_import [lines]``.
+"""
+from __future__ import annotations
+
+import csv
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.models.bank_import import post_accepted, propose_matches, read_statement
+
+
+def main(lines: int = 10_000) -> None:
+    rng = random.Random(5)
+    buyers = 5_000
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed("seed database"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=50_000, buyers=buyers, growers=200)
+            db.rebuild_allocations()
+        bills = db.conn.execute("SELECT inv_id, customer_id, balance_due FROM OpenInvoices").fetchall()
+        statement = Path(tmp) / "statement.csv"
+        with statement.open("w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["Date", "Narration", "Reference", "Amount"])
+            for n in range(lines):
+                inv_id, cid, due = rng.choice(bills)
+                kind = n % 3
+                if kind == 0:
+                    narration = f"NEFT PAYMENT INV {inv_id}"
+                elif kind == 1:
+                    narration = f"IMPS FROM BUYER {cid - 1}"
+                else:
+                    narration = f"UPI/{rng.randint(10**9, 10**10)}"
+                writer.writerow(["2025-01-15", narration, f"UTR{n}", f"{due:.2f}"])
+        with timed(f"read {lines} lines"):
+            parsed = read_statement(statement)
+        with timed(f"match against {buyers} buyers"):
+            proposals = propose_matches(db, parsed)
+        accepted = sum(1 for p in proposals if p["accepted"])
+        with timed(f"post {accepted} payments"):
+            post_accepted(db, proposals)
+        with timed("re-match (all duplicates)"):
+            again = propose_matches(db, parsed)
+        print(f"{sum(p['duplicate'] for p in again)} duplicates detected")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
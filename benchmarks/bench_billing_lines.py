@@ -0,0 +1,63 @@
+"""Benchmark building and editing a large bill in the billing panel.
+
+Run with ``python -m benchmarks.bench_billing_lines [lines] [parties]``.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets  # noqa: E402
+
+from benchmarks.common import seed_database, timed  # noqa: E402
+from ggs_accounting.ui.invoice_panel import InvoicePanel  # noqa: E402
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(lines: int = 50, parties: int = 5_000) -> None:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=0, buyers=parties, growers=parties // 10, items=2_000)
+        db.conn.execute(
+            "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty)"
+            " SELECT ?, item_id, 10, 100 FROM Items",
+            (parties + 1,),
+        )
+        db.conn.commit()
+        panel = InvoicePanel(db)
+        panel.resize(1200, 800)
+        panel.show()
+        app.processEvents()
+        start = rss_mb()
+        with timed(f"add {lines} lines with {parties} parties"):
+            for _ in range(lines):
+                panel._add_line()
+            app.processEvents()
+        with timed("reload the directories (tab shown again)"):
+            panel._load_customers()
+            panel._load_items()
+            app.processEvents()
+        db.conn.execute("INSERT INTO Customers (name, customer_type) VALUES ('New Buyer', 'Buyer')")
+        db.conn.commit()
+        with timed("reload after adding one party"):
+            panel._load_customers()
+            app.processEvents()
+        with timed(f"200 price edits on a {lines}-line bill"):
+            for n in range(200):
+                panel.table.cellWidget(n % lines, 5).setValue(10.0 + n)
+            app.processEvents()
+        print(f"peak RSS growth: {rss_mb() - start:.0f} MB")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,30 @@
+"""Benchmark rendering detailed receipts serially and with the process pool.
+
+Run with ``python -m benchmarks.bench_detailed_receipts [invoices]``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.print_receipts import render_detailed
+
+
+def main(invoices: int = 2_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=invoices * 10)
+        ids = [r[0] for r in db.conn.execute("SELECT inv_id FROM Invoices ORDER BY inv_id")]
+        with timed(f"{len(ids)} invoices, one process"):
+            render_detailed(db, ids, os.path.join(tmp, "serial.zip"), as_zip=True, workers=1)
+        with timed(f"{len(ids)} invoices, {os.cpu_count()} processes"):
+            render_detailed(db, ids, os.path.join(tmp, "pool.zip"), as_zip=True)
+        with timed(f"{len(ids)} invoices, single PDF"):
+            render_detailed(db, ids, os.path.join(tmp, "all.pdf"))
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,40 @@
+"""Benchmark streaming a 1M-row query to CSV and Excel.
+
+Run with ``python -m benchmarks.bench_export [rows]``. The process's peak
+resident size is printed after each export; it stays flat as rows grow.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import resource
+from pathlib import Path
+
+from benchmarks.common import timed
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.utils import export_rows
+
+QUERY = """
+    SELECT n AS line, 'Item ' || (n % 300) AS item, n % 50 AS qty,
+           ROUND((n % 997) * 1.25, 2) AS price, date('2024-01-01', '+' || (n % 365) || ' days') AS day
+    FROM (WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows})
+          SELECT n FROM seq)
+"""
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / "bench.sqlite")
+        db.init_db()
+        for suffix in ("csv", "xlsx"):
+            target = Path(tmp) / f"export.{suffix}"
+            with timed(f"export {rows} rows to {suffix}"):
+                cols, cursor = db.stream_raw_query(QUERY.format(rows=rows))
+                export_rows(str(target), cursor, cols)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"  {target.stat().st_size / 1e6:.1f} MB written, peak RSS {peak:.0f} MB")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,72 @@
+"""Benchmark typing a search into the inventory table.
+
+Compares the indexed model against a sort/filter proxy re-filtering on
+every keystroke. Run with ``python -m benchmarks.bench_inventory_search [rows]``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets  # noqa: E402
+from PyQt6.QtCore import Qt  # noqa: E402
+
+from benchmarks.common import seed_database, timed  # noqa: E402
+from ggs_accounting.ui.inventory_panel import INVENTORY_COLUMNS, InventoryPanel  # noqa: E402
+from ggs_accounting.ui.table_model import RowsModel, filter_proxy, table_view  # noqa: E402
+
+KEYSTROKES = ["i", "it", "ite", "item", "item ", "item 1", "item 12", "item 123", "item 12", "item 1"]
+
+
+def main(rows: int = 100_000) -> None:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        growers = 200
+        items = max(rows // growers, 1)
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=0, growers=growers, items=items)
+        first_grower = db.conn.execute(
+            "SELECT MIN(customer_id) FROM Customers WHERE customer_type='Grower'"
+        ).fetchone()[0]
+        db.conn.executemany(
+            "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty) VALUES (?, ?, ?, 10)",
+            [(first_grower + g, i, 10.0 + i / 1000) for i in range(1, items + 1) for g in range(growers)],
+        )
+        db.conn.commit()
+
+        with timed(f"{rows} rows, open panel"):
+            panel = InventoryPanel(db)
+            panel.resize(900, 700)
+            panel.show()
+            app.processEvents()
+        with timed(f"indexed model, {len(KEYSTROKES)} keystrokes"):
+            for text in KEYSTROKES:
+                panel.search_edit.setText(text)
+                panel._apply_filter()
+                panel.table.viewport().repaint()
+        print(f"  {panel.model.rowCount()} rows shown")
+        with timed("indexed model, sort by price"):
+            panel.table.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+            panel.table.viewport().repaint()
+
+        # The proxy filter used before
+        model = RowsModel(INVENTORY_COLUMNS, panel.model._all)
+        proxy = filter_proxy(model)
+        proxy.setFilterKeyColumn(0)
+        view = table_view(proxy)
+        view.resize(900, 700)
+        view.show()
+        app.processEvents()
+        with timed(f"proxy filter, {len(KEYSTROKES)} keystrokes"):
+            for text in KEYSTROKES:
+                proxy.setFilterFixedString(text)
+                view.viewport().repaint()
+        print(f"  {proxy.rowCount()} rows shown")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,82 @@
+"""Benchmark the staged legacy importer on a synthetic Access export.
+
+Run with ``python -m benchmarks.bench_legacy_import [lines]``.
+"""
+from __future__ import annotations
+
+import csv
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.common import timed
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.db.legacy_import import LegacyImporter
+
+
+def write_exports(folder: Path, lines: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    buyers, growers, items, per_invoice = 2_000, 500, 1_000, 10
+    invoices = lines // per_invoice
+    start = date(2015, 1, 1)
+
+    def write(name: str, header: list, rows) -> None:
+        with (folder / f"{name}.csv").open("w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    write(
+        "Customers",
+        ["CustomerID", "Name", "CustomerType"],
+        [(i, f"Buyer {i}", "Buyer") for i in range(1, buyers + 1)]
+        + [(i, f"Grower {i}", "Grower") for i in range(buyers + 1, buyers + growers + 1)],
+    )
+    write("Items", ["ItemID", "Name", "ItemCode"], [(i, f"Item {i}", f"I{i:05d}") for i in range(1, items + 1)])
+    write(
+        "Inventory",
+        ["CustomerID", "ItemID", "PriceExclTax", "StockQty"],
+        [(buyers + 1 + i % growers, i, 10, 100) for i in range(1, items + 1)],
+    )
+    write(
+        "Invoices",
+        ["InvID", "Date", "Type", "CustomerID", "TotalAmount", "IsCredit"],
+        (
+            (n, (start + timedelta(days=n % 3000)).strftime("%m/%d/%Y 0:00:00"), "S",
+             rng.randint(1, buyers), 1000, "True")
+            for n in range(1, invoices + 1)
+        ),
+    )
+    write(
+        "InvoiceItems",
+        ["InvID", "ItemID", "SourceID", "Quantity", "UnitPrice"],
+        (
+            (n // per_invoice + 1, rng.randint(1, items), rng.randint(buyers + 1, buyers + growers),
+             rng.randint(1, 20), 10)
+            for n in range(lines)
+        ),
+    )
+    write(
+        "Payments",
+        ["CustomerID", "Date", "Amount"],
+        ((rng.randint(1, buyers), "2020-01-01", 500) for _ in range(invoices // 2)),
+    )
+
+
+def main(lines: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "exports"
+        folder.mkdir()
+        with timed(f"write export of {lines} lines"):
+            write_exports(folder, lines)
+        db = DatabaseManager(Path(tmp) / "bench.sqlite")
+        db.init_db()
+        with timed("import"):
+            LegacyImporter(db, folder).run()
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
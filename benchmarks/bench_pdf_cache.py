@@ -0,0 +1,33 @@
+"""Benchmark reprinting detailed receipts with a cold and a warm PDF cache.
+
+Run with ``python -m benchmarks.bench_pdf_cache [invoices]``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.pdf_cache import PdfCache
+from ggs_accounting.printing.print_receipts import render_detailed
+
+
+def main(invoices: int = 1_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=invoices * 10)
+        ids = [r[0] for r in db.conn.execute("SELECT inv_id FROM Invoices ORDER BY inv_id")]
+        with timed(f"{len(ids)} invoices, no cache"):
+            render_detailed(db, ids, os.path.join(tmp, "plain.zip"), as_zip=True)
+        cache = PdfCache(Path(tmp) / "cache")
+        with timed(f"{len(ids)} invoices, cold cache"):
+            render_detailed(db, ids, os.path.join(tmp, "cold.zip"), as_zip=True, cache=cache)
+        with timed(f"{len(ids)} invoices, warm cache"):
+            render_detailed(db, ids, os.path.join(tmp, "warm.zip"), as_zip=True, cache=cache)
+        print(f"cache holds {cache.size() / 1e6:.1f} MB")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
@@ -0,0 +1,43 @@
+"""Benchmark previewing and applying a bulk price revision.
+
+Run with ``python -m benchmarks.bench_price_revision [rows]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.models.pricing import apply_price_revision, preview_price_revision
+
+
+def main(rows: int = 50_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        growers = 200
+        items = max(rows // (growers * 2), 1)
+        with timed(f"seed {rows} inventory rows"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=0, growers=growers, items=items)
+            first_grower = db.conn.execute(
+                "SELECT MIN(customer_id) FROM Customers WHERE customer_type='Grower'"
+            ).fetchone()[0]
+            db.conn.executemany(
+                "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty) VALUES (?, ?, ?, 10)",
+                [
+                    (first_grower + g, i, 10.0 + lot + i / 1000)
+                    for i in range(1, items + 1)
+                    for g in range(growers)
+                    for lot in range(2)
+                ],
+            )
+            db.conn.commit()
+        with timed("preview +7.5%"):
+            changes = preview_price_revision(db, percent=7.5)
+        with timed(f"apply {len(changes)} changes"):
+            updated = apply_price_revision(db, changes)
+        print(f"{updated} rows updated")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,35 @@
+"""Benchmark the vectorised report engine at one million invoice lines.
+
+Run with ``python -m benchmarks.bench_report_engine [lines]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.reports import engine
+
+
+def main(lines: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed(f"seed {lines} lines"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=lines)
+        with timed("load_invoice_lines"):
+            df = engine.load_invoice_lines(db)
+        print(f"frame memory: {df.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+        with timed("sales_register"):
+            engine.sales_register(df)
+        for period in engine.PERIODS:
+            with timed(f"register_by_period[{period}]"):
+                engine.register_by_period(df, "Sale", period)
+            with timed(f"item_pivot[{period}]"):
+                engine.item_pivot(df, period=period)
+            with timed(f"party_pivot[{period}]"):
+                engine.party_pivot(df, period=period)
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
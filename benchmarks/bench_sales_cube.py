@@ -0,0 +1,39 @@
+"""Benchmark group-by and drill-down on the in-memory sales cube.
+
+Run with ``python -m benchmarks.bench_sales_cube [lines]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.reports.cube import DIMENSIONS, SalesCube
+
+
+def main(lines: int = 3_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed(f"seed {lines} lines"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=lines)
+        with timed("load cube"):
+            cube = SalesCube.from_db(db)
+        window = {"start": "2024-03-01", "end": "2024-05-31"}
+        for dim in DIMENSIONS:
+            with timed(f"group_by[{dim}]"):
+                cube.group_by(dim)
+            with timed(f"group_by[{dim}] filtered"):
+                cube.group_by(dim, window)
+        top_item = max(cube.group_by("item"), key=lambda g: g["amount"])["key"]
+        with timed("drill_down month>item>grower"):
+            cube.drill_down([("month", "2024-04"), ("item", top_item)], "grower")
+        lines = [{"item_id": 1, "customer_id": 1, "source_id": 501, "quantity": 1.0, "price": 10.0}] * 10
+        with timed("save and append 1000 invoices"):
+            for _ in range(1000):
+                inv_id = db.create_invoice("2024-12-31", "Sale", 1, lines)
+                cube.on_invoice_saved(inv_id, "Sale", "2024-12-31", 1, lines)
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000)
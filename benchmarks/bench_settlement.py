@@ -0,0 +1,37 @@
+"""Benchmark grower settlements and their PDFs for 2k growers over a month.
+
+Run with ``python -m benchmarks.bench_settlement [growers]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.print_settlements import write_settlement_pdfs
+from ggs_accounting.reports.settlement import settlement_report
+
+
+def main(growers: int = 2_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed(f"seed {growers} growers"):
+            db = seed_database(
+                Path(tmp) / "bench.sqlite",
+                lines=growers * 100,
+                growers=growers,
+                start=date(2024, 3, 1),
+                days=31,
+            )
+        with timed("settlement_report"):
+            settlements, lines = settlement_report(db, "2024-03-01", "2024-03-31", 8.0, 0.25)
+        print(f"{len(settlements)} settlements, {len(lines)} item lines")
+        with timed("write_settlement_pdfs"):
+            paths = write_settlement_pdfs(db, "2024-03-01", "2024-03-31", Path(tmp) / "out", 8.0, 0.25)
+        print(f"{len(paths)} PDFs written")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,45 @@
+"""Benchmark writing quarterly statements for every party.
+
+Run with ``python -m benchmarks.bench_statements [parties]``.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.print_statements import write_statements
+from ggs_accounting.reports.statements import iter_statements
+
+START, END = "2024-04-01", "2024-06-30"
+
+
+def main(parties: int = 5_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Six months of history, so the quarter has opening balances
+        db = seed_database(
+            Path(tmp) / "bench.sqlite",
+            lines=parties * 40,
+            buyers=parties,
+            payments=parties * 4,
+            start=date(2024, 1, 1),
+            days=182,
+        )
+        with timed(f"{parties} parties, statements read"):
+            count = sum(1 for _st in iter_statements(db, START, END))
+        print(f"  {count} statements")
+        with timed(f"{count} statements, one process"):
+            write_statements(db, START, END, Path(tmp) / "serial", workers=1)
+        with timed(f"{count} statements, {os.cpu_count()} processes"):
+            write_statements(db, START, END, Path(tmp) / "pool")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"peak RSS of the main process: {peak:.0f} MB")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
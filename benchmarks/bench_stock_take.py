@@ -0,0 +1,49 @@
+"""Benchmark importing, comparing and posting a 20k-line count sheet.
+
+Run with ``python -m benchmarks.bench_stock_take [lines]``.
+"""
+from __future__ import annotations
+
+import csv
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.models.stock_take import compute_variances, post_variances, read_count_sheet
+
+
+def main(lines: int = 20_000) -> None:
+    rng = random.Random(3)
+    growers = 100
+    items = max(lines // growers, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed("seed inventory"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=0, growers=growers, items=items)
+            grower_ids = [
+                r[0] for r in db.conn.execute("SELECT customer_id FROM Customers WHERE customer_type='Grower'")
+            ]
+            db.conn.executemany(
+                "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty) VALUES (?, ?, 10, ?)",
+                [(g, i, rng.randint(0, 100)) for i in range(1, items + 1) for g in grower_ids],
+            )
+            db.conn.commit()
+        sheet = Path(tmp) / "counts.csv"
+        with sheet.open("w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["item_code", "grower", "counted"])
+            for n in range(lines):
+                writer.writerow([f"I{n // growers:05d}", f"Grower {n % growers}", rng.randint(0, 100)])
+        with timed(f"read {lines} counts"):
+            counts = read_count_sheet(sheet)
+        with timed("compute variances"):
+            rows = compute_variances(db, counts)
+        with timed("post adjustments"):
+            posted = post_variances(db, rows, "2024-03-31", "bench")
+        print(f"{posted} adjustments posted")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
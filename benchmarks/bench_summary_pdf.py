@@ -0,0 +1,32 @@
+"""Benchmark streaming a 100k-invoice summary PDF.
+
+Run with ``python -m benchmarks.bench_summary_pdf [invoices]``. Peak RSS
+is printed so runs at different sizes can be compared.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.print_receipts import iter_summary_rows, write_summary_pdf
+
+
+def main(invoices: int = 100_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed(f"seed {invoices} invoices"):
+            db = seed_database(Path(tmp) / "bench.sqlite", lines=invoices, lines_per_invoice=1)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        target = os.path.join(tmp, "summary.pdf")
+        with timed("write summary"):
+            count = write_summary_pdf(target, iter_summary_rows(db))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{count} rows, {os.path.getsize(target) / 1e6:.1f} MB, peak RSS {peak:.0f} MB (was {before:.0f} MB)")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,69 @@
+"""Benchmark filling the payments table: one item per cell versus the paged model.
+
+Run with ``python -m benchmarks.bench_table_views [payments]``.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets  # noqa: E402
+
+from benchmarks.common import seed_database, timed  # noqa: E402
+from ggs_accounting.ui.payment_panel import PaymentPanel  # noqa: E402
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fill_widget(table: QtWidgets.QTableWidget, payments, parties) -> None:
+    """The old PaymentPanel._load_payments."""
+    table.setRowCount(len(payments))
+    for row, p in enumerate(payments):
+        table.setItem(row, 0, QtWidgets.QTableWidgetItem(p["date"]))
+        table.setItem(row, 1, QtWidgets.QTableWidgetItem(parties.get(p["customer_id"], "")))
+        table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{p['amount']:.2f}"))
+        table.setItem(row, 3, QtWidgets.QTableWidgetItem("Received" if p.get("received", 1) else "Paid"))
+    table.resizeColumnsToContents()
+
+
+def main(payments: int = 100_000) -> None:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=10, buyers=5_000, payments=payments)
+        panel = PaymentPanel(db)
+        panel.resize(900, 700)
+        panel.show()
+        app.processEvents()
+        start = rss_mb()
+        with timed(f"{payments} payments, paged model refresh and paint"):
+            panel._load_payments()
+            panel.table.viewport().repaint()
+        with timed("scroll to the end and paint"):
+            panel.table.scrollToBottom()
+            panel.table.viewport().repaint()
+        with timed("search 'Buyer 42'"):
+            panel.search_edit.setText("Buyer 42")
+            panel.table.viewport().repaint()
+        print(f"peak RSS growth: {rss_mb() - start:.0f} MB")
+
+        parties = {c["customer_id"]: c["name"] for c in db.get_all_customers()}
+        widget = QtWidgets.QTableWidget(0, 4)
+        widget.resize(900, 700)
+        widget.show()
+        start = rss_mb()
+        with timed(f"{payments} payments, one QTableWidgetItem per cell"):
+            fill_widget(widget, db.get_payments(), parties)
+            widget.viewport().repaint()
+        print(f"peak RSS growth: {rss_mb() - start:.0f} MB")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,40 @@
+"""Benchmark rendering counter slips for the thermal printer.
+
+Run with ``python -m benchmarks.bench_thermal_slip [slips]``.
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_database, timed
+from ggs_accounting.printing.thermal import ThermalPrinter, fetch_slip, slip_template
+
+
+def main(slips: int = 10_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(Path(tmp) / "bench.sqlite", lines=5_000)
+        ids = [r[0] for r in db.conn.execute("SELECT inv_id FROM Invoices ORDER BY inv_id")]
+        docs = [fetch_slip(db, inv_id) for inv_id in ids]
+        company = {"company_name": "GGS Fruit Co", "company_address": "Market Yard"}
+        template = slip_template(80)
+        for label, render in (("text", template.text), ("ESC/POS", template.escpos)):
+            start = time.perf_counter()
+            with timed(f"{slips} slips, {label}"):
+                for n in range(slips):
+                    header, lines = docs[n % len(docs)]
+                    render(header, lines, company)
+            print(f"  {(time.perf_counter() - start) / slips * 1e6:.1f} us per slip")
+        printer = ThermalPrinter(db, target=Path(tmp) / "lp0")
+        start = time.perf_counter()
+        with timed(f"{len(ids)} slips, fetched and written to a file"):
+            for inv_id in ids:
+                printer.print_invoice(inv_id)
+        print(f"  {(time.perf_counter() - start) / len(ids) * 1e6:.1f} us per slip")
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
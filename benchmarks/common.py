@@ -0,0 +1,89 @@
+"""Helpers for seeding large synthetic databases used by the benchmarks."""
+from __future__ import annotations
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+@contextmanager
+def timed(label: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    print(f"{label}: {time.perf_counter() - start:.3f}s")
+
+
+def seed_database(
+    path: Path,
+    *,
+    lines: int,
+    buyers: int = 500,
+    growers: int = 200,
+    items: int = 300,
+    lines_per_invoice: int = 10,
+    start: date = date(2024, 1, 1),
+    days: int = 365,
+    payments: int = 0,
+    seed: int = 7,
+) -> DatabaseManager:
+    """Create a database holding ``lines`` invoice lines of random sales."""
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+    db.init_db()
+    cur = db.conn.cursor()
+    cur.executemany(
+        "INSERT INTO Customers (name, customer_type) VALUES (?, ?)",
+        [(f"Buyer {i}", "Buyer") for i in range(buyers)]
+        + [(f"Grower {i}", "Grower") for i in range(growers)],
+    )
+    buyer_ids = list(range(1, buyers + 1))
+    grower_ids = list(range(buyers + 1, buyers + growers + 1))
+    cur.executemany(
+        "INSERT INTO Items (name, item_code) VALUES (?, ?)",
+        [(f"Item {i}", f"I{i:05d}") for i in range(items)],
+    )
+    item_ids = list(range(1, items + 1))
+    invoices = []
+    inv_lines = []
+    inv_id = 0
+    for first in range(0, lines, lines_per_invoice):
+        inv_id += 1
+        buyer = rng.choice(buyer_ids)
+        day = (start + timedelta(days=rng.randrange(days))).isoformat()
+        total = 0.0
+        for _ in range(min(lines_per_invoice, lines - first)):
+            qty = float(rng.randint(1, 50))
+            price = round(rng.uniform(5, 200), 2)
+            total += qty * price
+            inv_lines.append(
+                (inv_id, rng.choice(item_ids), buyer, rng.choice(grower_ids), qty, price, qty * price)
+            )
+        invoices.append((inv_id, day, "Sale", buyer, total, total, 1))
+    cur.executemany(
+        "INSERT INTO Invoices (inv_id, date, type, customer_id, subtotal, total_amount, is_credit)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        invoices,
+    )
+    cur.executemany(
+        "INSERT INTO InvoiceItems (inv_id, item_id, customer_id, source_id, quantity, unit_price, line_total)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        inv_lines,
+    )
+    cur.executemany(
+        "INSERT INTO Payments (customer_id, date, amount, received) VALUES (?, ?, ?, 1)",
+        [
+            (
+                rng.choice(buyer_ids),
+                (start + timedelta(days=rng.randrange(days))).isoformat(),
+                round(rng.uniform(100, 20000), 2),
+            )
+            for _ in range(payments)
+        ],
+    )
+    db.conn.commit()
+    return db
@@ -1,38 +1,137 @@
 from __future__ import annotations
 
 import sqlite3
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from ggs_accounting.utils import hash_password, verify_password, camel_case
+from ggs_accounting.models.tax import compute_line_taxes, gst_enabled, item_tax_rates
+from ggs_accounting.models.stock import StockMove, format_shortfalls, required_quantities
 
 
 class DatabaseManager:
     """Simple SQLite database manager."""
 
-    def __init__(self, db_path: Optional[Path] = None) -> None:
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False) -> None:
+        """Open the database.
+
+        ``read_only`` connections are for background readers such as
+        exports; with the WAL journal they see a consistent snapshot
+        without blocking writers on the main connection.
+        """
         base = Path(__file__).resolve().parents[2]
-        self.db_path = db_path or base / "data" / "database.sqlite"
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path) if db_path else base / "data" / "database.sqlite"
+        self.read_only = read_only
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            if read_only:
+                self.conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            else:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self.conn = sqlite3.connect(self.db_path)
+                self.conn.execute("PRAGMA journal_mode = WAL")
         except sqlite3.Error as exc:
             raise RuntimeError(f"Unable to open database: {exc}") from exc
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys = ON")
 
+    def open_reader(self) -> "DatabaseManager":
+        """Return a new read-only connection to the same database file."""
+        return DatabaseManager(self.db_path, read_only=True)
+
     def init_db(self) -> None:
         """Create tables if they don't exist and ensure default admin."""
         cursor = self.conn.cursor()
         try:
+            tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")}
             for query in CREATE_TABLE_QUERIES:
                 cursor.execute(query)
+            added = self._migrate()
+            for query in CREATE_INDEX_QUERIES:
+                cursor.execute(query)
             self.conn.commit()
+            if ("Invoices", "balance_due") in added:
+                self.rebuild_allocations()
+            if ("InvoiceItems", "unit_cost") in added:
+                self._backfill_unit_cost()
+            if "PriceHistory" not in tables:
+                self._backfill_price_history()
             self._create_default_admin()
         except sqlite3.Error as exc:
             self.conn.rollback()
             raise RuntimeError(f"Database initialization failed: {exc}") from exc
 
+    def _migrate(self) -> set[tuple[str, str]]:
+        """Add columns introduced after a database was created.
+
+        Returns the ``(table, column)`` pairs that were added so callers can
+        backfill them.
+        """
+        added: set[tuple[str, str]] = set()
+        for table, column, definition in COLUMN_MIGRATIONS:
+            existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                added.add((table, column))
+        return added
+
+    def _backfill_unit_cost(self) -> None:
+        """Fill cost basis on lines written before it was captured.
+
+        Purchases cost their own price. Sales take the grower's latest
+        inventory price, the same one the sale reduced stock against.
+        """
+        try:
+            self.conn.execute(
+                """UPDATE InvoiceItems SET unit_cost = unit_price
+                   WHERE unit_cost IS NULL
+                     AND inv_id IN (SELECT inv_id FROM Invoices WHERE type = 'Purchase')"""
+            )
+            self.conn.execute(
+                """UPDATE InvoiceItems SET unit_cost = (
+                       SELECT price_excl_tax FROM Inventory
+                       WHERE Inventory.item_id = InvoiceItems.item_id
+                         AND Inventory.customer_id = InvoiceItems.source_id
+                       ORDER BY inventory_id DESC LIMIT 1)
+                   WHERE unit_cost IS NULL AND source_id IS NOT NULL"""
+            )
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to backfill unit cost: {exc}") from exc
+
+    def _backfill_price_history(self) -> None:
+        """Seed ``PriceHistory`` from the lines saved before it existed."""
+        try:
+            self.conn.execute(
+                """INSERT INTO PriceHistory (item_id, customer_id, type, date, price, inv_id)
+                   SELECT InvoiceItems.item_id, COALESCE(InvoiceItems.customer_id, Invoices.customer_id),
+                          Invoices.type, Invoices.date, InvoiceItems.unit_price, Invoices.inv_id
+                   FROM InvoiceItems JOIN Invoices ON Invoices.inv_id = InvoiceItems.inv_id
+                   WHERE COALESCE(InvoiceItems.customer_id, Invoices.customer_id) IS NOT NULL
+                   ORDER BY InvoiceItems.id"""
+            )
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to backfill price history: {exc}") from exc
+
+    def rebuild_after_import(self) -> None:
+        """Recompute what is derived from invoices after a bulk load.
+
+        Payment allocations are replayed, lines without a cost basis get
+        one and ``PriceHistory`` is rebuilt from the invoice lines.
+        """
+        self.rebuild_allocations()
+        self._backfill_unit_cost()
+        try:
+            # Committed together with the backfill that refills it
+            self.conn.execute("DELETE FROM PriceHistory")
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to clear price history: {exc}") from exc
+        self._backfill_price_history()
+
     def _create_default_admin(self) -> None:
         cur = self.conn.cursor()
         try:
@@ -101,14 +200,16 @@ class DatabaseManager:
         price_excl_tax: float,
         stock_qty: float,
         customer_id: int,
+        hsn_code: str = "",
+        gst_rate: float = 0.0,
     ) -> int:
         """Add a global item if needed and create an inventory record."""
         name = camel_case(name)
         cur = self.conn.cursor()
         try:
             cur.execute(
-                "INSERT OR IGNORE INTO Items (name, item_code) VALUES (?, ?)",
-                (name, item_code),
+                "INSERT OR IGNORE INTO Items (name, item_code, hsn_code, gst_rate) VALUES (?, ?, ?, ?)",
+                (name, item_code, hsn_code, gst_rate),
             )
             cur.execute("SELECT item_id FROM Items WHERE name=?", (name,))
             row = cur.fetchone()
@@ -131,8 +232,9 @@ class DatabaseManager:
         inv_fields = {}
         if "name" in kwargs:
             item_fields["name"] = camel_case(str(kwargs["name"]))
-        if "item_code" in kwargs:
-            item_fields["item_code"] = kwargs["item_code"]
+        for key in ("item_code", "hsn_code", "gst_rate"):
+            if key in kwargs:
+                item_fields[key] = kwargs[key]
         for key in ("price_excl_tax", "stock_qty"):
             if key in kwargs:
                 inv_fields[key] = kwargs[key]
@@ -181,28 +283,220 @@ class DatabaseManager:
             self.conn.rollback()
             raise RuntimeError(f"Failed to delete item: {exc}") from exc
 
-    def update_item_stock(self, item_id: int, customer_id: int, price_excl_tax: float, change: float) -> None:
-        cur = self.conn.cursor()
+    @staticmethod
+    def _apply_stock_change(
+        cur: sqlite3.Cursor, item_id: int, customer_id: int, price_excl_tax: float, change: float
+    ) -> None:
+        cur.execute(
+            "SELECT inventory_id FROM Inventory WHERE item_id=? AND customer_id=? AND price_excl_tax=?",
+            (item_id, customer_id, price_excl_tax),
+        )
+        row = cur.fetchone()
+        if row is None:
+            cur.execute(
+                "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty) VALUES (?, ?, ?, ?)",
+                (customer_id, item_id, price_excl_tax, change),
+            )
+        else:
+            cur.execute(
+                "UPDATE Inventory SET stock_qty = stock_qty + ? WHERE item_id=? AND customer_id=? AND price_excl_tax=?",
+                (change, item_id, customer_id, price_excl_tax),
+            )
+
+    @staticmethod
+    def _lot_takes(
+        cur: sqlite3.Cursor,
+        item_id: int,
+        customer_id: int,
+        quantity: float,
+        taken: Optional[Dict[int, float]] = None,
+    ) -> List[Tuple[int, float, float]]:
+        """Split ``quantity`` across a pair's lots, newest first, leaving none below zero.
+
+        Returns ``(inventory_id, price_excl_tax, take)`` per lot touched.
+        ``taken`` maps lots to quantities already claimed and is updated.
+        Anything the lots cannot cover is put on the newest lot.
+        """
+        taken = {} if taken is None else taken
+        lots = cur.execute(
+            "SELECT inventory_id, price_excl_tax, stock_qty FROM Inventory"
+            " WHERE item_id=? AND customer_id=? ORDER BY inventory_id DESC",
+            (item_id, customer_id),
+        ).fetchall()
+        takes: Dict[int, float] = {}
+        left = quantity
+        for lot_id, _price, qty in lots:
+            if left <= 1e-9:
+                break
+            take = min(left, max(float(qty) - taken.get(lot_id, 0.0), 0.0))
+            if take > 0:
+                takes[lot_id] = take
+                left -= take
+        if left > 1e-9 and lots:
+            newest = lots[0][0]
+            takes[newest] = takes.get(newest, 0.0) + left
+        prices = {lot_id: float(price) for lot_id, price, _qty in lots}
+        for lot_id, take in takes.items():
+            taken[lot_id] = taken.get(lot_id, 0.0) + take
+        return [(lot_id, prices[lot_id], take) for lot_id, take in takes.items()]
+
+    @classmethod
+    def _take_stock(cls, cur: sqlite3.Cursor, item_id: int, customer_id: int, quantity: float) -> None:
+        """Remove ``quantity`` from a pair's lots as split by :meth:`_lot_takes`."""
+        cur.executemany(
+            "UPDATE Inventory SET stock_qty = stock_qty - ? WHERE inventory_id=?",
+            [(take, lot_id) for lot_id, _price, take in cls._lot_takes(cur, item_id, customer_id, quantity)],
+        )
+
+    def split_stock(
+        self, item_id: int, customer_id: int, quantity: float, taken: Optional[Dict[int, float]] = None
+    ) -> List[Tuple[float, float]]:
+        """``(price_excl_tax, quantity)`` to take from each lot to remove ``quantity``.
+
+        Lots are used newest first and none is taken below zero. Pass the
+        same ``taken`` dict for several lines of one invoice so later lines
+        see what earlier ones claimed.
+        """
         try:
+            takes = self._lot_takes(self.conn.cursor(), item_id, customer_id, quantity, taken)
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to read stock lots: {exc}") from exc
+        return [(price, take) for _lot_id, price, take in takes]
+
+    def _check_stock(self, cur: sqlite3.Cursor, moves: Iterable[StockMove]) -> None:
+        """Raise ``ValueError`` if ``moves`` would take any pair or lot below zero."""
+        short = []
+        for (item_id, party_id), needed in required_quantities(moves).items():
             cur.execute(
-                "SELECT inventory_id FROM Inventory WHERE item_id=? AND customer_id=? AND price_excl_tax=?",
-                (item_id, customer_id, price_excl_tax),
+                "SELECT COALESCE(SUM(stock_qty), 0) FROM Inventory WHERE item_id=? AND customer_id=?",
+                (item_id, party_id),
             )
-            row = cur.fetchone()
-            if row is None:
+            have = float(cur.fetchone()[0])
+            if needed > have + 1e-9:
+                short.append((item_id, party_id, needed, have))
+        if not short:
+            # Sales name the lots they take from; one read before another
+            # invoice took from the same lot must not push it below zero
+            per_lot: Dict[Tuple[int, int, float], float] = defaultdict(float)
+            for item_id, party_id, price, change in moves:
+                if change < 0:
+                    per_lot[(item_id, party_id, price)] -= change
+            for (item_id, party_id, price), needed in per_lot.items():
                 cur.execute(
-                    "INSERT INTO Inventory (customer_id, item_id, price_excl_tax, stock_qty) VALUES (?, ?, ?, ?)",
-                    (customer_id, item_id, price_excl_tax, change),
+                    "SELECT COALESCE(SUM(stock_qty), 0) FROM Inventory"
+                    " WHERE item_id=? AND customer_id=? AND price_excl_tax=?",
+                    (item_id, party_id, price),
                 )
-            else:
+                have = float(cur.fetchone()[0])
+                if needed > have + 1e-9:
+                    short.append((item_id, party_id, needed, have))
+        if short:
+            raise ValueError(format_shortfalls(self, short))
+
+    def update_item_stock(self, item_id: int, customer_id: int, price_excl_tax: float, change: float) -> None:
+        cur = self.conn.cursor()
+        try:
+            self._apply_stock_change(cur, item_id, customer_id, price_excl_tax, change)
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to update item stock: {exc}") from exc
+
+    def apply_price_changes(self, changes: Iterable[Tuple[int, float]]) -> int:
+        """Set ``price_excl_tax`` for many inventory rows in one transaction.
+
+        ``changes`` holds ``(inventory_id, new_price)`` pairs. They are loaded
+        into a temp table and applied with one ``UPDATE ... FROM``. Rows are
+        first parked at a unique negative price so lots swapping prices do
+        not trip the (customer, item, price) constraint midway.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS price_revision("
+                "inventory_id INTEGER PRIMARY KEY, new_price REAL NOT NULL)"
+            )
+            cur.execute("DELETE FROM temp.price_revision")
+            cur.executemany("INSERT INTO temp.price_revision VALUES (?, ?)", changes)
+            cur.execute(
+                """UPDATE Inventory SET price_excl_tax = -inventory_id
+                   WHERE inventory_id IN (SELECT inventory_id FROM temp.price_revision)"""
+            )
+            cur.execute(
+                """UPDATE Inventory SET price_excl_tax = rev.new_price
+                   FROM temp.price_revision AS rev
+                   WHERE Inventory.inventory_id = rev.inventory_id"""
+            )
+            updated = cur.rowcount
+            cur.execute("DELETE FROM temp.price_revision")
+            self.conn.commit()
+            return updated
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to apply price changes: {exc}") from exc
+
+    def post_stock_adjustments(
+        self, adjustments: Iterable[Mapping[str, Any]], date: str, reference: str = ""
+    ) -> int:
+        """Set stock to counted quantities and log each change.
+
+        Each adjustment names ``item_id``, ``customer_id`` and ``counted_qty``.
+        The difference from the current stock is re-read inside the
+        transaction. A gain is booked against the newest lot, or a new lot
+        at ``price_excl_tax`` when the pair has none; a loss is taken from
+        the lots newest first without leaving any below zero. Returns the
+        number of adjustments posted.
+        """
+        cur = self.conn.cursor()
+        audit: List[Tuple[Any, ...]] = []
+        try:
+            for adj in adjustments:
+                item_id, customer_id = adj["item_id"], adj["customer_id"]
+                counted = float(adj["counted_qty"])
                 cur.execute(
-                    "UPDATE Inventory SET stock_qty = stock_qty + ? WHERE item_id=? AND customer_id=? AND price_excl_tax=?",
-                    (change, item_id, customer_id, price_excl_tax),
+                    """SELECT COALESCE(SUM(stock_qty), 0),
+                              (SELECT price_excl_tax FROM Inventory
+                               WHERE item_id=? AND customer_id=? ORDER BY inventory_id DESC LIMIT 1)
+                       FROM Inventory WHERE item_id=? AND customer_id=?""",
+                    (item_id, customer_id, item_id, customer_id),
                 )
+                system_qty, price = cur.fetchone()
+                change = counted - float(system_qty)
+                if abs(change) < 1e-9:
+                    continue
+                if price is None:
+                    price = float(adj.get("price_excl_tax") or 0)
+                if change < 0 and system_qty > 0:
+                    self._take_stock(cur, item_id, customer_id, -change)
+                else:
+                    self._apply_stock_change(cur, item_id, customer_id, price, change)
+                audit.append((date, item_id, customer_id, system_qty, counted, change, price, reference))
+            cur.executemany(
+                """INSERT INTO StockAdjustments
+                   (date, item_id, customer_id, system_qty, counted_qty, adjustment, price_excl_tax, reference)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                audit,
+            )
             self.conn.commit()
+            return len(audit)
         except sqlite3.Error as exc:
             self.conn.rollback()
-            raise RuntimeError(f"Failed to update item stock: {exc}") from exc
+            raise RuntimeError(f"Failed to post stock adjustments: {exc}") from exc
+
+    def get_stock_adjustments(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = """SELECT StockAdjustments.*, Items.name AS item_name, Customers.name AS customer_name
+                 FROM StockAdjustments
+                 JOIN Items ON Items.item_id = StockAdjustments.item_id
+                 JOIN Customers ON Customers.customer_id = StockAdjustments.customer_id"""
+        params: List[Any] = []
+        if start_date and end_date:
+            sql += " WHERE StockAdjustments.date BETWEEN ? AND ?"
+            params.extend([start_date, end_date])
+        sql += " ORDER BY adjustment_id"
+        try:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch stock adjustments: {exc}") from exc
 
     def get_all_items(self) -> List[Dict[str, Any]]:
         """Return joined inventory records with item details."""
@@ -211,7 +505,8 @@ class DatabaseManager:
             cur.execute(
                 """
                 SELECT Inventory.customer_id, Inventory.price_excl_tax, Inventory.stock_qty,
-                       Items.item_id, Items.name, Items.item_code
+                       Items.item_id, Items.name, Items.item_code,
+                       Items.hsn_code, Items.gst_rate
                 FROM Inventory JOIN Items ON Inventory.item_id = Items.item_id
                 """
             )
@@ -220,6 +515,85 @@ class DatabaseManager:
         except sqlite3.Error as exc:
             raise RuntimeError(f"Failed to fetch items: {exc}") from exc
 
+    def get_item_names(self) -> List[Dict[str, Any]]:
+        """Return ``item_id`` and ``name`` of every item, by name."""
+        try:
+            return [dict(row) for row in self.conn.execute("SELECT item_id, name FROM Items ORDER BY name")]
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch items: {exc}") from exc
+
+    def compact_inventory(self, batch_size: int = 500, max_batches: Optional[int] = None) -> int:
+        """Move sold-out price rows from ``Inventory`` to ``InventoryHistory``.
+
+        The newest row of each (item, party) pair is kept even at zero stock:
+        sales take their cost from it and the item stays on the billing
+        lists. Each batch is its own short transaction so the job can run
+        while the application is in use. Returns the number of rows removed.
+        """
+        removed = 0
+        batches = 0
+        cur = self.conn.cursor()
+        while max_batches is None or batches < max_batches:
+            try:
+                cur.execute(
+                    """SELECT inventory_id FROM Inventory AS inv
+                       WHERE stock_qty = 0
+                         AND inventory_id < (
+                             SELECT MAX(inventory_id) FROM Inventory
+                             WHERE item_id = inv.item_id AND customer_id = inv.customer_id)
+                       ORDER BY inventory_id
+                       LIMIT ?""",
+                    (batch_size,),
+                )
+                ids = [(row[0],) for row in cur.fetchall()]
+                if not ids:
+                    break
+                cur.executemany(
+                    """INSERT OR REPLACE INTO InventoryHistory (inventory_id, customer_id, item_id, price_excl_tax)
+                       SELECT inventory_id, customer_id, item_id, price_excl_tax
+                       FROM Inventory WHERE inventory_id = ? AND stock_qty = 0""",
+                    ids,
+                )
+                cur.executemany("DELETE FROM Inventory WHERE inventory_id = ? AND stock_qty = 0", ids)
+                removed += max(cur.rowcount, 0)
+                self.conn.commit()
+            except sqlite3.Error as exc:
+                self.conn.rollback()
+                raise RuntimeError(f"Failed to compact inventory: {exc}") from exc
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return removed
+
+    def get_inventory_history(self, item_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return archived price rows, newest first."""
+        sql = "SELECT * FROM InventoryHistory"
+        params: List[Any] = []
+        if item_id is not None:
+            sql += " WHERE item_id=?"
+            params.append(item_id)
+        sql += " ORDER BY inventory_id DESC"
+        try:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch inventory history: {exc}") from exc
+
+    def get_last_price(self, item_id: int, customer_id: int, inv_type: str) -> Optional[float]:
+        """Return the latest ``inv_type`` price of ``item_id`` for a party.
+
+        The lookup is a single descent of ``idx_price_history_lookup``.
+        """
+        try:
+            row = self.conn.execute(
+                """SELECT price FROM PriceHistory
+                   WHERE item_id=? AND customer_id=? AND type=?
+                   ORDER BY date DESC, id DESC LIMIT 1""",
+                (item_id, customer_id, inv_type),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch last price: {exc}") from exc
+        return float(row[0]) if row else None
+
     # ---- Customers ----
     def add_customer(
         self, name: str, contact_info: str = "", customer_type: str = "Buyer"
@@ -284,19 +658,19 @@ class DatabaseManager:
         items: Iterable[Dict[str, Any]],
         is_credit: bool = False,
         amount_paid: float = 0.0,
+        stock_moves: Optional[Iterable[StockMove]] = None,
     ) -> int:
+        """Insert an invoice with its lines.
+
+        ``stock_moves`` are applied to ``Inventory`` in the same transaction,
+        after checking that no ``(item, party)`` pair or price lot would go
+        negative; a shortfall raises ``ValueError`` and nothing is written.
+        """
+        items = list(items)
+        moves = list(stock_moves or [])
         cur = self.conn.cursor()
         try:
-            subtotal = sum(item["price"] * item["quantity"] for item in items)
-            cur.execute(
-                """INSERT INTO Invoices
-                   (date, type, customer_id, subtotal, total_amount, is_credit)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (date, inv_type, customer_id, subtotal, subtotal, int(is_credit)),
-            )
-            inv_id = cur.lastrowid
-            if inv_id is None:
-                raise RuntimeError("Failed to retrieve lastrowid after creating invoice.")
+            item_ids: List[int] = []
             for item in items:
                 item_id = item.get("item_id")
                 if item_id is None:
@@ -305,8 +679,38 @@ class DatabaseManager:
                     if row is None:
                         raise RuntimeError("Unknown item")
                     item_id = int(row["item_id"])
+                item_ids.append(item_id)
+            line_totals = [item["price"] * item["quantity"] for item in items]
+            subtotal = sum(line_totals)
+            tax_lines: List[Tuple[str, float, float]] = []
+            if gst_enabled(self.get_setting("GST")):
+                rates = item_tax_rates(self.conn, item_ids)
+                codes = [rates.get(i, ("", 0.0)) for i in item_ids]
+                taxes = compute_line_taxes(line_totals, [rate for _hsn, rate in codes])
+                tax_lines = [(hsn, rate, float(tax)) for (hsn, rate), tax in zip(codes, taxes)]
+            total = subtotal + sum(tax for _hsn, _rate, tax in tax_lines)
+            cur.execute(
+                """INSERT INTO Invoices
+                   (date, type, customer_id, subtotal, total_amount, is_credit, amount_paid, balance_due)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    date,
+                    inv_type,
+                    customer_id,
+                    subtotal,
+                    total,
+                    int(is_credit),
+                    amount_paid,
+                    max(total - amount_paid, 0.0) if is_credit and customer_id else 0.0,
+                ),
+            )
+            inv_id = cur.lastrowid
+            if inv_id is None:
+                raise RuntimeError("Failed to retrieve lastrowid after creating invoice.")
+            line_ids: List[int] = []
+            for item, item_id, line_total in zip(items, item_ids, line_totals):
                 cur.execute(
-                    "INSERT INTO InvoiceItems (inv_id, item_id, customer_id, source_id, quantity, unit_price, line_total) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    "INSERT INTO InvoiceItems (inv_id, item_id, customer_id, source_id, quantity, unit_price, line_total, unit_cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
                     (
                         inv_id,
                         item_id,
@@ -314,25 +718,54 @@ class DatabaseManager:
                         item.get("source_id"),
                         item["quantity"],
                         item["price"],
-                        item["price"] * item["quantity"],
+                        line_total,
+                        item.get("unit_cost", item["price"] if inv_type == "Purchase" else None),
                     ),
                 )
+                line_ids.append(int(cur.lastrowid or 0))
+            cur.executemany(
+                "INSERT INTO PriceHistory (item_id, customer_id, type, date, price, inv_id) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (item_id, item.get("customer_id") or customer_id, inv_type, date, item["price"], inv_id)
+                    for item, item_id in zip(items, item_ids)
+                    if (item.get("customer_id") or customer_id) is not None
+                ],
+            )
+            if tax_lines:
+                cur.executemany(
+                    """INSERT INTO InvoiceTaxLines
+                       (inv_id, line_id, date, type, hsn_code, rate, taxable_value, tax_amount)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (inv_id, line_id, date, inv_type, hsn, rate, line_total, tax)
+                        for line_id, line_total, (hsn, rate, tax) in zip(line_ids, line_totals, tax_lines)
+                    ],
+                )
             # Update customer balance for credit transactions
             if is_credit and customer_id:
                 if inv_type == "Sale":
                     # Buyer owes you: increase their balance
                     cur.execute(
                         "UPDATE Customers SET balance = balance + ? WHERE customer_id=?",
-                        (subtotal - amount_paid, customer_id),
+                        (total - amount_paid, customer_id),
                     )
                 elif inv_type == "Purchase":
                     # You owe grower: decrease their balance
                     cur.execute(
                         "UPDATE Customers SET balance = balance - ? WHERE customer_id=?",
-                        (subtotal - amount_paid, customer_id),
+                        (total - amount_paid, customer_id),
                     )
+            if moves:
+                # The inserts above hold the write lock, so no other writer
+                # can consume the stock between this check and the commit.
+                self._check_stock(cur, moves)
+            for move in moves:
+                self._apply_stock_change(cur, *move)
             self.conn.commit()
             return inv_id
+        except ValueError:
+            self.conn.rollback()
+            raise
         except sqlite3.Error as exc:
             self.conn.rollback()
             raise RuntimeError(f"Failed to create invoice: {exc}") from exc
@@ -369,11 +802,20 @@ class DatabaseManager:
             raise RuntimeError(f"Failed to fetch invoice items: {exc}") from exc
 
     # ---- Payments ----
-    def record_payment(self, customer_id: int, amount: float, date: str, received: bool = True) -> int:
-        """Record a payment and update balance.
+    def record_payment(
+        self,
+        customer_id: int,
+        amount: float,
+        date: str,
+        received: bool = True,
+        allocations: Optional[Mapping[int, float]] = None,
+    ) -> int:
+        """Record a payment, update balance and settle open invoices.
 
         If ``received`` is True the customer paid us and their balance decreases.
         If False we paid the customer and their balance increases.
+        The payment settles the party's open invoices oldest first unless
+        ``allocations`` maps invoice ids to the amounts to settle instead.
         """
         cur = self.conn.cursor()
         try:
@@ -381,18 +823,89 @@ class DatabaseManager:
                 "INSERT INTO Payments (customer_id, date, amount, received) VALUES (?, ?, ?, ?)",
                 (customer_id, date, amount, int(received)),
             )
+            payment_id = cur.lastrowid
+            if payment_id is None:
+                raise RuntimeError("Failed to retrieve lastrowid after payment")
             cur.execute(
                 "UPDATE Customers SET balance = balance + ? WHERE customer_id=?",
                 (-amount if received else amount, customer_id),
             )
+            if allocations is None:
+                self._allocate_fifo(cur, payment_id, customer_id, amount, received)
+            else:
+                self._allocate_manual(cur, payment_id, customer_id, amount, received, allocations)
             self.conn.commit()
-            if cur.lastrowid is None:
-                raise RuntimeError("Failed to retrieve lastrowid after payment")
-            return cur.lastrowid
+            return payment_id
+        except ValueError:
+            self.conn.rollback()
+            raise
         except sqlite3.Error as exc:
             self.conn.rollback()
             raise RuntimeError(f"Failed to record payment: {exc}") from exc
 
+    def record_payments(self, payments: Iterable[Mapping[str, Any]]) -> List[int]:
+        """Record many payments in one transaction and return their ids.
+
+        Each payment needs ``customer_id``, ``amount``, ``date`` and
+        ``received``. Each party's balance is updated once with the net of
+        its payments. A payment
+        naming an ``inv_id`` settles that bill first, then FIFO as usual.
+        Payments carrying a ``line_hash`` are remembered so the same
+        statement line is not imported twice.
+        """
+        rows = list(payments)
+        if not rows:
+            return []
+        cur = self.conn.cursor()
+        try:
+            ids: List[int] = []
+            # One row at a time: triggers or other writers in the transaction
+            # can take ids in between, so only lastrowid is reliable
+            for p in rows:
+                cur.execute(
+                    "INSERT INTO Payments (customer_id, date, amount, received) VALUES (?, ?, ?, ?)",
+                    (p["customer_id"], p["date"], p["amount"], int(p["received"])),
+                )
+                if cur.lastrowid is None:
+                    raise RuntimeError("Failed to retrieve lastrowid after payment")
+                ids.append(cur.lastrowid)
+            net: Dict[int, float] = {}
+            for p in rows:
+                change = -p["amount"] if p["received"] else p["amount"]
+                net[p["customer_id"]] = net.get(p["customer_id"], 0.0) + change
+            cur.executemany(
+                "UPDATE Customers SET balance = balance + ? WHERE customer_id=?",
+                [(change, cid) for cid, change in net.items()],
+            )
+            for payment_id, p in zip(ids, rows):
+                amount, received = float(p["amount"]), bool(p["received"])
+                inv_id = p.get("inv_id")
+                if inv_id is not None:
+                    due = cur.execute(
+                        "SELECT balance_due FROM Invoices WHERE inv_id=? AND customer_id=? AND type=?",
+                        (inv_id, p["customer_id"], self._settles(received)),
+                    ).fetchone()
+                    if due is not None and due[0] > 0:
+                        applied = min(amount, float(due[0]))
+                        self._apply_allocation(cur, payment_id, inv_id, applied)
+                        amount -= applied
+                if amount > 1e-9:
+                    self._allocate_fifo(cur, payment_id, p["customer_id"], amount, received)
+            cur.executemany(
+                """INSERT INTO BankStatementLines (line_hash, payment_id, date, amount, narration, reference)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [
+                    (p["line_hash"], payment_id, p["date"], p["amount"], p.get("narration", ""), p.get("reference", ""))
+                    for payment_id, p in zip(ids, rows)
+                    if p.get("line_hash")
+                ],
+            )
+            self.conn.commit()
+            return ids
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to record payments: {exc}") from exc
+
     def get_payments(self, customer_id: Optional[int] = None) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
         sql = "SELECT * FROM Payments"
@@ -407,6 +920,152 @@ class DatabaseManager:
         except sqlite3.Error as exc:
             raise RuntimeError(f"Failed to fetch payments: {exc}") from exc
 
+    # ---- Allocations ----
+    @staticmethod
+    def _settles(received: bool) -> str:
+        """Invoice type a payment in the given direction settles."""
+        return "Sale" if received else "Purchase"
+
+    def _apply_allocation(self, cur: sqlite3.Cursor, payment_id: int, inv_id: int, amount: float) -> None:
+        cur.execute(
+            "INSERT INTO PaymentAllocations (payment_id, inv_id, amount) VALUES (?, ?, ?)",
+            (payment_id, inv_id, amount),
+        )
+        cur.execute(
+            "UPDATE Invoices SET balance_due = MAX(balance_due - ?, 0) WHERE inv_id=?",
+            (amount, inv_id),
+        )
+
+    def _allocate_fifo(
+        self, cur: sqlite3.Cursor, payment_id: int, customer_id: int, amount: float, received: bool
+    ) -> float:
+        """Settle the oldest open invoices; return the unallocated amount."""
+        remaining = float(amount)
+        rows = cur.execute(
+            """SELECT inv_id, balance_due FROM Invoices
+               WHERE customer_id=? AND balance_due > 0 AND type=?
+               ORDER BY date, inv_id""",
+            (customer_id, self._settles(received)),
+        ).fetchall()
+        for row in rows:
+            if remaining <= 1e-9:
+                break
+            applied = min(remaining, float(row["balance_due"]))
+            self._apply_allocation(cur, payment_id, int(row["inv_id"]), applied)
+            remaining -= applied
+        return remaining
+
+    def _allocate_manual(
+        self,
+        cur: sqlite3.Cursor,
+        payment_id: int,
+        customer_id: int,
+        amount: float,
+        received: bool,
+        allocations: Mapping[int, float],
+    ) -> None:
+        if sum(allocations.values()) > amount + 1e-9:
+            raise ValueError("Allocations exceed the payment amount")
+        for inv_id, applied in allocations.items():
+            if applied <= 0:
+                raise ValueError("Allocation amounts must be positive")
+            row = cur.execute(
+                "SELECT customer_id, type, balance_due FROM Invoices WHERE inv_id=?",
+                (inv_id,),
+            ).fetchone()
+            if row is None or row["customer_id"] != customer_id:
+                raise ValueError(f"Invoice {inv_id} does not belong to this customer")
+            if row["type"] != self._settles(received):
+                raise ValueError(f"Invoice {inv_id} cannot be settled by this payment")
+            if applied > float(row["balance_due"]) + 1e-9:
+                raise ValueError(f"Allocation exceeds the amount due on invoice {inv_id}")
+            self._apply_allocation(cur, payment_id, inv_id, applied)
+
+    def reallocate_payment(self, payment_id: int, allocations: Optional[Mapping[int, float]] = None) -> None:
+        """Undo a payment's allocations and settle again (FIFO or manual)."""
+        cur = self.conn.cursor()
+        try:
+            payment = cur.execute(
+                "SELECT customer_id, amount, received FROM Payments WHERE payment_id=?",
+                (payment_id,),
+            ).fetchone()
+            if payment is None:
+                raise ValueError(f"Unknown payment {payment_id}")
+            cur.execute(
+                """UPDATE Invoices SET balance_due = balance_due + (
+                       SELECT SUM(amount) FROM PaymentAllocations
+                       WHERE PaymentAllocations.inv_id = Invoices.inv_id AND payment_id=?)
+                   WHERE inv_id IN (SELECT inv_id FROM PaymentAllocations WHERE payment_id=?)""",
+                (payment_id, payment_id),
+            )
+            cur.execute("DELETE FROM PaymentAllocations WHERE payment_id=?", (payment_id,))
+            args = (cur, payment_id, payment["customer_id"], payment["amount"], bool(payment["received"]))
+            if allocations is None:
+                self._allocate_fifo(*args)
+            else:
+                self._allocate_manual(*args, allocations)
+            self.conn.commit()
+        except ValueError:
+            self.conn.rollback()
+            raise
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to reallocate payment: {exc}") from exc
+
+    def rebuild_allocations(self) -> None:
+        """Recompute every invoice's balance due by replaying payments FIFO."""
+        cur = self.conn.cursor()
+        try:
+            cur.execute("DELETE FROM PaymentAllocations")
+            cur.execute(
+                "UPDATE Invoices SET balance_due = CASE WHEN is_credit = 1 AND customer_id IS NOT NULL"
+                " THEN MAX(total_amount - amount_paid, 0) ELSE 0 END"
+            )
+            payments = cur.execute(
+                "SELECT payment_id, customer_id, amount, received FROM Payments ORDER BY date, payment_id"
+            ).fetchall()
+            for p in payments:
+                self._allocate_fifo(cur, p["payment_id"], p["customer_id"], p["amount"], bool(p["received"]))
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Failed to rebuild allocations: {exc}") from exc
+
+    def get_open_invoices(self, customer_id: int) -> List[Dict[str, Any]]:
+        """Return the customer's unsettled credit invoices, oldest first."""
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                """SELECT inv_id, date, type, total_amount, balance_due FROM Invoices
+                   WHERE customer_id=? AND balance_due > 0
+                   ORDER BY date, inv_id""",
+                (customer_id,),
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch open invoices: {exc}") from exc
+
+    def get_payment_allocations(
+        self, payment_id: Optional[int] = None, inv_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        sql = "SELECT * FROM PaymentAllocations"
+        clauses: List[str] = []
+        params: List[Any] = []
+        if payment_id is not None:
+            clauses.append("payment_id=?")
+            params.append(payment_id)
+        if inv_id is not None:
+            clauses.append("inv_id=?")
+            params.append(inv_id)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        try:
+            cur.execute(sql, params)
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch allocations: {exc}") from exc
+
     # ---- Settings ----
     def set_setting(self, key: str, value: str) -> None:
         cur = self.conn.cursor()
@@ -455,17 +1114,140 @@ class DatabaseManager:
 
     def run_raw_query(self, sql: str) -> tuple[list[str], list[tuple]]:
         """Execute a SELECT SQL statement and return (columns, rows)."""
+        cols, cur = self.stream_raw_query(sql)
+        try:
+            return cols, cur.fetchall()
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to execute query: {exc}") from exc
+
+    def stream_raw_query(self, sql: str) -> tuple[list[str], sqlite3.Cursor]:
+        """Execute a SELECT SQL statement and return (columns, open cursor).
+
+        Rows are fetched as the cursor is iterated, for exports too large
+        to hold in memory.
+        """
         if not sql.strip().lower().startswith("select"):
             raise ValueError("Only SELECT queries are allowed")
         cur = self.conn.cursor()
         try:
             cur.execute(sql)
-            rows = cur.fetchall()
             cols = [desc[0] for desc in cur.description or []]
-            return cols, rows
+            return cols, cur
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to execute query: {exc}") from exc
+
+    def query_columns(self, sql: str, params: Iterable[Any] = ()) -> List[str]:
+        """Column names a SELECT would return, without reading any rows."""
+        sql, params = _filtered_query(sql, params)
+        try:
+            cur = self.conn.execute(f"{sql} LIMIT 0", params)
+            return [desc[0] for desc in cur.description or []]
         except sqlite3.Error as exc:
             raise RuntimeError(f"Failed to execute query: {exc}") from exc
 
+    def summarize_query(
+        self,
+        sql: str,
+        params: Iterable[Any] = (),
+        search: str = "",
+        search_columns: Iterable[str] = (),
+        totals: Iterable[str] = (),
+    ) -> Tuple[int, Dict[str, float]]:
+        """Row count and the sums of ``totals`` columns, in one pass."""
+        totals = list(totals)
+        sql, params = _filtered_query(sql, params, search, search_columns)
+        sums = "".join(f", TOTAL({_quote(c)})" for c in totals)
+        try:
+            row = self.conn.execute(f"SELECT COUNT(*){sums} FROM ({sql})", params).fetchone()
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to count rows: {exc}") from exc
+        return int(row[0]), {c: float(row[i]) for i, c in enumerate(totals, start=1)}
+
+    def fetch_query_page(
+        self,
+        sql: str,
+        params: Iterable[Any] = (),
+        *,
+        search: str = "",
+        search_columns: Iterable[str] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        key: Optional[str] = None,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 500,
+        offset: int = 0,
+    ) -> List[sqlite3.Row]:
+        """One page of a SELECT's rows.
+
+        ``search`` keeps rows where any of ``search_columns`` contains it,
+        ignoring case. ``order_by`` names a result column; ties are broken
+        by ``key``, a result column unique per row, so no row repeats or
+        goes missing between pages. Without a ``key`` rows are numbered in
+        scan order for the same purpose.
+
+        ``after`` is the ``(order_by, key)`` values of the last row of the
+        previous page. Given it, the page starts after that row and
+        ``offset`` is ignored, so a page deep into the result costs no more
+        than the first.
+        """
+        sql, params = _filtered_query(sql, params, search, search_columns)
+        if order_by:
+            if key is None:
+                sql = f"SELECT *, ROW_NUMBER() OVER () AS {_SCAN_ROW} FROM ({sql})"
+                key = _SCAN_ROW
+            elif after is not None:
+                cond, values = _seek(order_by, key, after, descending)
+                sql = f"SELECT * FROM ({sql}) WHERE {cond}"
+                params += values
+                offset = 0
+            direction = "DESC" if descending else "ASC"
+            sql += f" ORDER BY {_quote(order_by)} {direction}, {_quote(key)} {direction}"
+        try:
+            return self.conn.execute(f"{sql} LIMIT ? OFFSET ?", [*params, limit, offset]).fetchall()
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Failed to fetch rows: {exc}") from exc
+
+
+# Tiebreaker numbering rows of queries with no key column
+_SCAN_ROW = "_scan_row"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _seek(order_by: str, key: str, after: Tuple[Any, Any], descending: bool) -> Tuple[str, List[Any]]:
+    """Condition for rows sorting after ``after`` by ``order_by`` then ``key``.
+
+    SQLite sorts NULLs first ascending and last descending.
+    """
+    col, k = _quote(order_by), _quote(key)
+    value, key_value = after
+    if descending:
+        if value is None:
+            return f"{col} IS NULL AND {k} < ?", [key_value]
+        return f"({col} < ? OR {col} IS NULL OR ({col} = ? AND {k} < ?))", [value, value, key_value]
+    if value is None:
+        return f"({col} IS NOT NULL OR {k} > ?)", [key_value]
+    return f"({col} > ? OR ({col} = ? AND {k} > ?))", [value, value, key_value]
+
+
+def _filtered_query(
+    sql: str, params: Iterable[Any], search: str = "", search_columns: Iterable[str] = ()
+) -> Tuple[str, List[Any]]:
+    """Wrap a SELECT so it can be filtered, counted and paged."""
+    sql = sql.strip().rstrip(";")
+    if not sql.lower().startswith("select"):
+        raise ValueError("Only SELECT queries are allowed")
+    sql = f"SELECT * FROM ({sql})"
+    params = list(params)
+    columns = list(search_columns)
+    if search and columns:
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql += " WHERE " + " OR ".join(f"{_quote(c)} LIKE ? ESCAPE '\\'" for c in columns)
+        params += [pattern] * len(columns)
+    return sql, params
+
 
 CREATE_TABLE_QUERIES = [
     """CREATE TABLE IF NOT EXISTS Users(
@@ -477,7 +1259,9 @@ CREATE_TABLE_QUERIES = [
     """CREATE TABLE IF NOT EXISTS Items(
         item_id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL UNIQUE,
-        item_code TEXT NOT NULL UNIQUE
+        item_code TEXT NOT NULL UNIQUE,
+        hsn_code TEXT NOT NULL DEFAULT '',
+        gst_rate REAL NOT NULL DEFAULT 0
     )""",
     """CREATE TABLE IF NOT EXISTS Inventory(
         inventory_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -504,6 +1288,8 @@ CREATE_TABLE_QUERIES = [
         subtotal REAL NOT NULL,
         total_amount REAL NOT NULL,
         is_credit INTEGER NOT NULL DEFAULT 0,
+        amount_paid REAL NOT NULL DEFAULT 0,
+        balance_due REAL NOT NULL DEFAULT 0,
         FOREIGN KEY(customer_id) REFERENCES Customers(customer_id)
     )""",
     """CREATE TABLE IF NOT EXISTS InvoiceItems(
@@ -515,6 +1301,7 @@ CREATE_TABLE_QUERIES = [
         quantity REAL NOT NULL,
         unit_price REAL NOT NULL,
         line_total REAL NOT NULL,
+        unit_cost REAL,
         FOREIGN KEY(inv_id) REFERENCES Invoices(inv_id),
         FOREIGN KEY(item_id) REFERENCES Items(item_id),
         FOREIGN KEY(customer_id) REFERENCES Customers(customer_id),
@@ -537,5 +1324,100 @@ CREATE_TABLE_QUERIES = [
         received INTEGER NOT NULL DEFAULT 1,
         FOREIGN KEY(customer_id) REFERENCES Customers(customer_id)
     )""",
+    """CREATE TABLE IF NOT EXISTS PaymentAllocations(
+        allocation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        payment_id INTEGER NOT NULL,
+        inv_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        FOREIGN KEY(payment_id) REFERENCES Payments(payment_id),
+        FOREIGN KEY(inv_id) REFERENCES Invoices(inv_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS InvoiceTaxLines(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        inv_id INTEGER NOT NULL,
+        line_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        hsn_code TEXT NOT NULL DEFAULT '',
+        rate REAL NOT NULL,
+        taxable_value REAL NOT NULL,
+        tax_amount REAL NOT NULL,
+        FOREIGN KEY(inv_id) REFERENCES Invoices(inv_id),
+        FOREIGN KEY(line_id) REFERENCES InvoiceItems(id)
+    )""",
+    # Price of every saved line, keyed for last-price lookups
+    """CREATE TABLE IF NOT EXISTS PriceHistory(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        price REAL NOT NULL,
+        inv_id INTEGER,
+        FOREIGN KEY(item_id) REFERENCES Items(item_id),
+        FOREIGN KEY(customer_id) REFERENCES Customers(customer_id)
+    )""",
+    # Statement lines already turned into payments, keyed by content hash
+    """CREATE TABLE IF NOT EXISTS BankStatementLines(
+        line_hash TEXT PRIMARY KEY,
+        payment_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        amount REAL NOT NULL,
+        narration TEXT NOT NULL DEFAULT '',
+        reference TEXT NOT NULL DEFAULT '',
+        FOREIGN KEY(payment_id) REFERENCES Payments(payment_id)
+    )""",
+    # Audit trail of stock-take corrections
+    """CREATE TABLE IF NOT EXISTS StockAdjustments(
+        adjustment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL,
+        system_qty REAL NOT NULL,
+        counted_qty REAL NOT NULL,
+        adjustment REAL NOT NULL,
+        price_excl_tax REAL NOT NULL,
+        reference TEXT NOT NULL DEFAULT '',
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY(item_id) REFERENCES Items(item_id),
+        FOREIGN KEY(customer_id) REFERENCES Customers(customer_id)
+    )""",
+    # Sold-out price rows moved out of Inventory by compact_inventory
+    """CREATE TABLE IF NOT EXISTS InventoryHistory(
+        inventory_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        price_excl_tax REAL NOT NULL,
+        archived_at TEXT NOT NULL DEFAULT (date('now'))
+    )""",
 ]
 
+# Columns added after the first release, applied to existing databases.
+COLUMN_MIGRATIONS: list[tuple[str, str, str]] = [
+    ("Invoices", "amount_paid", "REAL NOT NULL DEFAULT 0"),
+    ("Invoices", "balance_due", "REAL NOT NULL DEFAULT 0"),
+    ("InvoiceItems", "unit_cost", "REAL"),
+    ("Items", "hsn_code", "TEXT NOT NULL DEFAULT ''"),
+    ("Items", "gst_rate", "REAL NOT NULL DEFAULT 0"),
+]
+
+CREATE_INDEX_QUERIES = [
+    "CREATE INDEX IF NOT EXISTS idx_invoices_customer_date ON Invoices(customer_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_customer_date ON Payments(customer_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_date ON Payments(date)",
+    "CREATE INDEX IF NOT EXISTS idx_invoices_type_date ON Invoices(type, date)",
+    "CREATE INDEX IF NOT EXISTS idx_invoice_items_inv ON InvoiceItems(inv_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tax_lines_period ON InvoiceTaxLines(type, date, rate, hsn_code)",
+    # Only unsettled invoices are indexed, so open bills are a short range scan
+    "CREATE INDEX IF NOT EXISTS idx_invoices_open ON Invoices(customer_id, date, inv_id) WHERE balance_due > 0",
+    "CREATE INDEX IF NOT EXISTS idx_allocations_payment ON PaymentAllocations(payment_id)",
+    "CREATE INDEX IF NOT EXISTS idx_allocations_invoice ON PaymentAllocations(inv_id)",
+    "CREATE INDEX IF NOT EXISTS idx_price_history_lookup ON PriceHistory(item_id, customer_id, type, date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_stock_adjustments_item ON StockAdjustments(item_id, customer_id, date)",
+    # Compaction candidates only, so finding them does not scan live stock
+    "CREATE INDEX IF NOT EXISTS idx_inventory_empty ON Inventory(inventory_id) WHERE stock_qty = 0",
+    "CREATE INDEX IF NOT EXISTS idx_inventory_history_item ON InventoryHistory(item_id, customer_id)",
+    """CREATE VIEW IF NOT EXISTS OpenInvoices AS
+       SELECT inv_id, customer_id, date, type, total_amount, balance_due
+       FROM Invoices WHERE balance_due > 0""",
+]
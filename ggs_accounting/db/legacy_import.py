@@ -0,0 +1,417 @@
+"""Bulk import of history exported from the legacy MS Access database.
+
+Each Access table is exported to ``<Table>.csv`` (Customers, Items,
+Inventory, Invoices, InvoiceItems, Payments). Rows are first copied into
+``_stage_<Table>`` tables and then moved into the live tables in batches,
+with secondary indexes dropped until the end. Progress is committed with
+every batch, so an interrupted import continues where it stopped when run
+again.
+
+Run with ``python -m ggs_accounting.db.legacy_import EXPORT_DIR [--db PATH]``.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ggs_accounting.db.db_manager import CREATE_INDEX_QUERIES, DatabaseManager
+
+_REQUIRED = object()
+
+# Target column, parser and default (``_REQUIRED`` rejects rows without it).
+ColumnSpec = Tuple[str, Callable[[str], Any], Any]
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _int(value: str) -> int:
+    return int(float(value.replace(",", "")))
+
+
+def _float(value: str) -> float:
+    return float(value.replace(",", "").replace("₹", ""))
+
+
+def _bool(value: str) -> int:
+    # Access exports Yes/No fields as True/False or -1/0
+    return int(value.strip().lower() in ("1", "-1", "true", "yes", "y"))
+
+
+def _inv_type(value: str) -> str:
+    kind = value.strip().lower()
+    if kind.startswith("s"):
+        return "Sale"
+    if kind.startswith("p"):
+        return "Purchase"
+    raise ValueError(f"unknown invoice type {value!r}")
+
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y", "%d-%b-%Y")
+_DAYFIRST_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y", "%d-%b-%Y")
+
+
+def _date_parser(dayfirst: bool) -> Callable[[str], str]:
+    formats = _DAYFIRST_FORMATS if dayfirst else _DATE_FORMATS
+
+    # History spans a few thousand distinct days, so parse each one once.
+    @lru_cache(maxsize=65536)
+    def parse(value: str) -> str:
+        value = value.strip()
+        for fmt in formats:
+            try:
+                return datetime.strptime(value, fmt).date().isoformat()
+            except ValueError:
+                continue
+        raise ValueError(f"unreadable date {value!r}")
+
+    return parse
+
+
+def table_specs(dayfirst: bool = False) -> Dict[str, Tuple[ColumnSpec, ...]]:
+    """Columns read for each table, in import order."""
+    date = _date_parser(dayfirst)
+    return {
+        "Customers": (
+            ("customer_id", _int, _REQUIRED),
+            ("name", _text, _REQUIRED),
+            ("contact_info", _text, None),
+            ("customer_type", _text, "Buyer"),
+            ("balance", _float, 0.0),
+        ),
+        "Items": (
+            ("item_id", _int, _REQUIRED),
+            ("name", _text, _REQUIRED),
+            ("item_code", _text, None),
+            ("hsn_code", _text, ""),
+            ("gst_rate", _float, 0.0),
+        ),
+        "Inventory": (
+            ("customer_id", _int, _REQUIRED),
+            ("item_id", _int, _REQUIRED),
+            ("price_excl_tax", _float, _REQUIRED),
+            ("stock_qty", _float, 0.0),
+        ),
+        "Invoices": (
+            ("inv_id", _int, _REQUIRED),
+            ("date", date, _REQUIRED),
+            ("type", _inv_type, _REQUIRED),
+            ("customer_id", _int, None),
+            ("subtotal", _float, None),
+            ("total_amount", _float, _REQUIRED),
+            ("is_credit", _bool, 0),
+            ("amount_paid", _float, 0.0),
+        ),
+        "InvoiceItems": (
+            ("inv_id", _int, _REQUIRED),
+            ("item_id", _int, _REQUIRED),
+            ("customer_id", _int, None),
+            ("source_id", _int, None),
+            ("quantity", _float, _REQUIRED),
+            ("unit_price", _float, _REQUIRED),
+            ("line_total", _float, None),
+        ),
+        "Payments": (
+            ("payment_id", _int, None),
+            ("customer_id", _int, _REQUIRED),
+            ("date", date, _REQUIRED),
+            ("amount", _float, _REQUIRED),
+            ("received", _bool, 1),
+        ),
+    }
+
+
+# Select expressions used when moving staged rows; other columns copy as is.
+LOAD_EXPRESSIONS: Dict[str, Dict[str, str]] = {
+    "Items": {"item_code": "COALESCE(s.item_code, 'I' || s.item_id)"},
+    "Invoices": {"subtotal": "COALESCE(s.subtotal, s.total_amount)"},
+    "InvoiceItems": {
+        "customer_id": "COALESCE(s.customer_id, (SELECT customer_id FROM Invoices WHERE inv_id = s.inv_id))",
+        "line_total": "COALESCE(s.line_total, s.quantity * s.unit_price)",
+    },
+}
+
+PROGRESS_TABLE = "_ImportProgress"
+REJECTS_TABLE = "_ImportRejects"
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _rate(rows: int, seconds: float) -> str:
+    return f"{rows:,} rows in {seconds:.1f}s ({rows / seconds if seconds else 0:,.0f} rows/s)"
+
+
+class LegacyImporter:
+    """Stage and load exported Access tables into a :class:`DatabaseManager`."""
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        source: Path,
+        *,
+        batch_size: int = 50_000,
+        mapping: Optional[Mapping[str, Mapping[str, str]]] = None,
+        dayfirst: bool = False,
+        encoding: str = "utf-8-sig",
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self._db = db
+        self._source = Path(source)
+        self._batch = batch_size
+        self._mapping = {t: {_key(k): v for k, v in cols.items()} for t, cols in (mapping or {}).items()}
+        self._specs = table_specs(dayfirst)
+        self._encoding = encoding
+        self._log = log
+
+    # ---- bookkeeping ----
+    def _prepare(self) -> None:
+        conn = self._db.conn
+        conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE}(
+                tbl TEXT PRIMARY KEY, staged INTEGER NOT NULL DEFAULT 0,
+                staged_done INTEGER NOT NULL DEFAULT 0, loaded INTEGER NOT NULL DEFAULT 0,
+                loaded_done INTEGER NOT NULL DEFAULT 0)"""
+        )
+        conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {REJECTS_TABLE}(
+                tbl TEXT NOT NULL, line INTEGER NOT NULL, error TEXT NOT NULL)"""
+        )
+        started = conn.execute(f"SELECT COUNT(*) FROM {PROGRESS_TABLE}").fetchone()[0]
+        if not started:
+            for table in self._specs:
+                if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                    raise RuntimeError(f"{table} already holds data; import into a new database")
+            conn.executemany(
+                f"INSERT INTO {PROGRESS_TABLE} (tbl) VALUES (?)", [(t,) for t in self._specs]
+            )
+        for table, columns in self._specs.items():
+            cols = ", ".join(name for name, _parse, _default in columns)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS _stage_{table}(line INTEGER NOT NULL, {cols})")
+        conn.commit()
+
+    def _progress(self, table: str) -> sqlite3.Row:
+        return self._db.conn.execute(f"SELECT * FROM {PROGRESS_TABLE} WHERE tbl=?", (table,)).fetchone()
+
+    def _source_file(self, table: str) -> Optional[Path]:
+        for path in self._source.glob("*.csv"):
+            if path.stem.lower() == table.lower():
+                return path
+        return None
+
+    # ---- staging ----
+    def _column_positions(self, table: str, header: Sequence[str]) -> List[Optional[int]]:
+        overrides = self._mapping.get(table, {})
+        positions: Dict[str, int] = {}
+        for pos, name in enumerate(header):
+            target = overrides.get(_key(name), name)
+            positions.setdefault(_key(target), pos)
+        result: List[Optional[int]] = []
+        for name, _parse, default in self._specs[table]:
+            pos = positions.get(_key(name))
+            if pos is None and default is _REQUIRED:
+                raise ValueError(f"{table}: no column for {name} in {list(header)}")
+            result.append(pos)
+        return result
+
+    def _convert(self, table: str, positions: List[Optional[int]], row: Sequence[str]) -> List[Any]:
+        values: List[Any] = []
+        for (name, parse, default), pos in zip(self._specs[table], positions):
+            raw = row[pos] if pos is not None and pos < len(row) else ""
+            if raw.strip() == "":
+                if default is _REQUIRED:
+                    raise ValueError(f"missing {name}")
+                values.append(default)
+            else:
+                values.append(parse(raw))
+        return values
+
+    def stage(self, table: str) -> int:
+        """Copy the table's CSV into its staging table; returns rows staged now."""
+        progress = self._progress(table)
+        if progress["staged_done"]:
+            return 0
+        path = self._source_file(table)
+        conn = self._db.conn
+        if path is None:
+            self._log(f"{table}: no export found, skipped")
+            conn.execute(f"UPDATE {PROGRESS_TABLE} SET staged_done=1, loaded_done=1 WHERE tbl=?", (table,))
+            conn.commit()
+            return 0
+        done = progress["staged"]
+        marks = ", ".join("?" * (len(self._specs[table]) + 1))
+        start = time.perf_counter()
+        staged = 0
+        with path.open(newline="", encoding=self._encoding) as fh:
+            reader = csv.reader(fh)
+            positions = self._column_positions(table, next(reader))
+            line = done
+            rows = islice(reader, done, None)
+            while True:
+                chunk = list(islice(rows, self._batch))
+                if not chunk:
+                    break
+                good: List[List[Any]] = []
+                bad: List[Tuple[str, int, str]] = []
+                for raw in chunk:
+                    line += 1
+                    try:
+                        good.append([line] + self._convert(table, positions, raw))
+                    except (ValueError, IndexError) as exc:
+                        bad.append((table, line, str(exc)))
+                conn.executemany(f"INSERT INTO _stage_{table} VALUES ({marks})", good)
+                conn.executemany(f"INSERT INTO {REJECTS_TABLE} VALUES (?, ?, ?)", bad)
+                conn.execute(f"UPDATE {PROGRESS_TABLE} SET staged=? WHERE tbl=?", (line, table))
+                conn.commit()
+                staged += len(chunk)
+        conn.execute(f"UPDATE {PROGRESS_TABLE} SET staged_done=1 WHERE tbl=?", (table,))
+        conn.commit()
+        self._log(f"{table}: staged {_rate(staged, time.perf_counter() - start)}")
+        return staged
+
+    # ---- loading ----
+    def _insert_sql(self, table: str) -> str:
+        names = [name for name, _parse, _default in self._specs[table]]
+        exprs = [LOAD_EXPRESSIONS.get(table, {}).get(name, f"s.{name}") for name in names]
+        return (
+            f"INSERT INTO {table} ({', '.join(names)}) "
+            f"SELECT {', '.join(exprs)} FROM _stage_{table} AS s"
+        )
+
+    def load(self, table: str) -> int:
+        """Move staged rows into the live table; returns rows loaded now."""
+        progress = self._progress(table)
+        if progress["loaded_done"]:
+            return 0
+        conn = self._db.conn
+        insert = self._insert_sql(table)
+        last = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM _stage_{table}").fetchone()[0]
+        position = progress["loaded"]
+        start = time.perf_counter()
+        loaded = 0
+        while position < last:
+            upper = position + self._batch
+            try:
+                cur = conn.execute(f"{insert} WHERE s.rowid > ? AND s.rowid <= ?", (position, upper))
+                loaded += cur.rowcount
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                loaded += self._load_rows(table, insert, position, upper)
+            conn.execute(f"UPDATE {PROGRESS_TABLE} SET loaded=? WHERE tbl=?", (upper, table))
+            conn.commit()
+            position = upper
+        conn.execute(f"UPDATE {PROGRESS_TABLE} SET loaded_done=1 WHERE tbl=?", (table,))
+        conn.commit()
+        self._log(f"{table}: loaded {_rate(loaded, time.perf_counter() - start)}")
+        return loaded
+
+    def _load_rows(self, table: str, insert: str, low: int, high: int) -> int:
+        """Row by row fallback for a batch holding constraint violations."""
+        conn = self._db.conn
+        loaded = 0
+        staged = conn.execute(
+            f"SELECT rowid, line FROM _stage_{table} WHERE rowid > ? AND rowid <= ?", (low, high)
+        ).fetchall()
+        for rowid, line in staged:
+            try:
+                conn.execute(f"{insert} WHERE s.rowid = ?", (rowid,))
+                loaded += 1
+            except sqlite3.IntegrityError as exc:
+                conn.execute(f"INSERT INTO {REJECTS_TABLE} VALUES (?, ?, ?)", (table, line, str(exc)))
+        return loaded
+
+    # ---- indexes and derived data ----
+    def _secondary_indexes(self) -> List[str]:
+        names = []
+        for query in CREATE_INDEX_QUERIES:
+            match = re.match(r"\s*CREATE INDEX IF NOT EXISTS (\w+) ON (\w+)", query)
+            if match and match.group(2) in self._specs:
+                names.append(match.group(1))
+        return names
+
+    def _finish(self) -> None:
+        db = self._db
+        start = time.perf_counter()
+        for query in CREATE_INDEX_QUERIES:
+            db.conn.execute(query)
+        db.conn.commit()
+        self._log(f"indexes rebuilt in {time.perf_counter() - start:.1f}s")
+        db.rebuild_after_import()
+        orphans = db.conn.execute("PRAGMA foreign_key_check").fetchall()
+        if orphans:
+            self._log(f"warning: {len(orphans)} rows reference missing parents")
+        for table in self._specs:
+            db.conn.execute(f"DROP TABLE IF EXISTS _stage_{table}")
+        db.conn.execute(f"DROP TABLE IF EXISTS {PROGRESS_TABLE}")
+        db.conn.commit()
+
+    def run(self) -> Dict[str, int]:
+        """Import every table and return the rejected line count per table."""
+        conn = self._db.conn
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("PRAGMA cache_size = -200000")
+        try:
+            self._prepare()
+            for table in self._specs:
+                self.stage(table)
+            for name in self._secondary_indexes():
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+            for table in self._specs:
+                self.load(table)
+            self._finish()
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+        rejects = {
+            row[0]: row[1]
+            for row in conn.execute(f"SELECT tbl, COUNT(*) FROM {REJECTS_TABLE} GROUP BY tbl")
+        }
+        for table, count in rejects.items():
+            self._log(f"{table}: {count} lines rejected, see {REJECTS_TABLE}")
+        return rejects
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import CSV exports of the legacy Access database.")
+    parser.add_argument("source", type=Path, help="directory holding <Table>.csv exports")
+    parser.add_argument("--db", type=Path, default=None, help="target database (default: app database)")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--mapping", type=Path, help='JSON {"Table": {"AccessColumn": "column"}}')
+    parser.add_argument("--dayfirst", action="store_true", help="dates are DD/MM/YYYY")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    mapping = json.loads(args.mapping.read_text()) if args.mapping else None
+    db = DatabaseManager(args.db)
+    db.init_db()
+    importer = LegacyImporter(
+        db,
+        args.source,
+        batch_size=args.batch_size,
+        mapping=mapping,
+        dayfirst=args.dayfirst,
+        encoding=args.encoding,
+    )
+    start = time.perf_counter()
+    try:
+        importer.run()
+    except (RuntimeError, ValueError, sqlite3.Error) as exc:
+        print(f"Import stopped: {exc}. Run again to resume.")
+        return 1
+    print(f"Import finished in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import re
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+# Words banks add to narrations that never identify the party.
+NOISE_WORDS = frozenset(
+    "NEFT IMPS RTGS UPI TRF TRANSFER FROM TO BY CR DR MR MRS MS M S SHRI SMT LTD PVT CO "
+    "AND THE PAYMENT PAYMENTS REF NO ACCOUNT AC A C CASH DEP DEPOSIT CHQ CHEQUE CLG".split()
+)
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%b-%Y", "%d %b %Y")
+MAX_NAME_WORDS = 6
+_INVOICE_REF = re.compile(r"\b(?:INV|INVOICE|BILL)\s*[#:/-]?\s*(\d+)\b", re.IGNORECASE)
+
+# Header aliases after normalisation (lower case, letters and digits only).
+_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "date": ("date", "txndate", "transactiondate", "valuedate", "postdate"),
+    "narration": ("narration", "description", "particulars", "details", "remarks"),
+    "reference": ("reference", "ref", "refno", "chqrefno", "chequeno", "chqno", "utr"),
+    "credit": ("credit", "deposit", "deposits", "creditamount", "cr"),
+    "debit": ("debit", "withdrawal", "withdrawals", "debitamount", "dr"),
+    "amount": ("amount", "txnamount"),
+}
+
+
+def name_tokens(text: str) -> Tuple[str, ...]:
+    """Upper-case alphanumeric words of ``text`` without banking noise."""
+    words = re.findall(r"[A-Z0-9]+", text.upper())
+    return tuple(w for w in words if w not in NOISE_WORDS and not w.isdigit())
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _amount(text: str) -> float:
+    cleaned = text.replace(",", "").replace("₹", "").strip()
+    return float(cleaned) if cleaned else 0.0
+
+
+def _date(text: str) -> str:
+    text = text.strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unreadable statement date {text!r}")
+
+
+def read_statement(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Parse a bank statement CSV into dated, signed lines.
+
+    Credits (money in) come back with ``received`` set. A statement may use
+    separate credit/debit columns or one signed amount column.
+    """
+    lines: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = defaultdict(int)
+    with Path(path).open(newline="", encoding="utf-8-sig") as fh:
+        reader = csv.reader(fh)
+        header = [_key(h) for h in next(reader)]
+        cols = {
+            field: next((header.index(a) for a in aliases if a in header), None)
+            for field, aliases in _COLUMNS.items()
+        }
+        if cols["date"] is None or (cols["amount"] is None and cols["credit"] is None):
+            raise ValueError("Statement needs a date column and an amount or credit column")
+
+        def cell(row: List[str], field: str) -> str:
+            pos = cols[field]
+            return row[pos] if pos is not None and pos < len(row) else ""
+
+        for row in reader:
+            if not any(c.strip() for c in row):
+                continue
+            if cols["amount"] is not None:
+                signed = _amount(cell(row, "amount"))
+            else:
+                signed = _amount(cell(row, "credit")) - _amount(cell(row, "debit"))
+            if abs(signed) < 0.005:
+                continue
+            line = {
+                "date": _date(cell(row, "date")),
+                "narration": cell(row, "narration").strip(),
+                "reference": cell(row, "reference").strip(),
+                "amount": round(abs(signed), 2),
+                "received": signed > 0,
+            }
+            base = f"{line['date']}|{signed:.2f}|{line['reference']}|{line['narration']}"
+            # Identical lines on one day are separate transactions
+            seen[base] += 1
+            line["line_hash"] = hashlib.sha1(f"{base}|{seen[base]}".encode()).hexdigest()
+            lines.append(line)
+    return lines
+
+
+class PaymentMatcher:
+    """Hash indexes for matching statement lines to parties.
+
+    Built once per import: party names by their word sequence, open invoices by id and by
+    outstanding amount, and the hashes of lines already imported.
+    """
+
+    def __init__(self, db: DatabaseManager) -> None:
+        self._db = db
+        self.names: Dict[int, str] = {}
+        self._by_name: Dict[Tuple[str, ...], Set[int]] = defaultdict(set)
+        self._invoices: Dict[int, Tuple[int, str, float]] = {}
+        self._by_amount: Dict[Tuple[str, int], Set[Tuple[int, int]]] = defaultdict(set)
+        self._imported: Set[str] = set()
+        self._build()
+
+    def _build(self) -> None:
+        conn = self._db.conn
+        try:
+            for cid, name in conn.execute("SELECT customer_id, name FROM Customers"):
+                self.names[cid] = name
+                tokens = name_tokens(name)
+                if not tokens:
+                    continue
+                self._by_name[tokens].add(cid)
+            for inv_id, cid, inv_type, due in conn.execute(
+                "SELECT inv_id, customer_id, type, balance_due FROM OpenInvoices"
+            ):
+                self._invoices[inv_id] = (cid, inv_type, due)
+                self._by_amount[(inv_type, round(due * 100))].add((cid, inv_id))
+            self._imported = {r[0] for r in conn.execute("SELECT line_hash FROM BankStatementLines")}
+        except Exception as exc:
+            raise RuntimeError(f"Failed to build payment matcher: {exc}") from exc
+
+    def _name_match(self, text: str) -> Set[int]:
+        """Parties named by the longest run of words in ``text``.
+
+        Every contiguous run of up to ``MAX_NAME_WORDS`` tokens is looked up
+        in the name index, so the cost does not grow with the party count.
+        """
+        tokens = name_tokens(text)
+        for size in range(min(len(tokens), MAX_NAME_WORDS), 0, -1):
+            found: Set[int] = set()
+            for start in range(len(tokens) - size + 1):
+                found |= self._by_name.get(tokens[start:start + size], set())
+            if found:
+                return found
+        return set()
+
+    def match(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``line`` with a proposed ``customer_id``, ``inv_id`` and ``method``."""
+        settles = "Sale" if line["received"] else "Purchase"
+        result = dict(line, customer_id=None, inv_id=None, method="", duplicate=False)
+        if line["line_hash"] in self._imported:
+            result.update(duplicate=True, method="Already imported")
+            return result
+        text = f"{line['narration']} {line['reference']}"
+        for ref in _INVOICE_REF.findall(text):
+            inv = self._invoices.get(int(ref))
+            if inv and inv[1] == settles:
+                result.update(customer_id=inv[0], inv_id=int(ref), method="Reference")
+                return result
+        named = self._name_match(text)
+        by_amount = self._by_amount.get((settles, round(line["amount"] * 100)), set())
+        if len(named) == 1:
+            cid = next(iter(named))
+            invoices = [inv for c, inv in by_amount if c == cid]
+            result.update(customer_id=cid, method="Name")
+            if len(invoices) == 1:
+                result.update(inv_id=invoices[0], method="Name+Amount")
+            return result
+        if named:
+            # Several parties share the name; an open bill of this amount decides
+            candidates = [(c, inv) for c, inv in by_amount if c in named]
+        else:
+            candidates = list(by_amount)
+        if len({c for c, _inv in candidates}) == 1:
+            cid = candidates[0][0]
+            inv_id = candidates[0][1] if len(candidates) == 1 else None
+            result.update(customer_id=cid, inv_id=inv_id, method="Amount")
+        return result
+
+
+def propose_matches(db: DatabaseManager, lines: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Match every line; matched, new lines are proposed as ``accepted``."""
+    matcher = PaymentMatcher(db)
+    proposals = []
+    for line in lines:
+        proposal = matcher.match(line)
+        proposal["customer_name"] = matcher.names.get(proposal["customer_id"], "")
+        proposal["accepted"] = proposal["customer_id"] is not None and not proposal["duplicate"]
+        proposals.append(proposal)
+    return proposals
+
+
+def post_accepted(db: DatabaseManager, proposals: Iterable[Dict[str, Any]]) -> List[int]:
+    """Record the accepted proposals as payments; returns the new payment ids."""
+    accepted = [p for p in proposals if p.get("accepted") and p.get("customer_id") is not None]
+    return db.record_payments(accepted) if accepted else []
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Tuple
+
+
+def _clean(value: float) -> float:
+    # Adding and taking away line amounts leaves float dust; never show -0.00
+    return round(value, 6) or 0.0
+
+
+class BillTotals:
+    """Running totals of a bill while its lines are entered.
+
+    Each line's amount and tax are kept under a caller-chosen key. Changing
+    a line moves the sums by the difference, so an edit costs the same
+    however many lines the bill has. Tax is rounded to paise per line, as
+    :func:`~ggs_accounting.models.tax.compute_line_taxes` does when the
+    invoice is saved.
+    """
+
+    def __init__(self) -> None:
+        self._lines: Dict[Hashable, Tuple[float, float]] = {}
+        self._subtotal = 0.0
+        self._tax = 0.0
+        self.paid = 0.0
+
+    def set_line(self, key: Hashable, quantity: float, price: float, gst_rate: float = 0.0) -> bool:
+        """Add or update a line; returns False when its figures did not change."""
+        amount = quantity * price
+        tax = round(amount * gst_rate / 100.0, 2)
+        old = self._lines.get(key)
+        if old == (amount, tax):
+            return False
+        old_amount, old_tax = old or (0.0, 0.0)
+        self._lines[key] = (amount, tax)
+        self._subtotal += amount - old_amount
+        self._tax += tax - old_tax
+        return True
+
+    def remove_line(self, key: Hashable) -> None:
+        amount, tax = self._lines.pop(key, (0.0, 0.0))
+        self._subtotal -= amount
+        self._tax -= tax
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._subtotal = 0.0
+        self._tax = 0.0
+
+    def amount(self, key: Hashable) -> float:
+        return self._lines.get(key, (0.0, 0.0))[0]
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def subtotal(self) -> float:
+        return _clean(self._subtotal) if self._lines else 0.0
+
+    @property
+    def tax(self) -> float:
+        return _clean(self._tax) if self._lines else 0.0
+
+    @property
+    def total(self) -> float:
+        return _clean(self.subtotal + self.tax)
+
+    @property
+    def due(self) -> float:
+        return _clean(self.total - self.paid)
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 from datetime import date as _date
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.stock import StockIndex, StockMove, format_shortfalls
+
+# Called after a successful save as (inv_id, inv_type, date, customer_id, items).
+InvoiceListener = Callable[[int, str, str, Optional[int], List[Dict[str, Any]]], None]
 
 
 class InvoiceLogic:
     """Backend logic helper for billing operations."""
 
-    def __init__(self, db: DatabaseManager) -> None:
+    def __init__(self, db: DatabaseManager, stock: Optional[StockIndex] = None) -> None:
         self._db = db
+        self.stock = stock or StockIndex(db)
+        self._listeners: List[InvoiceListener] = []
+
+    def add_listener(self, listener: InvoiceListener) -> None:
+        """Register ``listener`` to be notified of every saved invoice."""
+        self._listeners.append(listener)
 
     def create_invoice(
         self,
@@ -25,15 +35,13 @@ class InvoiceLogic:
         if not items:
             raise ValueError("Invoice requires at least one item")
         date_str = date or _date.today().isoformat()
-        inv_id = self._db.create_invoice(
-            date_str,
-            inv_type,
-            customer_id,
-            items,
-            is_credit=is_credit,
-            amount_paid=amount_paid,
-        )
+        lines: List[Dict[str, Any]] = []
+        stock_moves: List[StockMove] = []
+        # Quantities each lot has given to earlier lines of this invoice
+        taken: Dict[int, float] = {}
         for item in items:
+            line = dict(item)
+            lines.append(line)
             item_id = item.get("item_id")
             if item_id is None:
                 # Fallback to lookup by name
@@ -45,28 +53,59 @@ class InvoiceLogic:
                     item_id = int(row["item_id"])
             if item_id is None:
                 continue
+            line["item_id"] = item_id
 
             # Determine which party's inventory is affected
             if inv_type == "Purchase":
                 party_id = item.get("customer_id")
-                change = item["quantity"]
-                price_excl_tax = item.get("price_excl_tax", item.get("price"))
+                lots = [(item.get("price_excl_tax", item.get("price")), item["quantity"])]
+                sign = 1
             else:
                 party_id = item.get("source_id")
-                change = -item["quantity"]
-                # Use the latest purchase price for this supplier when reducing stock
-                row = self._db.conn.execute(
-                    "SELECT price_excl_tax FROM Inventory WHERE item_id=? AND customer_id=? ORDER BY inventory_id DESC LIMIT 1",
-                    (item_id, party_id),
-                ).fetchone()
-                price_excl_tax = row["price_excl_tax"] if row else item.get("price_excl_tax", item.get("price"))
+                # Take from the supplier's lots newest first, none below zero
+                lots = self._db.split_stock(item_id, party_id, item["quantity"], taken) if party_id is not None else []
+                if not lots:
+                    lots = [(item.get("price_excl_tax", item.get("price")), item["quantity"])]
+                sign = -1
 
             if party_id is None:
                 raise RuntimeError("Missing inventory party reference")
 
-            if price_excl_tax is None:
+            if any(price is None for price, _qty in lots):
                 raise RuntimeError("Missing item price for inventory update")
 
-            self._db.update_item_stock(item_id, party_id, price_excl_tax, change)
+            # The stock prices double as the line's cost basis for margins
+            quantity = sum(qty for _price, qty in lots)
+            line["unit_cost"] = (
+                sum(price * qty for price, qty in lots) / quantity if quantity else lots[0][0]
+            )
+            stock_moves.extend((item_id, party_id, price, sign * qty) for price, qty in lots)
+
+        # Cheap check against the index first; create_invoice repeats it
+        # inside the write transaction in case the index is stale. The
+        # index can also be stale the other way (stock added behind its
+        # back), so a shortfall is only trusted once it has been reloaded.
+        short = self.stock.shortfalls(stock_moves)
+        if short:
+            self.stock.invalidate()
+            short = self.stock.shortfalls(stock_moves)
+        if short:
+            raise ValueError(format_shortfalls(self._db, short))
+        try:
+            inv_id = self._db.create_invoice(
+                date_str,
+                inv_type,
+                customer_id,
+                lines,
+                is_credit=is_credit,
+                amount_paid=amount_paid,
+                stock_moves=stock_moves,
+            )
+        except ValueError:
+            self.stock.invalidate()
+            raise
+        self.stock.apply(stock_moves)
+        for listener in self._listeners:
+            listener(inv_id, inv_type, date_str, customer_id, lines)
         return inv_id
 
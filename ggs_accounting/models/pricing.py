@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+# (item_id, party_id, inv_type)
+PriceKey = Tuple[int, int, str]
+
+
+class PriceSuggester:
+    """Last billed price per (item, party) with a small session LRU cache.
+
+    Misses fall through to :meth:`DatabaseManager.get_last_price`. Register
+    :meth:`on_invoice_saved` as an :class:`InvoiceLogic` listener so cached
+    entries do not outlive the bills that replace them.
+    """
+
+    def __init__(self, db: DatabaseManager, maxsize: int = 256) -> None:
+        self._db = db
+        self._maxsize = maxsize
+        self._cache: "OrderedDict[PriceKey, Optional[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def suggest(self, item_id: int, party_id: int, inv_type: str) -> Optional[float]:
+        key = (item_id, party_id, inv_type)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        price = self._db.get_last_price(item_id, party_id, inv_type)
+        self._store(key, price)
+        return price
+
+    def _store(self, key: PriceKey, price: Optional[float]) -> None:
+        self._cache[key] = price
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+    def on_invoice_saved(
+        self,
+        inv_id: int,
+        inv_type: str,
+        date: str,
+        customer_id: Optional[int],
+        items: List[Dict[str, Any]],
+    ) -> None:
+        for item in items:
+            party_id = item.get("customer_id") or customer_id
+            if item.get("item_id") is None or party_id is None:
+                continue
+            key = (int(item["item_id"]), int(party_id), inv_type)
+            # A back-dated bill need not be the latest price, so drop the
+            # entry and let the next suggestion read it again.
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def preview_price_revision(
+    db: DatabaseManager,
+    *,
+    item_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    code_pattern: Optional[str] = None,
+    percent: Optional[float] = None,
+    amount: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Return the inventory rows a revision would change with old and new prices.
+
+    Rows are selected by item, grower and/or an item code ``LIKE`` pattern.
+    Exactly one of ``percent`` or ``amount`` gives the change; new prices
+    are rounded to paise. Raises ``ValueError`` when a price would drop to
+    zero or two rows of one grower's item would end up at the same price.
+    """
+    if (percent is None) == (amount is None):
+        raise ValueError("Give either a percentage or an absolute change")
+    factor = 1 + (percent or 0.0) / 100.0
+    delta = amount or 0.0
+    sql = """
+        SELECT Inventory.inventory_id, Inventory.item_id, Items.name, Items.item_code,
+               Inventory.customer_id, Customers.name AS customer_name,
+               Inventory.price_excl_tax AS old_price,
+               ROUND(Inventory.price_excl_tax * ? + ?, 2) AS new_price
+        FROM Inventory
+        JOIN Items ON Items.item_id = Inventory.item_id
+        JOIN Customers ON Customers.customer_id = Inventory.customer_id
+        WHERE 1 = 1
+    """
+    params: List[Any] = [factor, delta]
+    if item_id is not None:
+        sql += " AND Inventory.item_id = ?"
+        params.append(item_id)
+    if customer_id is not None:
+        sql += " AND Inventory.customer_id = ?"
+        params.append(customer_id)
+    if code_pattern:
+        sql += " AND Items.item_code LIKE ?"
+        params.append(code_pattern)
+    sql += " ORDER BY Items.name, Customers.name, Inventory.price_excl_tax"
+    try:
+        rows = [dict(r) for r in db.conn.execute(sql, params)]
+    except sqlite3.Error as exc:
+        raise RuntimeError(f"Failed to preview price revision: {exc}") from exc
+    rows = [r for r in rows if r["new_price"] != r["old_price"]]
+    _check_revision(db, rows)
+    return rows
+
+
+def _check_revision(db: DatabaseManager, rows: List[Dict[str, Any]]) -> None:
+    if any(r["new_price"] <= 0 for r in rows):
+        raise ValueError("Revision would make some prices zero or negative")
+    changed = {r["inventory_id"] for r in rows}
+    final: Dict[Tuple[int, int, float], int] = {}
+    for r in rows:
+        final[(r["item_id"], r["customer_id"], r["new_price"])] = r["inventory_id"]
+    if len(final) < len(rows):
+        raise ValueError("Revision would give two lots of one item the same price")
+    # Rows left as they are keep their price; a revised row may not land on it.
+    for inv_id, item, party, price in db.conn.execute(
+        "SELECT inventory_id, item_id, customer_id, price_excl_tax FROM Inventory"
+    ):
+        if inv_id not in changed and (item, party, price) in final:
+            raise ValueError("Revision would give two lots of one item the same price")
+
+
+def apply_price_revision(db: DatabaseManager, rows: Iterable[Dict[str, Any]]) -> int:
+    """Apply previewed rows; returns the number of inventory rows changed."""
+    return db.apply_price_changes((r["inventory_id"], r["new_price"]) for r in rows)
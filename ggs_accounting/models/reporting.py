@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 
 from ggs_accounting.db.db_manager import DatabaseManager
 
@@ -36,55 +36,75 @@ def run_query(db: DatabaseManager, sql: str) -> Tuple[List[str], List[tuple]]:
     return db.run_raw_query(sql)
 
 
-def get_customer_balances(db: DatabaseManager) -> List[Dict[str, Any]]:
+CUSTOMER_BALANCES_SQL = """
+    SELECT customer_id, name, balance,
+           CASE WHEN balance > 0 THEN 'Receivable' WHEN balance < 0 THEN 'Payable' ELSE 'Settled' END AS status
+    FROM Customers
+"""
+
+
+def iter_customer_balances(db: DatabaseManager) -> Iterator[Dict[str, Any]]:
+    """Yield customer balances straight from the cursor."""
     cur = db.conn.cursor()
-    cur.execute("SELECT name, balance FROM Customers")
-    rows = cur.fetchall()
-    result: List[Dict[str, Any]] = []
-    for row in rows:
-        bal = float(row["balance"])
-        status = "Receivable" if bal > 0 else "Payable" if bal < 0 else "Settled"
-        result.append({"name": row["name"], "balance": bal, "status": status})
-    return result
+    cur.execute(CUSTOMER_BALANCES_SQL)
+    for row in cur:
+        yield {"name": row["name"], "balance": float(row["balance"]), "status": row["status"]}
 
 
-def get_inventory_values(
-    db: DatabaseManager,
+def get_customer_balances(db: DatabaseManager) -> List[Dict[str, Any]]:
+    return list(iter_customer_balances(db))
+
+
+def inventory_values_query(
     item_id: Optional[int] = None,
     customer_id: Optional[int] = None,
-) -> Tuple[List[Dict[str, Any]], float]:
-    """Return inventory valuations filtered by item or customer, using last purchase price."""
-    cur = db.conn.cursor()
-    cur.execute(
-        """
-        SELECT Inventory.stock_qty, Inventory.price_excl_tax,
-               Items.item_id, Items.name AS item_name,
-               Customers.customer_id, Customers.name AS customer_name
+) -> Tuple[str, List[Any]]:
+    """SQL and parameters for inventory valuations, one row per price lot."""
+    sql = """
+        SELECT Inventory.inventory_id, Items.item_id, Items.name,
+               Customers.customer_id, Customers.name AS customer_name,
+               Inventory.stock_qty AS stock, Inventory.price_excl_tax AS price,
+               Inventory.stock_qty * Inventory.price_excl_tax AS value
         FROM Inventory
         JOIN Items ON Inventory.item_id = Items.item_id
         JOIN Customers ON Inventory.customer_id = Customers.customer_id
-        """
-    )
-    rows = [dict(r) for r in cur.fetchall()]
+        WHERE 1 = 1
+    """
+    params: List[Any] = []
     if item_id is not None:
-        rows = [r for r in rows if r["item_id"] == item_id]
+        sql += " AND Inventory.item_id = ?"
+        params.append(item_id)
     if customer_id is not None:
-        rows = [r for r in rows if r["customer_id"] == customer_id]
+        sql += " AND Inventory.customer_id = ?"
+        params.append(customer_id)
+    return sql, params
 
-    data: List[Dict[str, Any]] = []
-    total_value = 0.0
 
-    for r in rows:
-        price = r["price_excl_tax"]
-        value = r["stock_qty"] * price
-        data.append({
+def iter_inventory_values(
+    db: DatabaseManager,
+    item_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield inventory valuations at the last purchase price, one row at a time."""
+    cur = db.conn.cursor()
+    cur.execute(*inventory_values_query(item_id, customer_id))
+    for r in cur:
+        yield {
             "item_id": r["item_id"],
-            "name": r["item_name"],
+            "name": r["name"],
             "customer_id": r["customer_id"],
             "customer_name": r["customer_name"],
-            "stock": r["stock_qty"],  # Use 'stock' key for UI compatibility
-            "price": price,
-            "value": value,
-        })
-        total_value += value
-    return data, total_value
+            "stock": r["stock"],  # Use 'stock' key for UI compatibility
+            "price": r["price"],
+            "value": r["value"],
+        }
+
+
+def get_inventory_values(
+    db: DatabaseManager,
+    item_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Return inventory valuations filtered by item or customer, using last purchase price."""
+    data = list(iter_inventory_values(db, item_id=item_id, customer_id=customer_id))
+    return data, sum(d["value"] for d in data)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - db_manager imports this module
+    from ggs_accounting.db.db_manager import DatabaseManager
+
+# (item_id, party_id, price_excl_tax, change) as applied to Inventory
+StockMove = Tuple[int, int, float, float]
+
+AVAILABILITY_SQL = """
+    SELECT item_id, customer_id, SUM(stock_qty)
+    FROM Inventory
+    GROUP BY item_id, customer_id
+"""
+
+# Quantities are REAL, so tolerate float noise when comparing.
+_EPSILON = 1e-9
+
+
+def required_quantities(moves: Iterable[StockMove]) -> Dict[Tuple[int, int], float]:
+    """Total quantity each ``(item_id, party_id)`` pair gives up in ``moves``."""
+    needed: Dict[Tuple[int, int], float] = defaultdict(float)
+    for item_id, party_id, _price, change in moves:
+        if change < 0:
+            needed[(item_id, party_id)] -= change
+    return dict(needed)
+
+
+class StockIndex:
+    """In-memory stock availability per ``(item, grower)``.
+
+    Quantities are summed across the price rows of ``Inventory``. The index
+    is read with one grouped query and then kept current by applying the
+    stock moves of each saved invoice, so a lookup is a dict access.
+    """
+
+    def __init__(self, db: "DatabaseManager") -> None:
+        self._db = db
+        self._available: Dict[Tuple[int, int], float] = {}
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> None:
+        try:
+            rows = self._db.conn.execute(AVAILABILITY_SQL).fetchall()
+        except Exception as exc:
+            raise RuntimeError(f"Failed to load stock availability: {exc}") from exc
+        self._available = {(int(r[0]), int(r[1])): float(r[2] or 0) for r in rows}
+        self._loaded = True
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def available(self, item_id: int, party_id: int) -> float:
+        self.ensure_loaded()
+        return self._available.get((item_id, party_id), 0.0)
+
+    def shortfalls(self, moves: Iterable[StockMove]) -> List[Tuple[int, int, float, float]]:
+        """Return ``(item_id, party_id, needed, available)`` for each short pair."""
+        self.ensure_loaded()
+        short = []
+        for (item_id, party_id), needed in required_quantities(moves).items():
+            have = self._available.get((item_id, party_id), 0.0)
+            if needed > have + _EPSILON:
+                short.append((item_id, party_id, needed, have))
+        return short
+
+    def apply(self, moves: Iterable[StockMove]) -> None:
+        """Record moves that have been committed to the database."""
+        if not self._loaded:
+            return
+        for item_id, party_id, _price, change in moves:
+            key = (item_id, party_id)
+            self._available[key] = self._available.get(key, 0.0) + change
+
+    def invalidate(self) -> None:
+        """Drop the cached quantities; the next lookup reloads them."""
+        self._loaded = False
+        self._available = {}
+
+
+def format_shortfalls(db: "DatabaseManager", short: Iterable[Tuple[int, int, float, float]]) -> str:
+    """Human readable message for :meth:`StockIndex.shortfalls` results."""
+    parts = []
+    for item_id, party_id, needed, have in short:
+        item = db.conn.execute("SELECT name FROM Items WHERE item_id=?", (item_id,)).fetchone()
+        party = db.conn.execute("SELECT name FROM Customers WHERE customer_id=?", (party_id,)).fetchone()
+        parts.append(
+            f"{item[0] if item else item_id} from {party[0] if party else party_id}: "
+            f"need {needed:g}, available {have:g}"
+        )
+    return "Insufficient stock - " + "; ".join(parts)
+
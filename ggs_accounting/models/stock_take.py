@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+import pandas as pd
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+COUNT_COLUMNS = ("item_code", "grower", "counted")
+
+# One pass over the sheet: codes and growers are resolved with joins and the
+# system quantity is summed across price rows of each (item, grower) pair.
+VARIANCE_SQL = """
+    WITH codes AS (
+        SELECT item_code, MIN(item_id) AS item_id, COUNT(*) AS matches
+        FROM Items GROUP BY item_code
+    ),
+    growers AS (
+        SELECT name, MIN(customer_id) AS customer_id, COUNT(*) AS matches
+        FROM Customers WHERE customer_type = 'Grower' GROUP BY name
+    ),
+    stock AS (
+        SELECT item_id, customer_id, SUM(stock_qty) AS system_qty,
+               MAX(inventory_id) AS latest_id
+        FROM Inventory GROUP BY item_id, customer_id
+    )
+    SELECT c.line, c.item_code, c.grower, c.counted,
+           codes.item_id, codes.matches AS code_matches, Items.name AS item_name,
+           growers.customer_id, growers.matches AS grower_matches,
+           COALESCE(stock.system_qty, 0) AS system_qty,
+           COALESCE(Inventory.price_excl_tax,
+                    (SELECT price_excl_tax FROM Inventory AS other
+                     WHERE other.item_id = codes.item_id
+                     ORDER BY other.inventory_id DESC LIMIT 1),
+                    0) AS price
+    FROM temp.stock_count AS c
+    LEFT JOIN codes ON codes.item_code = c.item_code
+    LEFT JOIN Items ON Items.item_id = codes.item_id
+    LEFT JOIN growers ON growers.name = c.grower
+    LEFT JOIN stock ON stock.item_id = codes.item_id AND stock.customer_id = growers.customer_id
+    LEFT JOIN Inventory ON Inventory.inventory_id = stock.latest_id
+    ORDER BY c.line
+"""
+
+
+def read_count_sheet(path: Union[str, Path]) -> pd.DataFrame:
+    """Load a count sheet with ``item_code``, ``grower`` and ``counted`` columns.
+
+    CSV and Excel files are accepted. Column names are matched case
+    insensitively; other columns are ignored.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        df = pd.read_excel(path, dtype={"item_code": str, "grower": str})
+    else:
+        df = pd.read_csv(path, dtype={"item_code": str, "grower": str})
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = [c for c in COUNT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Count sheet is missing columns: {', '.join(missing)}")
+    df = df[list(COUNT_COLUMNS)].copy()
+    df["item_code"] = df["item_code"].fillna("").astype(str).str.strip()
+    df["grower"] = df["grower"].fillna("").astype(str).str.strip()
+    df["counted"] = pd.to_numeric(df["counted"], errors="coerce")
+    return df
+
+
+def _status(row: Dict[str, Any]) -> str:
+    if row["counted"] is None or row["counted"] != row["counted"]:
+        return "Bad count"
+    if row["item_id"] is None:
+        return "Unknown item"
+    if row["code_matches"] > 1:
+        return "Ambiguous item"
+    if row["customer_id"] is None:
+        return "Unknown grower"
+    if row["grower_matches"] > 1:
+        return "Ambiguous grower"
+    return "OK"
+
+
+def compute_variances(db: DatabaseManager, counts: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Compare counted quantities with ``Inventory``.
+
+    Returns one row per sheet line with the system quantity, the variance
+    (counted minus system), its value at the latest lot price (any grower's
+    when the pair has no lot yet) and a status. Only ``OK`` rows are posted.
+    """
+    lines = [
+        (i, code, grower, None if pd.isna(qty) else float(qty))
+        for i, (code, grower, qty) in enumerate(
+            zip(counts["item_code"], counts["grower"], counts["counted"]), start=1
+        )
+    ]
+    cur = db.conn.cursor()
+    try:
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS stock_count("
+            "line INTEGER PRIMARY KEY, item_code TEXT, grower TEXT, counted REAL)"
+        )
+        cur.execute("DELETE FROM temp.stock_count")
+        cur.executemany("INSERT INTO temp.stock_count VALUES (?, ?, ?, ?)", lines)
+        rows = [dict(r) for r in cur.execute(VARIANCE_SQL)]
+        cur.execute("DELETE FROM temp.stock_count")
+        db.conn.commit()
+    except sqlite3.Error as exc:
+        db.conn.rollback()
+        raise RuntimeError(f"Failed to compute stock variances: {exc}") from exc
+
+    seen: Dict[tuple, int] = {}
+    for row in rows:
+        row["status"] = _status(row)
+        if row["status"] == "OK":
+            key = (row["item_id"], row["customer_id"])
+            if key in seen:
+                row["status"] = f"Duplicate of line {seen[key]}"
+            else:
+                seen[key] = row["line"]
+        ok = row["status"] == "OK"
+        row["variance"] = round(row["counted"] - row["system_qty"], 6) if ok else 0.0
+        row["value"] = round(row["variance"] * row["price"], 2)
+    return rows
+
+
+def post_variances(
+    db: DatabaseManager, rows: Iterable[Dict[str, Any]], date: str, reference: str = ""
+) -> int:
+    """Post every ``OK`` line; returns the number of adjustments made.
+
+    Lines are re-compared with current stock when posted, so a line that
+    matched at review time is still corrected if stock has since moved.
+    """
+    adjustments = [
+        {
+            "item_id": r["item_id"],
+            "customer_id": r["customer_id"],
+            "counted_qty": r["counted"],
+            "price_excl_tax": r["price"],
+        }
+        for r in rows
+        if r["status"] == "OK"
+    ]
+    return db.post_stock_adjustments(adjustments, date, reference)
+
+
+def variance_report(rows: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """Variance rows as a DataFrame ready for display or export."""
+    columns = ["line", "item_code", "item_name", "grower", "system_qty", "counted",
+               "variance", "price", "value", "status"]
+    return pd.DataFrame(list(rows), columns=columns)
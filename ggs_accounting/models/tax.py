@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+
+def gst_enabled(setting: str | None) -> bool:
+    """Return True when the ``GST`` setting asks for tax on invoices."""
+    return bool(setting) and setting.strip().lower() not in ("0", "false", "no", "off")
+
+
+def item_tax_rates(conn: sqlite3.Connection, item_ids: Iterable[int]) -> Dict[int, Tuple[str, float]]:
+    """Map item ids to their ``(hsn_code, gst_rate)``."""
+    ids = sorted(set(item_ids))
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    rows = conn.execute(
+        f"SELECT item_id, hsn_code, gst_rate FROM Items WHERE item_id IN ({marks})", ids
+    ).fetchall()
+    return {int(r[0]): (r[1] or "", float(r[2] or 0)) for r in rows}
+
+
+def compute_line_taxes(amounts: Sequence[float], rates: Sequence[float]) -> np.ndarray:
+    """Tax per line, rounded to paise, for line amounts and percentage rates."""
+    values = np.asarray(amounts, dtype=np.float64)
+    pct = np.asarray(rates, dtype=np.float64)
+    if values.shape != pct.shape:
+        raise ValueError("Each line needs exactly one tax rate")
+    return np.round(values * pct / 100.0, 2)
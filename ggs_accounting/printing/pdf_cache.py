@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from ggs_accounting.utils import atomic_output
+
+# Bump when the invoice layout changes so old renders stop matching.
+RENDER_VERSION = 1
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class PdfCache:
+    """Content-addressed store of rendered invoice PDFs.
+
+    Files are named by a hash of everything that affects the page: the
+    invoice header, its lines, the company settings and
+    :data:`RENDER_VERSION`. An edited invoice or changed settings hash to
+    a new name, so stale renders are never served; they age out as the
+    directory is pruned back to ``max_bytes``, least recently used first.
+
+    Several processes may read and add entries at once. Only
+    :meth:`prune` deletes files, so call it once a batch is assembled.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        header: Mapping[str, Any], lines: Sequence[Mapping[str, Any]], settings: Mapping[str, Any]
+    ) -> str:
+        payload = json.dumps(
+            {"v": RENDER_VERSION, "header": header, "lines": lines, "settings": settings},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file for ``key`` and mark it recently used."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return str(path)
+
+    def put(self, key: str, render: Callable[[str], None]) -> str:
+        """Render into the cache with ``render(path)`` and return the file."""
+        path = self.path_for(key)
+        with atomic_output(str(path)) as tmp:
+            render(tmp)
+        return str(path)
+
+    def fetch(self, key: str, render: Callable[[str], None]) -> str:
+        return self.get(key) or self.put(key, render)
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def size(self) -> int:
+        return sum(st.st_size for _path, st in self._entries())
+
+    def prune(self) -> int:
+        """Evict least recently used files until within ``max_bytes``."""
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        total = sum(st.st_size for _path, st in entries)
+        removed = 0
+        for path, st in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                # Still open in a viewer (Windows); try again next time
+                continue
+            total -= st.st_size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for path, _st in self._entries():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    @classmethod
+    def for_database(cls, db_path: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES) -> "PdfCache":
+        """The cache kept beside a database file."""
+        return cls(Path(db_path).parent / "pdf_cache", max_bytes)
+
+
+def company_settings(get_setting: Callable[[str], Optional[str]]) -> Dict[str, str]:
+    """Settings printed on invoices, as part of the cache key."""
+    return {key: get_setting(key) or "" for key in ("company_name", "company_address")}
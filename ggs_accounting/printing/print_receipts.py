@@ -1,24 +1,65 @@
 from __future__ import annotations
 
+import atexit
+import itertools
+import multiprocessing
 import os
+import shutil
 import tempfile
 import webbrowser
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from pypdf import PdfWriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing.pdf_cache import PdfCache, company_settings
+from ggs_accounting.utils import atomic_output
+
+_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]
+)
+_SUMMARY_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (3, 0), (3, -1), "RIGHT"),
+        ("FONTNAME", (0, -2), (-1, -1), "Helvetica-Bold"),
+    ]
+)
 
 
 class ReceiptPrinter:
     """Generate simple PDF invoices or summaries."""
 
-    def __init__(self, db: DatabaseManager) -> None:
+    def __init__(self, db: DatabaseManager, cache: Optional[PdfCache] = None) -> None:
         self._db = db
+        self.cache = cache if cache is not None else PdfCache.for_database(db.db_path)
+        self._out_dir: Optional[str] = None
+
+    def output_path(self, stem: str, suffix: str = ".pdf") -> str:
+        """A fresh path for a printout, in a folder removed when the app exits.
+
+        The viewer opens printouts after we return, so they cannot be
+        deleted straight away.
+        """
+        if self._out_dir is None:
+            self._out_dir = tempfile.mkdtemp(prefix="ggs-print-")
+            atexit.register(shutil.rmtree, self._out_dir, True)
+        fd, path = tempfile.mkstemp(prefix=f"{stem}-", suffix=suffix, dir=self._out_dir)
+        os.close(fd)
+        return path
 
     # ---- query helpers ----
     def fetch_invoices(
@@ -39,71 +80,315 @@ class ReceiptPrinter:
         return result
 
     # ---- pdf helpers ----
-    def _summary_table(self, invoices: Iterable[Dict[str, Any]]) -> Table:
-        data = [["Date", "Invoice", "Customer", "Total"]]
+    def _summary_rows(self, invoices: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
         parties = {p["customer_id"]: p["name"] for p in self._db.get_all_customers()}
         for inv in invoices:
-            data.append([
-                inv["date"],
-                str(inv["inv_id"]),
-                parties.get(inv["customer_id"], ""),
-                f"{inv['total_amount']:.2f}",
-            ])
-        table = Table(data, colWidths=[80, 60, 200, 80])
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ]
-            )
-        )
-        return table
+            yield inv["date"], inv["inv_id"], parties.get(inv["customer_id"], ""), inv["total_amount"]
 
     def print_summary(self, invoices: Iterable[Dict[str, Any]]) -> str:
         """Generate a summary PDF and open it."""
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        doc = SimpleDocTemplate(tmp.name, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = [Paragraph("Invoice Summary", styles["Title"]), self._summary_table(invoices)]
-        doc.build(story)
-        webbrowser.open(tmp.name)
-        return tmp.name
+        path = self.output_path("summary")
+        write_summary_pdf(path, self._summary_rows(invoices))
+        webbrowser.open(path)
+        return path
 
     def print_detailed(self, invoices: Iterable[Dict[str, Any]]) -> str:
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        doc = SimpleDocTemplate(tmp.name, pagesize=A4)
-        styles = getSampleStyleSheet()
-        parties = {p["customer_id"]: p for p in self._db.get_all_customers()}
-        story = []
-        for inv in invoices:
-            party = parties.get(inv["customer_id"], {})
-            story.append(Paragraph(f"Invoice {inv['inv_id']}", styles["Heading2"]))
-            story.append(Paragraph(f"Date: {inv['date']}", styles["Normal"]))
-            if party:
-                story.append(Paragraph(f"Party: {party.get('name')}", styles["Normal"]))
-            items = self._db.get_invoice_items(inv["inv_id"])
-            data = [["Item", "Qty", "Price", "Total"]]
-            for it in items:
-                data.append(
-                    [
-                        f"{it['name']} ({it['customer_id']})",
-                        str(it["quantity"]),
-                        f"{it['unit_price']:.2f}",
-                        f"{it['line_total']:.2f}",
-                    ]
-                )
-            tbl = Table(data, colWidths=[100, 60, 80, 80])
-            tbl.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ]
-                )
-            )
-            story.append(tbl)
-            story.append(Paragraph(" ", styles["Normal"]))
-        doc.build(story)
-        webbrowser.open(tmp.name)
-        return tmp.name
+        path = self.output_path("invoices")
+        render_detailed(self._db, [inv["inv_id"] for inv in invoices], path, cache=self.cache)
+        webbrowser.open(path)
+        return path
+
+
+# Invoice rows per summary page; each page adds a header and two total rows.
+SUMMARY_ROWS_PER_PAGE = 40
+_SUMMARY_COLUMNS = [80, 60, 200, 80]
+_SUMMARY_ROW_HEIGHT = 16
+
+SUMMARY_SQL = """
+    SELECT Invoices.date, Invoices.inv_id, COALESCE(Customers.name, '') AS party,
+           Invoices.total_amount
+    FROM Invoices
+    LEFT JOIN Customers ON Customers.customer_id = Invoices.customer_id
+"""
+
+
+def summary_query(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    inv_type: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """SQL and parameters for the summary rows, in date order.
+
+    Filters match :meth:`ReceiptPrinter.fetch_invoices`.
+    """
+    sql = SUMMARY_SQL + " WHERE 1 = 1"
+    params: List[Any] = []
+    if start_date and end_date:
+        sql += " AND Invoices.date BETWEEN ? AND ?"
+        params.extend([start_date, end_date])
+    if customer_id:
+        sql += " AND Invoices.customer_id = ?"
+        params.append(customer_id)
+    if inv_type:
+        sql += " AND Invoices.type = ?"
+        params.append(inv_type)
+    return sql + " ORDER BY Invoices.date, Invoices.inv_id", params
+
+
+def iter_summary_rows(
+    db: DatabaseManager,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    inv_type: Optional[str] = None,
+    fetch_size: int = 1000,
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield ``(date, inv_id, party, total)`` rows, fetching them in pages."""
+    sql, params = summary_query(start_date, end_date, customer_id, inv_type)
+    cur = db.conn.execute(sql, params)
+    while True:
+        batch = cur.fetchmany(fetch_size)
+        if not batch:
+            return
+        for row in batch:
+            yield tuple(row)
+
+
+def _summary_page(rows: List[Tuple[Any, ...]], page_total: float, running_total: float) -> Table:
+    data: List[List[Any]] = [["Date", "Invoice", "Customer", "Total"]]
+    data.extend([date, str(inv_id), party, f"{total:.2f}"] for date, inv_id, party, total in rows)
+    data.append(["", "", "Page total", f"{page_total:.2f}"])
+    data.append(["", "", "Running total", f"{running_total:.2f}"])
+    table = Table(data, colWidths=_SUMMARY_COLUMNS, rowHeights=_SUMMARY_ROW_HEIGHT)
+    table.setStyle(_SUMMARY_STYLE)
+    return table
+
+
+def write_summary_pdf(
+    path: str,
+    rows: Iterable[Sequence[Any]],
+    title: str = "Invoice Summary",
+    rows_per_page: int = SUMMARY_ROWS_PER_PAGE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Write a summary of ``(date, inv_id, party, total)`` rows, page by page.
+
+    Rows are consumed lazily and each page is one fixed-size table with
+    the header repeated and page and running totals at the foot, drawn
+    straight onto the canvas. Only the current page's rows are held, so
+    memory does not grow with the row count beyond reportlab's compressed
+    page streams. ``progress`` gets the rows written after each page and
+    may raise :class:`ExportCancelled`. Returns the number of rows.
+    """
+    width, height = A4
+    left = (width - sum(_SUMMARY_COLUMNS)) / 2
+    it = iter(rows)
+    count = 0
+    running = 0.0
+    page_no = 0
+    with atomic_output(path) as part:
+        pdf = canvas.Canvas(part, pagesize=A4, pageCompression=1)
+        pdf.setTitle(title)
+        while True:
+            chunk = [tuple(r) for r in itertools.islice(it, rows_per_page)]
+            if not chunk and page_no:
+                break
+            page_no += 1
+            page_total = sum(float(r[3] or 0) for r in chunk)
+            running += page_total
+            count += len(chunk)
+            pdf.setFont("Helvetica-Bold", 14)
+            pdf.drawCentredString(width / 2, height - 50, title)
+            table = _summary_page(chunk, page_total, running)
+            _w, table_height = table.wrapOn(pdf, width, height)
+            table.drawOn(pdf, left, height - 70 - table_height)
+            pdf.setFont("Helvetica", 8)
+            pdf.drawCentredString(width / 2, 30, f"Page {page_no}")
+            pdf.showPage()
+            if progress:
+                progress(count)
+        pdf.save()
+    return count
+
+
+# Invoices per worker task; small enough for steady progress, large enough
+# that process start-up and merging stay cheap.
+CHUNK_SIZE = 50
+
+
+def _invoice_story(
+    inv: Dict[str, Any], items: List[Dict[str, Any]], company: Dict[str, str], styles: Any
+) -> List[Any]:
+    story: List[Any] = []
+    if company.get("company_name"):
+        story.append(Paragraph(company["company_name"], styles["Title"]))
+    if company.get("company_address"):
+        story.append(Paragraph(company["company_address"], styles["Normal"]))
+    story.append(Paragraph(f"Invoice {inv['inv_id']}", styles["Heading2"]))
+    story.append(Paragraph(f"Date: {inv['date']}", styles["Normal"]))
+    if inv.get("party"):
+        story.append(Paragraph(f"Party: {inv['party']}", styles["Normal"]))
+    data = [["Item", "Qty", "Price", "Total"]]
+    for it in items:
+        data.append(
+            [
+                f"{it['name']} ({it['customer_id']})",
+                str(it["quantity"]),
+                f"{it['unit_price']:.2f}",
+                f"{it['line_total']:.2f}",
+            ]
+        )
+    tbl = Table(data, colWidths=[100, 60, 80, 80])
+    tbl.setStyle(_TABLE_STYLE)
+    story.append(tbl)
+    story.append(Paragraph(" ", styles["Normal"]))
+    return story
+
+
+def _invoice_documents(db: DatabaseManager, inv_ids: List[int]) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Header and printed line fields of each invoice, in ``inv_ids`` order."""
+    marks = ",".join("?" * len(inv_ids))
+    rows = db.conn.execute(
+        f"""SELECT Invoices.inv_id, Invoices.date, Invoices.type, Invoices.total_amount,
+                   Customers.name AS party
+            FROM Invoices LEFT JOIN Customers ON Customers.customer_id = Invoices.customer_id
+            WHERE Invoices.inv_id IN ({marks})""",
+        inv_ids,
+    ).fetchall()
+    found = {r["inv_id"]: dict(r) for r in rows}
+    docs = []
+    for inv_id in inv_ids:
+        if inv_id not in found:
+            continue
+        items = [
+            {k: it[k] for k in ("name", "customer_id", "quantity", "unit_price", "line_total")}
+            for it in db.get_invoice_items(inv_id)
+        ]
+        docs.append((found[inv_id], items))
+    return docs
+
+
+def _render_chunk(
+    db_path: str, inv_ids: List[int], out_dir: str, per_invoice: bool, cache_dir: Optional[str] = None
+) -> List[Tuple[int, str]]:
+    """Render invoices to PDFs; runs in a worker process.
+
+    Each call opens its own read-only connection. Returns ``(inv_id, path)``
+    per invoice when ``per_invoice`` is set, else one pair for the chunk.
+    Per-invoice files come from the cache in ``cache_dir`` when given and
+    only missing ones are rendered.
+    """
+    db = DatabaseManager(Path(db_path), read_only=True)
+    try:
+        docs = _invoice_documents(db, inv_ids)
+        company = company_settings(db.get_setting)
+    finally:
+        db.conn.close()
+    styles = getSampleStyleSheet()
+
+    def build(path: str, stories: List[List[Any]]) -> None:
+        SimpleDocTemplate(path, pagesize=A4).build([f for story in stories for f in story])
+
+    if not per_invoice:
+        path = os.path.join(out_dir, f"chunk_{inv_ids[0]}.pdf")
+        build(path, [_invoice_story(inv, items, company, styles) for inv, items in docs])
+        return [(inv_ids[0], path)]
+    cache = PdfCache(cache_dir) if cache_dir else None
+    paths = []
+    for inv, items in docs:
+
+        def render(path: str, inv: Dict[str, Any] = inv, items: List[Dict[str, Any]] = items) -> None:
+            build(path, [_invoice_story(inv, items, company, styles)])
+
+        if cache is not None:
+            path = cache.fetch(PdfCache.key(inv, items, company), render)
+        else:
+            path = os.path.join(out_dir, f"invoice_{inv['inv_id']}.pdf")
+            render(path)
+        paths.append((inv["inv_id"], path))
+    return paths
+
+
+def merge_pdfs(paths: Sequence[str], output: str) -> None:
+    """Concatenate PDFs into ``output``."""
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output, "wb") as fh:
+        writer.write(fh)
+
+
+def render_detailed(
+    db: DatabaseManager,
+    inv_ids: Sequence[int],
+    output: str,
+    as_zip: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    cache: Optional[PdfCache] = None,
+) -> str:
+    """Render detailed invoices to ``output`` using a process pool.
+
+    Invoices are split into chunks rendered by separate processes, each
+    with its own read-only connection. The result is one PDF, or with
+    ``as_zip`` a zip holding one PDF per invoice. ``progress`` receives the
+    number of invoices done and may raise :class:`ExportCancelled`; the
+    output is written only when every chunk has finished.
+
+    With a ``cache``, invoices are rendered one per file and reprints reuse
+    the cached files; the cache is pruned once the output is written.
+
+    Only ``db.db_path`` is used, so this may run off the GUI thread. Jobs
+    of one chunk or less render in the calling process.
+    """
+    ids = list(inv_ids)
+    # Up to one chunk's worth is quicker to render than to start a process
+    in_process = workers == 1 or len(ids) <= chunk_size
+    per_invoice = as_zip or cache is not None
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks)) or 1
+    cache_dir = str(cache.directory) if cache is not None else None
+    with tempfile.TemporaryDirectory() as tmp:
+        results: Dict[int, List[Tuple[int, str]]] = {}
+        done = 0
+        if in_process:
+            for n, chunk in enumerate(chunks):
+                results[n] = _render_chunk(str(db.db_path), chunk, tmp, per_invoice, cache_dir)
+                done += len(chunk)
+                if progress:
+                    progress(done)
+        else:
+            # spawn: forking a process that runs Qt threads is unsafe
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            try:
+                futures = {
+                    pool.submit(_render_chunk, str(db.db_path), chunk, tmp, per_invoice, cache_dir): n
+                    for n, chunk in enumerate(chunks)
+                }
+                for future in as_completed(futures):
+                    n = futures[future]
+                    results[n] = future.result()
+                    done += len(chunks[n])
+                    if progress:
+                        progress(done)
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            pool.shutdown()
+        files = [pair for n in range(len(chunks)) for pair in results[n]]
+        with atomic_output(output) as part:
+            if as_zip:
+                with zipfile.ZipFile(part, "w", zipfile.ZIP_DEFLATED) as zf:
+                    for inv_id, path in files:
+                        zf.write(path, f"invoice_{inv_id}.pdf")
+            elif len(files) == 1:
+                shutil.copyfile(files[0][1], part)
+            elif files:
+                merge_pdfs([path for _inv_id, path in files], part)
+            else:
+                SimpleDocTemplate(part, pagesize=A4).build([Paragraph("No invoices", getSampleStyleSheet()["Normal"])])
+    if cache is not None:
+        cache.prune()
+    return output
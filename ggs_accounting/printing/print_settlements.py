@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.settlement import settlement_report
+
+
+_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]
+)
+
+
+def _render_patti(
+    path: Path,
+    header: Dict[str, Any],
+    lines: List[Dict[str, Any]],
+    company: str,
+    start_date: str,
+    end_date: str,
+) -> None:
+    styles = getSampleStyleSheet()
+    story = []
+    if company:
+        story.append(Paragraph(company, styles["Title"]))
+    story.append(Paragraph(f"Settlement for {header['grower']}", styles["Heading2"]))
+    story.append(Paragraph(f"Period: {start_date} to {end_date}", styles["Normal"]))
+    data = [["Item", "Qty", "Rate", "Amount"]]
+    for line in lines:
+        data.append(
+            [
+                line["item"],
+                f"{line['quantity']:.2f}",
+                f"{line['rate']:.2f}",
+                f"{line['amount']:.2f}",
+            ]
+        )
+    data.append(["Gross sales", "", "", f"{header['gross']:.2f}"])
+    data.append(["Commission", "", "", f"-{header['commission']:.2f}"])
+    data.append(["Charges", "", "", f"-{header['charges']:.2f}"])
+    data.append(["Net payable", "", "", f"{header['net_payable']:.2f}"])
+    tbl = Table(data, colWidths=[200, 60, 80, 100])
+    tbl.setStyle(_TABLE_STYLE)
+    story.append(tbl)
+    SimpleDocTemplate(str(path), pagesize=A4).build(story)
+
+
+def write_settlement_pdfs(
+    db: DatabaseManager,
+    start_date: str,
+    end_date: str,
+    out_dir: Path,
+    commission_rate: Optional[float] = None,
+    charge_per_unit: Optional[float] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> List[Path]:
+    """Write one settlement PDF per grower with sales in the period.
+
+    ``progress`` receives the number of settlements written and may raise
+    :class:`ExportCancelled`.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    settlements, lines = settlement_report(db, start_date, end_date, commission_rate, charge_per_unit)
+    company = db.get_setting("company_name") or ""
+    by_grower = {gid: grp.to_dict("records") for gid, grp in lines.groupby("grower_id", sort=False)}
+    paths: List[Path] = []
+    for header in settlements.to_dict("records"):
+        path = out_dir / f"settlement_{int(header['grower_id'])}_{start_date}_{end_date}.pdf"
+        _render_patti(path, header, by_grower.get(header["grower_id"], []), company, start_date, end_date)
+        paths.append(path)
+        if progress:
+            progress(len(paths))
+    return paths
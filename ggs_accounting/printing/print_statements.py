@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing.pdf_cache import company_settings
+from ggs_accounting.reports.statements import iter_statements
+from ggs_accounting.utils import atomic_output, export_rows
+
+# Statements handed to a worker process at a time
+BATCH_SIZE = 100
+INDEX_NAME = "index.csv"
+INDEX_COLUMNS = ["customer_id", "name", "customer_type", "opening", "closing", "entries", "file"]
+
+_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (3, 0), (-1, -1), "RIGHT"),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+    ]
+)
+
+
+def _amount(value: float) -> str:
+    return f"{value:.2f}" if value else ""
+
+
+def _render_statement(
+    path: str, statement: Mapping[str, Any], company: Mapping[str, str], start_date: str, end_date: str
+) -> None:
+    styles = getSampleStyleSheet()
+    story = []
+    if company.get("company_name"):
+        story.append(Paragraph(company["company_name"], styles["Title"]))
+    if company.get("company_address"):
+        story.append(Paragraph(company["company_address"], styles["Normal"]))
+    story.append(Paragraph(f"Statement of account: {statement['name']}", styles["Heading2"]))
+    story.append(Paragraph(f"Period: {start_date} to {end_date}", styles["Normal"]))
+    data = [["Date", "Type", "Ref", "Debit", "Credit", "Balance"]]
+    data.append([start_date, "Opening balance", "", "", "", f"{statement['opening']:.2f}"])
+    for line in statement["lines"]:
+        data.append(
+            [
+                line["date"],
+                line["type"],
+                str(line["ref"]),
+                _amount(line["debit"]),
+                _amount(line["credit"]),
+                f"{line['balance']:.2f}",
+            ]
+        )
+    data.append([end_date, "Closing balance", "", "", "", f"{statement['closing']:.2f}"])
+    tbl = Table(data, colWidths=[70, 110, 50, 80, 80, 90], repeatRows=1)
+    tbl.setStyle(_TABLE_STYLE)
+    story.append(tbl)
+    with atomic_output(path) as part:
+        SimpleDocTemplate(part, pagesize=A4).build(story)
+
+
+def _render_batch(
+    out_dir: str,
+    statements: List[Dict[str, Any]],
+    company: Dict[str, str],
+    start_date: str,
+    end_date: str,
+) -> List[Dict[str, Any]]:
+    """Render statements to PDFs; runs in a worker process.
+
+    Returns the index row of each statement.
+    """
+    rows = []
+    for st in statements:
+        name = f"statement_{st['customer_id']}_{start_date}_{end_date}.pdf"
+        _render_statement(os.path.join(out_dir, name), st, company, start_date, end_date)
+        rows.append(
+            {
+                "customer_id": st["customer_id"],
+                "name": st["name"],
+                "customer_type": st["customer_type"],
+                "opening": st["opening"],
+                "closing": st["closing"],
+                "entries": len(st["lines"]),
+                "file": name,
+            }
+        )
+    return rows
+
+
+def _collect(
+    pending: Dict[Future, int],
+    results: Dict[int, List[Dict[str, Any]]],
+    done: int,
+    progress: Optional[Callable[[int], None]],
+) -> int:
+    finished: Set[Future] = wait(pending, return_when=FIRST_COMPLETED).done
+    for future in finished:
+        n = pending.pop(future)
+        results[n] = future.result()
+        done += len(results[n])
+        if progress:
+            progress(done)
+    return done
+
+
+def write_statements(
+    db: DatabaseManager,
+    start_date: str,
+    end_date: str,
+    out_dir: Path,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Path:
+    """Write a statement PDF per party with activity, plus ``index.csv``.
+
+    Statements are read by :func:`iter_statements` and handed to a process
+    pool in batches as they are read; only a few batches are in flight at
+    once, so memory does not grow with the number of parties. ``progress``
+    receives the number of statements written and may raise
+    :class:`ExportCancelled`. The index, in customer order, is written last
+    and its path returned.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    company = company_settings(db.get_setting)
+    statements = iter_statements(db, start_date, end_date)
+    batches = iter(lambda: list(itertools.islice(statements, batch_size)), [])
+    # A single batch is quicker to render than to start a process
+    head = list(itertools.islice(batches, 2))
+    batches = itertools.chain(head, batches)
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    done = 0
+    if workers == 1 or len(head) < 2:
+        for n, batch in enumerate(batches):
+            results[n] = _render_batch(str(out_dir), batch, company, start_date, end_date)
+            done += len(results[n])
+            if progress:
+                progress(done)
+    else:
+        workers = workers or os.cpu_count() or 1
+        # spawn: forking a process that runs Qt threads is unsafe
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending: Dict[Future, int] = {}
+        try:
+            for n, batch in enumerate(batches):
+                pending[pool.submit(_render_batch, str(out_dir), batch, company, start_date, end_date)] = n
+                while len(pending) >= workers * 2:
+                    done = _collect(pending, results, done, progress)
+            while pending:
+                done = _collect(pending, results, done, progress)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        pool.shutdown()
+    index = out_dir / INDEX_NAME
+    rows = (row for n in sorted(results) for row in results[n])
+    export_rows(str(index), rows, INDEX_COLUMNS)
+    return index
+
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Mapping, Optional, Sequence, Union
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing.pdf_cache import company_settings
+from ggs_accounting.utils import atomic_output
+
+# Characters per line in the printer's standard 12x24 dot font.
+PAPER_COLUMNS = {58: 32, 80: 48}
+
+# ESC/POS commands
+INIT = b"\x1b@"
+BOLD_ON = b"\x1bE\x01"
+BOLD_OFF = b"\x1bE\x00"
+ALIGN_LEFT = b"\x1ba\x00"
+ALIGN_CENTER = b"\x1ba\x01"
+DOUBLE_ON = b"\x1d!\x11"
+DOUBLE_OFF = b"\x1d!\x00"
+# Feed past the tear bar, then partial cut
+FEED_CUT = b"\x1dVB\x03"
+
+# Printers ship with code page 437 selected
+ENCODING = "cp437"
+
+SLIP_HEADER_SQL = """
+    SELECT Invoices.inv_id, Invoices.date, Invoices.type, Invoices.subtotal,
+           Invoices.total_amount, Invoices.amount_paid, Invoices.balance_due,
+           Customers.name AS party
+    FROM Invoices LEFT JOIN Customers ON Customers.customer_id = Invoices.customer_id
+    WHERE Invoices.inv_id = ?
+"""
+
+SLIP_LINES_SQL = """
+    SELECT Items.name, InvoiceItems.quantity, InvoiceItems.unit_price, InvoiceItems.line_total
+    FROM InvoiceItems JOIN Items ON Items.item_id = InvoiceItems.item_id
+    WHERE InvoiceItems.inv_id = ?
+    ORDER BY InvoiceItems.id
+"""
+
+
+class SlipTemplate:
+    """Fixed-width slip layout for one paper width.
+
+    Column widths and format strings are worked out once here, so
+    rendering a slip is only string formatting. Get instances from
+    :func:`slip_template`, which keeps one per width.
+    """
+
+    QTY_WIDTH = 6
+    RATE_WIDTH = 8
+    AMOUNT_WIDTH = 9
+
+    def __init__(self, columns: int) -> None:
+        self.columns = columns
+        name_width = columns - self.QTY_WIDTH - self.RATE_WIDTH - self.AMOUNT_WIDTH - 3
+        self.name_width = name_width
+        self.rule = "-" * columns
+        self._item = (
+            f"{{:<{name_width}.{name_width}}} {{:>{self.QTY_WIDTH}.2f}}"
+            f" {{:>{self.RATE_WIDTH}.2f}} {{:>{self.AMOUNT_WIDTH}.2f}}"
+        ).format
+        # Long names get a line of their own above the figures
+        self._figures = (
+            f"{'':{name_width}} {{:>{self.QTY_WIDTH}.2f}}"
+            f" {{:>{self.RATE_WIDTH}.2f}} {{:>{self.AMOUNT_WIDTH}.2f}}"
+        ).format
+        self._heading = (
+            f"{'Item':<{name_width}} {'Qty':>{self.QTY_WIDTH}}"
+            f" {'Rate':>{self.RATE_WIDTH}} {'Amount':>{self.AMOUNT_WIDTH}}"
+        )
+        self._total = f"{{:<{columns - 12}}}{{:>12.2f}}".format
+        self._pair = f"{{:<{columns // 2}}}{{:>{columns - columns // 2}}}".format
+        self._center = f"{{:^{columns}.{columns}}}".format
+
+    def _items(self, lines: Sequence[Mapping[str, Any]]) -> List[str]:
+        out = []
+        for line in lines:
+            name = str(line["name"])
+            if len(name) > self.name_width:
+                out.append(name[: self.columns])
+                out.append(self._figures(line["quantity"], line["unit_price"], line["line_total"]))
+            else:
+                out.append(self._item(name, line["quantity"], line["unit_price"], line["line_total"]))
+        return out
+
+    def _totals(self, header: Mapping[str, Any]) -> List[str]:
+        out = []
+        tax = round(header["total_amount"] - header["subtotal"], 2)
+        if tax:
+            out.append(self._total("Subtotal", header["subtotal"]))
+            out.append(self._total("GST", tax))
+        out.append(self._total("TOTAL", header["total_amount"]))
+        if header["amount_paid"]:
+            out.append(self._total("Paid", header["amount_paid"]))
+            out.append(self._total("Due", header["balance_due"]))
+        return out
+
+    def _party(self, header: Mapping[str, Any]) -> List[str]:
+        lines = [self._pair(f"{header['type']} #{header['inv_id']}", header["date"])]
+        if header.get("party"):
+            lines.append(str(header["party"])[: self.columns])
+        return lines
+
+    def text(
+        self,
+        header: Mapping[str, Any],
+        lines: Sequence[Mapping[str, Any]],
+        company: Mapping[str, str],
+    ) -> str:
+        """The slip as plain text, one printer line per text line."""
+        heading = (company.get("company_name"), company.get("company_address"))
+        out = [self._center(value) for value in heading if value]
+        out += self._party(header)
+        out += [self.rule, self._heading, self.rule]
+        out += self._items(lines)
+        out.append(self.rule)
+        out += self._totals(header)
+        return "\n".join(out) + "\n"
+
+    def escpos(
+        self,
+        header: Mapping[str, Any],
+        lines: Sequence[Mapping[str, Any]],
+        company: Mapping[str, str],
+    ) -> bytes:
+        """The slip as ESC/POS bytes, ending with a feed and cut."""
+
+        def encode(rows: List[str]) -> bytes:
+            return ("\n".join(rows) + "\n").encode(ENCODING, "replace") if rows else b""
+
+        name = company.get("company_name")
+        address = company.get("company_address")
+        body = self._party(header) + [self.rule, self._heading, self.rule] + self._items(lines) + [self.rule]
+        return b"".join(
+            (
+                INIT,
+                ALIGN_CENTER,
+                # Double size halves the characters per line
+                DOUBLE_ON + encode([name[: self.columns // 2]]) + DOUBLE_OFF if name else b"",
+                encode([address[: self.columns]]) if address else b"",
+                ALIGN_LEFT,
+                encode(body),
+                *(
+                    BOLD_ON + encode([row]) + BOLD_OFF if row.startswith("TOTAL") else encode([row])
+                    for row in self._totals(header)
+                ),
+                FEED_CUT,
+            )
+        )
+
+
+@lru_cache(maxsize=None)
+def slip_template(paper_mm: int = 80) -> SlipTemplate:
+    """The shared template for 58 or 80 mm paper."""
+    try:
+        return SlipTemplate(PAPER_COLUMNS[paper_mm])
+    except KeyError:
+        raise ValueError(f"Unsupported paper width {paper_mm} mm") from None
+
+
+def fetch_slip(db: DatabaseManager, inv_id: int) -> tuple:
+    """Header and lines of one invoice, as used by the slip templates."""
+    try:
+        header = db.conn.execute(SLIP_HEADER_SQL, (inv_id,)).fetchone()
+        lines = db.conn.execute(SLIP_LINES_SQL, (inv_id,)).fetchall()
+    except sqlite3.Error as exc:
+        raise RuntimeError(f"Failed to fetch invoice {inv_id}: {exc}") from exc
+    if header is None:
+        raise ValueError(f"Invoice {inv_id} does not exist")
+    return dict(header), lines
+
+
+def send_slip(data: bytes, target: Union[str, Path]) -> str:
+    """Write ``data`` to a printer device, or as a new file in a spool directory.
+
+    A spool file appears complete or not at all, so a spooler polling
+    the directory never picks up half a slip.
+    """
+    target = Path(target)
+    if target.is_dir():
+        path = target / f"slip_{uuid.uuid4().hex}.bin"
+        with atomic_output(str(path)) as part:
+            with open(part, "wb") as fh:
+                fh.write(data)
+        return str(path)
+    try:
+        # Append so a plain file stands in for the device when testing
+        with open(target, "ab") as fh:
+            fh.write(data)
+    except OSError as exc:
+        raise RuntimeError(f"Failed to print to {target}: {exc}") from exc
+    return str(target)
+
+
+class ThermalPrinter:
+    """Print counter slips on a thermal receipt printer.
+
+    ``target`` is the printer's device file (``/dev/usb/lp0``, ``LPT1``)
+    or a spool directory. By default both come from the
+    ``thermal_printer`` and ``thermal_paper_mm`` settings.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        target: Optional[Union[str, Path]] = None,
+        paper_mm: Optional[int] = None,
+    ) -> None:
+        self._db = db
+        self.target = target or db.get_setting("thermal_printer") or ""
+        self.template = slip_template(paper_mm or int(db.get_setting("thermal_paper_mm") or 80))
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.target)
+
+    def render(self, inv_id: int) -> bytes:
+        header, lines = fetch_slip(self._db, inv_id)
+        return self.template.escpos(header, lines, company_settings(self._db.get_setting))
+
+    def print_invoice(self, inv_id: int) -> str:
+        """Print the slip for ``inv_id``; returns where it was written."""
+        if not self.configured:
+            raise RuntimeError("No thermal printer configured")
+        return send_slip(self.render(inv_id), self.target)
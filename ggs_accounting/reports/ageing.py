@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from datetime import date as _date
+from itertools import groupby
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+# (label, first day, last day) - the last bucket is open ended.
+AGEING_BUCKETS: tuple[tuple[str, int, Optional[int]], ...] = (
+    ("0-30", 0, 30),
+    ("31-60", 31, 60),
+    ("61-90", 61, 90),
+    ("90+", 91, None),
+)
+
+# Both queries walk the (customer_id, date) indexes in order. Each takes
+# the cut-off date twice; NULL keeps every row.
+_INVOICE_STREAM_SQL = """
+    SELECT customer_id, date, 0 AS kind, inv_id AS ref, type,
+           CASE type WHEN 'Sale' THEN total_amount - amount_paid
+                     ELSE -(total_amount - amount_paid) END AS amount
+    FROM Invoices
+    WHERE is_credit = 1 AND customer_id IS NOT NULL AND (? IS NULL OR date <= ?)
+    ORDER BY customer_id, date, inv_id
+"""
+
+_PAYMENT_STREAM_SQL = """
+    SELECT customer_id, date, 1 AS kind, payment_id AS ref,
+           CASE received WHEN 1 THEN 'Received' ELSE 'Paid' END AS type,
+           CASE received WHEN 1 THEN -amount ELSE amount END AS amount
+    FROM Payments
+    WHERE ? IS NULL OR date <= ?
+    ORDER BY customer_id, date, payment_id
+"""
+
+# customer_id, date, kind (0 invoice / 1 payment), ref, type, signed amount
+LedgerEntry = Tuple[int, str, int, int, str, float]
+
+
+def iter_party_ledgers(
+    db: DatabaseManager, as_of: Optional[str] = None
+) -> Iterator[Tuple[int, List[LedgerEntry]]]:
+    """Yield ``(customer_id, entries)`` from one ordered scan of each table.
+
+    Invoices and payments are merged on (customer, date), invoices first on
+    the same day. Positive amounts increase what the party owes us.
+    ``as_of`` leaves out entries dated after it.
+    """
+    try:
+        invoices = db.conn.cursor().execute(_INVOICE_STREAM_SQL, (as_of, as_of))
+        payments = db.conn.cursor().execute(_PAYMENT_STREAM_SQL, (as_of, as_of))
+        merged = heapq.merge(
+            (tuple(r) for r in invoices),
+            (tuple(r) for r in payments),
+            key=lambda e: (e[0], e[1], e[2], e[3]),
+        )
+        for customer_id, entries in groupby(merged, key=lambda e: e[0]):
+            yield customer_id, list(entries)  # type: ignore[misc]
+    except Exception as exc:
+        raise RuntimeError(f"Failed to read party ledgers: {exc}") from exc
+
+
+def allocate_fifo(entries: List[LedgerEntry]) -> List[Tuple[str, float]]:
+    """Settle opposite-signed entries oldest first.
+
+    Returns the still open ``(date, amount)`` pairs, all of the same sign.
+    """
+    open_items: Deque[List[Any]] = deque()
+    for _cid, day, _kind, _ref, _type, amount in entries:
+        remaining = float(amount)
+        while remaining and open_items and (open_items[0][1] > 0) != (remaining > 0):
+            head = open_items[0]
+            if abs(head[1]) > abs(remaining):
+                head[1] += remaining
+                remaining = 0.0
+            else:
+                remaining += head[1]
+                open_items.popleft()
+        if abs(remaining) > 1e-9:
+            open_items.append([day, remaining])
+    return [(day, amount) for day, amount in open_items]
+
+
+def _bucket(age: int) -> int:
+    for idx, (_label, _low, high) in enumerate(AGEING_BUCKETS):
+        if high is None or age <= high:
+            return idx
+    return len(AGEING_BUCKETS) - 1  # pragma: no cover - last bucket is open
+
+
+def compute_ageing(db: DatabaseManager, as_of: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Bucket each party's open balance by age.
+
+    Payments are allocated FIFO against invoices, so what remains open is
+    the newest part of the balance. Parties with nothing open are skipped.
+    With ``as_of`` the balances are those on that day: later invoices and
+    payments are left out.
+    """
+    as_of_day = _date.fromisoformat(as_of) if as_of else _date.today()
+    as_of_ordinal = as_of_day.toordinal()
+    cur = db.conn.cursor()
+    try:
+        cur.execute("SELECT customer_id, name, customer_type FROM Customers")
+        parties = {row["customer_id"]: (row["name"], row["customer_type"]) for row in cur.fetchall()}
+    except Exception as exc:
+        raise RuntimeError(f"Failed to fetch customers: {exc}") from exc
+
+    result: List[Dict[str, Any]] = []
+    for customer_id, entries in iter_party_ledgers(db, as_of):
+        open_items = allocate_fifo(entries)
+        if not open_items:
+            continue
+        buckets = [0.0] * len(AGEING_BUCKETS)
+        for day, amount in open_items:
+            age = max(as_of_ordinal - _date.fromisoformat(day).toordinal(), 0)
+            buckets[_bucket(age)] += amount
+        balance = sum(buckets)
+        name, customer_type = parties.get(customer_id, ("", ""))
+        row: Dict[str, Any] = {
+            "customer_id": customer_id,
+            "name": name,
+            "customer_type": customer_type,
+            "balance": balance,
+            "status": "Receivable" if balance > 0 else "Payable",
+        }
+        for (label, _low, _high), value in zip(AGEING_BUCKETS, buckets):
+            row[label] = value
+        result.append(row)
+    return result
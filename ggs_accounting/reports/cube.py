@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from datetime import date as _date
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+# CROSS JOIN keeps InvoiceItems outermost, so a read of new lines walks
+# just their id range.
+CUBE_SQL = """
+    SELECT Invoices.date, InvoiceItems.item_id, Invoices.customer_id,
+           InvoiceItems.source_id, InvoiceItems.quantity, InvoiceItems.line_total
+    FROM InvoiceItems
+    CROSS JOIN Invoices ON Invoices.inv_id = InvoiceItems.inv_id
+    WHERE Invoices.type = 'Sale' AND InvoiceItems.id > ? AND InvoiceItems.id <= ?
+"""
+
+# Dictionary-encoded dimensions and the table their labels come from.
+ENCODED_DIMENSIONS: dict[str, str] = {"item": "Items", "buyer": "Customers", "grower": "Customers"}
+DIMENSIONS: tuple[str, ...] = ("month", "date", "item", "buyer", "grower")
+
+_EPOCH_ORDINAL = _date(1970, 1, 1).toordinal()
+_MISSING = -1
+
+
+def _ordinals(dates: Sequence[str]) -> np.ndarray:
+    """Convert ISO date strings to proleptic Gregorian ordinals."""
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    return (days + _EPOCH_ORDINAL).astype(np.int32)
+
+
+def _ordinal_of(value: Any) -> int:
+    if isinstance(value, _date):
+        return value.toordinal()
+    return _date.fromisoformat(str(value)).toordinal()
+
+
+class SalesCube:
+    """In-memory columnar cube of sale lines for interactive slice and dice.
+
+    Each line is stored once across parallel NumPy columns: the date as an
+    ordinal, the item/buyer/grower as dense dictionary codes and the
+    quantity and amount as measures. Group-bys are ``np.bincount`` calls so
+    they stay in the millisecond range at a few million lines.
+
+    Invoice lines are only ever inserted, so the cube remembers the last
+    ``InvoiceItems.id`` it has read and :meth:`refresh` reads just the
+    lines after it, however they were saved.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None, capacity: int = 1024) -> None:
+        self._db = db
+        self._size = 0
+        self._loaded = False
+        self._last_line = 0
+        self._date = np.zeros(capacity, dtype=np.int32)
+        self._codes = {dim: np.zeros(capacity, dtype=np.int32) for dim in ENCODED_DIMENSIONS}
+        self._qty = np.zeros(capacity, dtype=np.float64)
+        self._amount = np.zeros(capacity, dtype=np.float64)
+        # raw id -> code and code -> raw id for every encoded dimension
+        self._encode: Dict[str, Dict[int, int]] = {dim: {} for dim in ENCODED_DIMENSIONS}
+        self._decode: Dict[str, List[int]] = {dim: [] for dim in ENCODED_DIMENSIONS}
+        self._labels: Dict[str, Dict[int, str]] = {"Items": {}, "Customers": {}}
+
+    # ---- loading ----
+    @classmethod
+    def from_db(cls, db: DatabaseManager, chunk_size: int = 100_000) -> "SalesCube":
+        cube = cls(db)
+        cube.load(chunk_size)
+        return cube
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, chunk_size: int = 100_000) -> None:
+        """Read every sale line from the database once."""
+        self._read_lines(chunk_size)
+        self._loaded = True
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def refresh(self) -> None:
+        """Load the cube, or add the sale lines saved since it last read."""
+        if self._loaded:
+            self._read_lines()
+        else:
+            self.load()
+
+    def _read_lines(self, chunk_size: int = 100_000) -> None:
+        if self._db is None:
+            raise RuntimeError("Cube has no database to load from")
+        cur = self._db.conn.cursor()
+        try:
+            last = cur.execute("SELECT COALESCE(MAX(id), 0) FROM InvoiceItems").fetchone()[0]
+            if last <= self._last_line:
+                return
+            if not self._loaded:
+                # Later reads fetch labels only for ids they have not seen
+                self._refresh_labels()
+            cur.execute(CUBE_SQL, (self._last_line, last))
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                dates, items, buyers, growers, qty, amount = zip(*rows)
+                self._append_columns(dates, items, buyers, growers, qty, amount)
+        except Exception as exc:
+            raise RuntimeError(f"Failed to load sales cube: {exc}") from exc
+        self._last_line = last
+
+    def _refresh_labels(self) -> None:
+        assert self._db is not None
+        conn = self._db.conn
+        self._labels["Items"] = {int(r[0]): r[1] for r in conn.execute("SELECT item_id, name FROM Items")}
+        self._labels["Customers"] = {
+            int(r[0]): r[1] for r in conn.execute("SELECT customer_id, name FROM Customers")
+        }
+
+    # ---- appending ----
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = len(self._date)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._date = np.resize(self._date, capacity)
+        self._qty = np.resize(self._qty, capacity)
+        self._amount = np.resize(self._amount, capacity)
+        for dim in self._codes:
+            self._codes[dim] = np.resize(self._codes[dim], capacity)
+
+    def _encode_column(self, dim: str, raw: Iterable[Optional[int]]) -> np.ndarray:
+        values = np.array([_MISSING if v is None else v for v in raw], dtype=np.int64)
+        uniques, inverse = np.unique(values, return_inverse=True)
+        mapping = self._encode[dim]
+        decode = self._decode[dim]
+        codes = np.empty(len(uniques), dtype=np.int32)
+        for pos, raw_id in enumerate(uniques.tolist()):
+            code = mapping.get(raw_id)
+            if code is None:
+                code = mapping[raw_id] = len(decode)
+                decode.append(raw_id)
+            codes[pos] = code
+        return codes[inverse]
+
+    def _append_columns(
+        self,
+        dates: Sequence[str],
+        items: Sequence[Optional[int]],
+        buyers: Sequence[Optional[int]],
+        growers: Sequence[Optional[int]],
+        qty: Sequence[float],
+        amount: Sequence[float],
+    ) -> None:
+        n = len(dates)
+        if n == 0:
+            return
+        self._reserve(n)
+        end = self._size + n
+        self._date[self._size:end] = _ordinals(dates)
+        self._codes["item"][self._size:end] = self._encode_column("item", items)
+        self._codes["buyer"][self._size:end] = self._encode_column("buyer", buyers)
+        self._codes["grower"][self._size:end] = self._encode_column("grower", growers)
+        self._qty[self._size:end] = qty
+        self._amount[self._size:end] = amount
+        self._size = end
+
+    def on_invoice_saved(
+        self,
+        inv_id: int,
+        inv_type: str,
+        date: str,
+        customer_id: Optional[int],
+        items: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Append a freshly saved invoice without reloading.
+
+        Registered as an :class:`InvoiceLogic` listener. The invoice's lines
+        are read back by id, along with any saved elsewhere since the last
+        read. Nothing is done until the cube has been loaded, since the
+        load will pick them up.
+        """
+        if self._loaded and inv_type == "Sale":
+            self._read_lines()
+
+    # ---- querying ----
+    def mask(self, filters: Optional[Mapping[str, Any]] = None) -> np.ndarray:
+        """Return a boolean mask over the stored lines.
+
+        ``filters`` maps a dimension to a raw id (or a collection of ids);
+        ``None`` selects the lines with no member, the "(none)" group of
+        :meth:`group_by`. ``start``/``end`` bound the date inclusively and
+        ``month`` takes a ``YYYY-MM`` string; a ``None`` date filter is no
+        bound.
+        """
+        n = self._size
+        result = np.ones(n, dtype=bool)
+        for key, value in (filters or {}).items():
+            if value is None and key not in ENCODED_DIMENSIONS:
+                continue
+            if key == "start":
+                result &= self._date[:n] >= _ordinal_of(value)
+            elif key == "end":
+                result &= self._date[:n] <= _ordinal_of(value)
+            elif key == "date":
+                result &= self._date[:n] == _ordinal_of(value)
+            elif key == "month":
+                result &= self._months() == self._month_key(value)
+            elif key in ENCODED_DIMENSIONS:
+                values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+                mapping = self._encode[key]
+                raw = (_MISSING if v is None else v for v in values)
+                codes = [mapping[v] for v in raw if v in mapping]
+                result &= np.isin(self._codes[key][:n], codes)
+            else:
+                raise ValueError(f"Unknown filter: {key}")
+        return result
+
+    def _months(self) -> np.ndarray:
+        days = (self._date[: self._size].astype(np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]")
+        return days.astype("datetime64[M]").astype(np.int64)
+
+    @staticmethod
+    def _month_key(value: Any) -> int:
+        return int(np.datetime64(str(value)[:7], "M").astype(np.int64))
+
+    def group_by(
+        self, dim: str, filters: Optional[Mapping[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate lines, count, quantity and amount per member of ``dim``."""
+        selected = self.mask(filters)
+        if dim in ENCODED_DIMENSIONS:
+            keys = self._codes[dim][: self._size][selected]
+            size = len(self._decode[dim])
+            offset = 0
+        elif dim in ("date", "month"):
+            raw = self._date[: self._size] if dim == "date" else self._months()
+            raw = raw[selected].astype(np.int64)
+            offset = int(raw.min()) if len(raw) else 0
+            keys = raw - offset
+            size = int(keys.max()) + 1 if len(keys) else 0
+        else:
+            raise ValueError(f"Unknown dimension: {dim}")
+        counts = np.bincount(keys, minlength=size)
+        qty = np.bincount(keys, weights=self._qty[: self._size][selected], minlength=size)
+        amount = np.bincount(keys, weights=self._amount[: self._size][selected], minlength=size)
+        result: List[Dict[str, Any]] = []
+        for code in np.nonzero(counts)[0].tolist():
+            key = self._key_for(dim, code + offset)
+            result.append(
+                {
+                    "key": key,
+                    "label": self.label(dim, key),
+                    "lines": int(counts[code]),
+                    "quantity": float(qty[code]),
+                    "amount": float(amount[code]),
+                }
+            )
+        return result
+
+    def drill_down(
+        self,
+        path: Sequence[Tuple[str, Any]],
+        dim: str,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Group by ``dim`` inside the slice selected by ``path``."""
+        merged: Dict[str, Any] = dict(filters or {})
+        merged.update(path)
+        return self.group_by(dim, merged)
+
+    def _key_for(self, dim: str, value: int) -> Any:
+        if dim in ENCODED_DIMENSIONS:
+            raw = self._decode[dim][value]
+            return None if raw == _MISSING else raw
+        if dim == "date":
+            return _date.fromordinal(value).isoformat()
+        return str(np.datetime64(value, "M"))
+
+    def label(self, dim: str, key: Any) -> str:
+        if dim not in ENCODED_DIMENSIONS:
+            return str(key)
+        if key is None:
+            return ""
+        table = ENCODED_DIMENSIONS[dim]
+        if key not in self._labels[table] and self._db is not None:
+            self._refresh_labels()
+        return self._labels[table].get(key, str(key))
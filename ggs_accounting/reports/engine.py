@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+LINES_SQL = """
+    SELECT InvoiceItems.inv_id, Invoices.date, Invoices.type,
+           Invoices.customer_id AS party_id,
+           InvoiceItems.item_id, InvoiceItems.customer_id AS line_party_id,
+           InvoiceItems.source_id, InvoiceItems.quantity,
+           InvoiceItems.unit_price, InvoiceItems.line_total
+    FROM InvoiceItems
+    JOIN Invoices ON Invoices.inv_id = InvoiceItems.inv_id
+"""
+
+PERIODS: dict[str, str] = {"day": "D", "week": "W", "month": "M"}
+
+_ID_COLUMNS = ("inv_id", "party_id", "item_id", "line_party_id", "source_id")
+
+
+def _compact_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Downcast one ``read_sql`` chunk to compact dtypes."""
+    for col in _ID_COLUMNS:
+        chunk[col] = chunk[col].fillna(-1).astype(np.int32)
+    chunk["date"] = pd.to_datetime(chunk["date"], format="%Y-%m-%d")
+    chunk["quantity"] = chunk["quantity"].astype(np.float32)
+    chunk["unit_price"] = chunk["unit_price"].astype(np.float32)
+    # Money is summed in integer paise so register totals stay exact.
+    chunk["amount"] = np.rint(chunk.pop("line_total").to_numpy() * 100).astype(np.int64)
+    return chunk
+
+
+def _name_categorical(ids: pd.Series, names: Dict[int, str]) -> pd.Categorical:
+    """Dictionary-encode ``ids`` using the lookup ``names`` as categories."""
+    keys = np.fromiter(names.keys(), dtype=np.int64, count=len(names))
+    lookup = np.full(int(keys.max()) + 1 if len(keys) else 1, -1, dtype=np.int32)
+    # Names are not unique across parties, so equal names share one code.
+    name_codes, categories = pd.factorize(pd.Series(list(names.values()), dtype=object))
+    lookup[keys] = name_codes
+    values = ids.to_numpy()
+    valid = (values >= 0) & (values < len(lookup))
+    codes = np.where(valid, lookup[np.where(valid, values, 0)], -1)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def load_invoice_lines(
+    db: DatabaseManager,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    chunksize: int = 200_000,
+) -> pd.DataFrame:
+    """Load invoice lines as a compact DataFrame.
+
+    Rows are read with a chunked ``read_sql`` so peak memory stays close to
+    the size of the final frame. Names are attached as categoricals.
+    """
+    sql = LINES_SQL
+    params: List[Any] = []
+    if start_date and end_date:
+        sql += " WHERE Invoices.date BETWEEN ? AND ?"
+        params.extend([start_date, end_date])
+    try:
+        chunks = [
+            _compact_chunk(chunk)
+            for chunk in pd.read_sql(sql, db.conn, params=params, chunksize=chunksize)
+        ]
+        customers = {
+            int(r["customer_id"]): r["name"]
+            for r in db.conn.execute("SELECT customer_id, name FROM Customers")
+        }
+        items = {
+            int(r["item_id"]): r["name"]
+            for r in db.conn.execute("SELECT item_id, name FROM Items")
+        }
+    except Exception as exc:
+        raise RuntimeError(f"Failed to load invoice lines: {exc}") from exc
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        columns = ["inv_id", "date", "type", "party_id", "item_id", "line_party_id",
+                   "source_id", "quantity", "unit_price", "line_total"]
+        df = _compact_chunk(pd.DataFrame({c: pd.Series(dtype=object) for c in columns}))
+    df["type"] = df["type"].astype("category")
+    df["party"] = _name_categorical(df["party_id"], customers)
+    df["item"] = _name_categorical(df["item_id"], items)
+    df["grower"] = _name_categorical(df["source_id"], customers)
+    return df
+
+
+def _period(df: pd.DataFrame, period: str) -> pd.Series:
+    try:
+        freq = PERIODS[period]
+    except KeyError:
+        raise ValueError(f"Unknown period: {period}") from None
+    return df["date"].dt.to_period(freq)
+
+
+def _rupees(frame: pd.DataFrame) -> pd.DataFrame:
+    if "amount" in frame:
+        frame["amount"] = frame["amount"] / 100.0
+    return frame
+
+
+def register(df: pd.DataFrame, inv_type: str) -> pd.DataFrame:
+    """Return one row per invoice of ``inv_type`` with quantity and amount."""
+    lines = df[df["type"] == inv_type]
+    reg = (
+        lines.groupby("inv_id", sort=True)
+        .agg(
+            date=("date", "first"),
+            party=("party", "first"),
+            lines=("item_id", "size"),
+            quantity=("quantity", "sum"),
+            amount=("amount", "sum"),
+        )
+        .reset_index()
+    )
+    return _rupees(reg)
+
+
+def sales_register(df: pd.DataFrame) -> pd.DataFrame:
+    return register(df, "Sale")
+
+
+def purchase_register(df: pd.DataFrame) -> pd.DataFrame:
+    return register(df, "Purchase")
+
+
+def register_by_period(df: pd.DataFrame, inv_type: str, period: str = "day") -> pd.DataFrame:
+    """Summarise the register of ``inv_type`` per day, week or month."""
+    lines = df[df["type"] == inv_type]
+    summary = (
+        lines.groupby(_period(lines, period), sort=True)
+        .agg(
+            invoices=("inv_id", "nunique"),
+            quantity=("quantity", "sum"),
+            amount=("amount", "sum"),
+        )
+        .rename_axis("period")
+        .reset_index()
+    )
+    return _rupees(summary)
+
+
+def _pivot(
+    df: pd.DataFrame, key: str, id_column: str, inv_type: str, period: str, value: str
+) -> pd.DataFrame:
+    if value not in ("amount", "quantity"):
+        raise ValueError(f"Unknown pivot value: {value}")
+    lines = df[(df["type"] == inv_type) & (df[id_column] >= 0)]
+    # Grouped by id, since two parties or items may share a name; the
+    # names only label the rows
+    grouped = lines.groupby([lines[id_column], _period(lines, period)], sort=True)[value].sum()
+    table = grouped.unstack(fill_value=0)
+    table.columns.name = "period"
+    labels = lines.drop_duplicates(id_column).set_index(id_column)[key]
+    table.index = pd.Index(labels.reindex(table.index).astype(object).to_numpy(), name=key)
+    if value == "amount":
+        table = table / 100.0
+    return table
+
+
+def item_pivot(
+    df: pd.DataFrame, period: str = "month", inv_type: str = "Sale", value: str = "amount"
+) -> pd.DataFrame:
+    """Items as rows and periods as columns; items sharing a name keep their own rows."""
+    return _pivot(df, "item", "item_id", inv_type, period, value)
+
+
+def party_pivot(
+    df: pd.DataFrame, period: str = "month", inv_type: str = "Sale", value: str = "amount"
+) -> pd.DataFrame:
+    """Invoice parties as rows and periods as columns; parties sharing a name keep their own rows."""
+    return _pivot(df, "party", "party_id", inv_type, period, value)
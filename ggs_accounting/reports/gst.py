@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+_GROUPINGS: dict[str, str] = {
+    "rate": "rate",
+    "hsn": "hsn_code, rate",
+}
+
+
+def gst_summary(
+    db: DatabaseManager,
+    start_date: str,
+    end_date: str,
+    by: str = "rate",
+    inv_type: str = "Sale",
+) -> List[Dict[str, Any]]:
+    """GSTR-1 style rate-wise or HSN-wise totals for a period.
+
+    Reads only the tax lines written at invoice save, grouped in one query
+    over the (type, date, rate, hsn_code) index. Tax is split equally into
+    CGST and SGST for intra-state supplies.
+    """
+    try:
+        group = _GROUPINGS[by]
+    except KeyError:
+        raise ValueError(f"Unknown GST grouping: {by}") from None
+    cur = db.conn.cursor()
+    try:
+        cur.execute(
+            f"""
+            SELECT {group}, COUNT(DISTINCT inv_id) AS invoices,
+                   SUM(taxable_value) AS taxable_value, SUM(tax_amount) AS tax_amount
+            FROM InvoiceTaxLines
+            WHERE type = ? AND date BETWEEN ? AND ?
+            GROUP BY {group}
+            ORDER BY {group}
+            """,
+            (inv_type, start_date, end_date),
+        )
+        rows = cur.fetchall()
+    except Exception as exc:
+        raise RuntimeError(f"Failed to compute GST summary: {exc}") from exc
+    result: List[Dict[str, Any]] = []
+    for row in rows:
+        data = dict(row)
+        tax = round(float(data["tax_amount"] or 0), 2)
+        data["taxable_value"] = round(float(data["taxable_value"] or 0), 2)
+        data["tax_amount"] = tax
+        data["cgst"] = round(tax / 2, 2)
+        data["sgst"] = round(tax - data["cgst"], 2)
+        result.append(data)
+    return result
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+# group key and label expressions for each margin dimension
+MARGIN_DIMENSIONS: dict[str, tuple[str, str, str]] = {
+    "item": ("InvoiceItems.item_id", "Items.name", "JOIN Items ON Items.item_id = InvoiceItems.item_id"),
+    "buyer": (
+        "Invoices.customer_id",
+        "Customers.name",
+        "LEFT JOIN Customers ON Customers.customer_id = Invoices.customer_id",
+    ),
+    "grower": (
+        "InvoiceItems.source_id",
+        "Customers.name",
+        "LEFT JOIN Customers ON Customers.customer_id = InvoiceItems.source_id",
+    ),
+    "day": ("Invoices.date", "Invoices.date", ""),
+}
+
+
+def margin_report(
+    db: DatabaseManager,
+    by: str = "item",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Revenue, cost and margin of sales grouped by item, buyer, grower or day.
+
+    Uses the cost captured on each sale line, so it is a single aggregate
+    over the (type, date) index with no lookups into ``Inventory``.
+    """
+    try:
+        key, label, join = MARGIN_DIMENSIONS[by]
+    except KeyError:
+        raise ValueError(f"Unknown margin dimension: {by}") from None
+    sql = f"""
+        SELECT {key} AS key, {label} AS label,
+               SUM(InvoiceItems.quantity) AS quantity,
+               SUM(InvoiceItems.line_total) AS revenue,
+               SUM(InvoiceItems.quantity * COALESCE(InvoiceItems.unit_cost, 0)) AS cost,
+               SUM(InvoiceItems.unit_cost IS NULL) AS uncosted
+        FROM Invoices
+        JOIN InvoiceItems ON InvoiceItems.inv_id = Invoices.inv_id
+        {join}
+        WHERE Invoices.type = 'Sale'
+    """
+    params: List[Any] = []
+    if start_date and end_date:
+        sql += " AND Invoices.date BETWEEN ? AND ?"
+        params.extend([start_date, end_date])
+    sql += f" GROUP BY {key} ORDER BY revenue DESC"
+    cur = db.conn.cursor()
+    try:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    except Exception as exc:
+        raise RuntimeError(f"Failed to compute margins: {exc}") from exc
+    result: List[Dict[str, Any]] = []
+    for row in rows:
+        revenue = float(row["revenue"] or 0)
+        cost = float(row["cost"] or 0)
+        margin = revenue - cost
+        result.append(
+            {
+                "key": row["key"],
+                "label": "" if row["label"] is None else str(row["label"]),
+                "quantity": float(row["quantity"] or 0),
+                "revenue": revenue,
+                "cost": cost,
+                "margin": margin,
+                "margin_pct": margin / revenue * 100 if revenue else 0.0,
+                "uncosted_lines": int(row["uncosted"] or 0),
+            }
+        )
+    return result
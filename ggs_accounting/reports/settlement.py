@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+SETTLEMENT_SQL = """
+    SELECT InvoiceItems.source_id AS grower_id, Customers.name AS grower,
+           COUNT(*) AS lines, SUM(InvoiceItems.quantity) AS quantity,
+           SUM(InvoiceItems.line_total) AS gross
+    FROM InvoiceItems
+    JOIN Invoices ON Invoices.inv_id = InvoiceItems.inv_id
+    JOIN Customers ON Customers.customer_id = InvoiceItems.source_id
+    WHERE Invoices.type = 'Sale' AND Invoices.date BETWEEN ? AND ?
+    GROUP BY InvoiceItems.source_id
+    ORDER BY InvoiceItems.source_id
+"""
+
+SETTLEMENT_LINES_SQL = """
+    SELECT InvoiceItems.source_id AS grower_id, Items.name AS item,
+           SUM(InvoiceItems.quantity) AS quantity,
+           SUM(InvoiceItems.line_total) AS amount
+    FROM InvoiceItems
+    JOIN Invoices ON Invoices.inv_id = InvoiceItems.inv_id
+    JOIN Items ON Items.item_id = InvoiceItems.item_id
+    WHERE Invoices.type = 'Sale' AND Invoices.date BETWEEN ? AND ?
+      AND InvoiceItems.source_id IS NOT NULL
+    GROUP BY InvoiceItems.source_id, InvoiceItems.item_id
+    ORDER BY InvoiceItems.source_id, Items.name
+"""
+
+
+def _setting_float(db: DatabaseManager, key: str) -> float:
+    value = db.get_setting(key)
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def compute_settlements(
+    db: DatabaseManager,
+    start_date: str,
+    end_date: str,
+    commission_rate: Optional[float] = None,
+    charge_per_unit: Optional[float] = None,
+) -> pd.DataFrame:
+    """Return one settlement row per grower for the period.
+
+    ``commission_rate`` is a percentage of gross sales and
+    ``charge_per_unit`` a flat charge per unit sold; both default to the
+    ``commission_rate`` and ``settlement_charge_per_unit`` settings.
+    """
+    if commission_rate is None:
+        commission_rate = _setting_float(db, "commission_rate")
+    if charge_per_unit is None:
+        charge_per_unit = _setting_float(db, "settlement_charge_per_unit")
+    try:
+        df = pd.read_sql(SETTLEMENT_SQL, db.conn, params=[start_date, end_date])
+    except Exception as exc:
+        raise RuntimeError(f"Failed to compute settlements: {exc}") from exc
+    gross = df["gross"].to_numpy(dtype=np.float64)
+    df["commission"] = np.round(gross * commission_rate / 100.0, 2)
+    df["charges"] = np.round(df["quantity"].to_numpy(dtype=np.float64) * charge_per_unit, 2)
+    df["net_payable"] = np.round(gross - df["commission"] - df["charges"], 2)
+    return df
+
+
+def settlement_lines(db: DatabaseManager, start_date: str, end_date: str) -> pd.DataFrame:
+    """Item-wise sales per grower for the body of each settlement."""
+    try:
+        df = pd.read_sql(SETTLEMENT_LINES_SQL, db.conn, params=[start_date, end_date])
+    except Exception as exc:
+        raise RuntimeError(f"Failed to fetch settlement lines: {exc}") from exc
+    df["rate"] = (df["amount"] / df["quantity"].where(df["quantity"] != 0)).fillna(0.0)
+    return df
+
+
+def settlement_report(
+    db: DatabaseManager,
+    start_date: str,
+    end_date: str,
+    commission_rate: Optional[float] = None,
+    charge_per_unit: Optional[float] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return ``(settlements, lines)`` for the period."""
+    return (
+        compute_settlements(db, start_date, end_date, commission_rate, charge_per_unit),
+        settlement_lines(db, start_date, end_date),
+    )
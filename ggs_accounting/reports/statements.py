@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.ageing import iter_party_ledgers
+
+
+def iter_statements(db: DatabaseManager, start_date: str, end_date: str) -> Iterator[Dict[str, Any]]:
+    """Yield one account statement per party, in customer order.
+
+    Built on :func:`iter_party_ledgers`, so invoices and payments are each
+    read in a single ordered scan and only one party's entries are held at
+    a time. Entries before ``start_date`` make up the opening balance and
+    those after ``end_date`` are ignored. Parties with no entries in the
+    period and nothing brought forward are skipped.
+
+    Positive amounts and balances are owed to us.
+    """
+    cur = db.conn.cursor()
+    try:
+        cur.execute("SELECT customer_id, name, customer_type FROM Customers")
+        parties = {row["customer_id"]: (row["name"], row["customer_type"]) for row in cur.fetchall()}
+    except Exception as exc:
+        raise RuntimeError(f"Failed to fetch customers: {exc}") from exc
+
+    for customer_id, entries in iter_party_ledgers(db):
+        opening = 0.0
+        balance = 0.0
+        lines: List[Dict[str, Any]] = []
+        for _cid, day, _kind, ref, kind, amount in entries:
+            if day < start_date:
+                opening += amount
+                balance = opening
+                continue
+            if day > end_date:
+                break
+            balance += amount
+            lines.append(
+                {
+                    "date": day,
+                    "type": kind,
+                    "ref": ref,
+                    "debit": amount if amount > 0 else 0.0,
+                    "credit": -amount if amount < 0 else 0.0,
+                    "balance": round(balance, 2),
+                }
+            )
+        opening = round(opening, 2)
+        if not lines and not opening:
+            continue
+        name, customer_type = parties.get(customer_id, ("", ""))
+        yield {
+            "customer_id": customer_id,
+            "name": name,
+            "customer_type": customer_type,
+            "opening": opening,
+            "lines": lines,
+            "closing": round(balance, 2),
+        }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from PyQt6 import QtGui, QtWidgets
+from PyQt6.QtCore import Qt
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.bank_import import post_accepted, propose_matches, read_statement
+
+
+class BankImportDialog(QtWidgets.QDialog):
+    """Review proposed matches for a bank statement and post the accepted ones."""
+
+    COLUMNS = ["Post", "Date", "Narration", "Reference", "Amount", "Type", "Party", "Match"]
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._proposals: List[Dict[str, Any]] = []
+        self._customers = self._db.get_all_customers()
+        # Every row's party combo reads this one model
+        self.parties = QtGui.QStandardItemModel(self)
+        blank = QtGui.QStandardItem("")
+        blank.setData(None, Qt.ItemDataRole.UserRole)
+        self.parties.appendRow(blank)
+        for c in self._customers:
+            party = QtGui.QStandardItem(c["name"])
+            party.setData(c["customer_id"], Qt.ItemDataRole.UserRole)
+            self.parties.appendRow(party)
+        self.setWindowTitle("Import Bank Statement")
+        self.resize(900, 500)
+
+        open_btn = QtWidgets.QPushButton("Open Statement")
+        open_btn.clicked.connect(self._open)
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        header = self.table.horizontalHeader()
+        if header is not None:
+            header.setStretchLastSection(True)
+        self.summary_label = QtWidgets.QLabel("")
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        post_btn = buttons.addButton("Post Accepted", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        if post_btn is not None:
+            post_btn.clicked.connect(self._post)
+        buttons.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(open_btn)
+        layout.addWidget(self.table)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(buttons)
+
+    def load_statement(self, path: str) -> None:
+        self._proposals = propose_matches(self._db, read_statement(path))
+        self._populate()
+
+    def _open(self) -> None:
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Statement", filter="CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            self.load_statement(path)
+        except ValueError as exc:
+            QtWidgets.QMessageBox.warning(self, "Validation", str(exc))
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+
+    def _populate(self) -> None:
+        self.table.setRowCount(len(self._proposals))
+        for row, p in enumerate(self._proposals):
+            check = QtWidgets.QTableWidgetItem()
+            check.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+            check.setCheckState(Qt.CheckState.Checked if p["accepted"] else Qt.CheckState.Unchecked)
+            self.table.setItem(row, 0, check)
+            values = [
+                p["date"], p["narration"], p["reference"], f"₹{p['amount']:.2f}",
+                "Received" if p["received"] else "Paid",
+            ]
+            for col, value in enumerate(values, start=1):
+                item = QtWidgets.QTableWidgetItem(value)
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                self.table.setItem(row, col, item)
+            party = QtWidgets.QComboBox()
+            party.setModel(self.parties)
+            idx = party.findData(p["customer_id"])
+            party.setCurrentIndex(idx if idx >= 0 else 0)
+            party.setEnabled(not p["duplicate"])
+            party.currentIndexChanged.connect(lambda _i, r=row: self._party_changed(r))
+            self.table.setCellWidget(row, 6, party)
+            match = QtWidgets.QTableWidgetItem(p["method"] or "Unmatched")
+            match.setFlags(match.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.table.setItem(row, 7, match)
+        self.table.resizeColumnsToContents()
+        matched = sum(1 for p in self._proposals if p["accepted"])
+        duplicates = sum(1 for p in self._proposals if p["duplicate"])
+        self.summary_label.setText(
+            f"{len(self._proposals)} lines, {matched} matched, {duplicates} already imported"
+        )
+
+    def _party_changed(self, row: int) -> None:
+        combo = self.table.cellWidget(row, 6)
+        if not isinstance(combo, QtWidgets.QComboBox):
+            return
+        proposal = self._proposals[row]
+        if combo.currentData() != proposal["customer_id"]:
+            # A hand-picked party no longer implies the matched bill
+            proposal.update(customer_id=combo.currentData(), inv_id=None, method="Manual")
+            self.table.item(row, 7).setText("Manual")
+            check = self.table.item(row, 0)
+            if check is not None and proposal["customer_id"] is not None:
+                check.setCheckState(Qt.CheckState.Checked)
+
+    def _post(self) -> None:
+        for row, proposal in enumerate(self._proposals):
+            check = self.table.item(row, 0)
+            proposal["accepted"] = (
+                check is not None
+                and check.checkState() == Qt.CheckState.Checked
+                and not proposal["duplicate"]
+            )
+        try:
+            ids = post_accepted(self._db, self._proposals)
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        QtWidgets.QMessageBox.information(self, "Saved", f"Recorded {len(ids)} payments")
+        self.accept()
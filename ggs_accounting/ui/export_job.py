@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import abc
+import os
+import threading
+from typing import Callable, Iterable, Optional, Sequence, Set
+
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtCore import pyqtSignal
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.ui.qt_abc import QtABCMeta
+from ggs_accounting.utils import ExportCancelled, export_rows
+
+EXPORT_FILTER = "Excel Files (*.xlsx);;CSV Files (*.csv)"
+
+# Builds the rows to export. Called on the worker thread with a read-only
+# connection of its own, since SQLite connections stay on their thread.
+RowSource = Callable[[DatabaseManager], Iterable]
+
+_running: Set["BackgroundJob"] = set()
+
+
+class BackgroundJob(QtCore.QThread, metaclass=QtABCMeta):
+    """A cancellable job writing one file on a background thread.
+
+    Subclasses implement :meth:`work`, call :meth:`_progress` as they go
+    and return the number of ``noun`` written.
+    """
+
+    noun = "rows"
+
+    progressed = pyqtSignal(int)
+    succeeded = pyqtSignal(str, int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._cancel = threading.Event()
+        self._written = 0
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _progress(self, count: int) -> None:
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        self._written = count
+        self.progressed.emit(count)
+
+    @abc.abstractmethod
+    def work(self) -> int:
+        """Write the file and return the number of ``noun`` written."""
+
+    def run(self) -> None:
+        try:
+            count = self.work()
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as exc:
+            self.failed.emit(str(exc))
+        else:
+            self.succeeded.emit(self.path, count)
+
+
+class ExportWorker(BackgroundJob):
+    """Write rows to a file on a background thread."""
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        path: str,
+        rows: RowSource,
+        headers: Optional[Sequence[str]] = None,
+    ) -> None:
+        super().__init__(path)
+        self._db_path = db.db_path
+        self._rows = rows
+        self._headers = headers
+
+    def work(self) -> int:
+        reader = DatabaseManager(self._db_path, read_only=True)
+        try:
+            export_rows(self.path, self._rows(reader), self._headers, progress=self._progress)
+        finally:
+            reader.conn.close()
+        return self._written
+
+
+class ExportProgress(QtWidgets.QWidget):
+    """Progress bar and cancel button for one running export."""
+
+    def __init__(self, worker: BackgroundJob, total: Optional[int] = None) -> None:
+        super().__init__()
+        self.worker = worker
+        self._total = total
+        self.label = QtWidgets.QLabel(f"Exporting {os.path.basename(worker.path)}")
+        self.bar = QtWidgets.QProgressBar()
+        self.bar.setMaximumWidth(160)
+        # Without a row count the bar just shows activity
+        self.bar.setRange(0, total or 0)
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self._cancel)
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.label)
+        layout.addWidget(self.bar)
+        layout.addWidget(self.cancel_btn)
+        worker.progressed.connect(self._on_progress)
+
+    def _on_progress(self, count: int) -> None:
+        if self._total:
+            self.bar.setValue(min(count, self._total))
+        else:
+            self.label.setText(f"Exporting {os.path.basename(self.worker.path)}: {count:,} {self.worker.noun}")
+
+    def _cancel(self) -> None:
+        self.cancel_btn.setEnabled(False)
+        self.label.setText("Cancelling...")
+        self.worker.cancel()
+
+
+def ask_export_path(parent: QtWidgets.QWidget) -> str:
+    path, _ = QtWidgets.QFileDialog.getSaveFileName(parent, "Export", filter=EXPORT_FILTER)
+    return path
+
+
+def run_in_background(
+    parent: QtWidgets.QWidget,
+    worker: BackgroundJob,
+    total: Optional[int] = None,
+    on_success: Optional[Callable[[str], None]] = None,
+) -> BackgroundJob:
+    """Start ``worker`` with progress and a Cancel button in the status bar.
+
+    Outside a main window the progress widget is shown as a small window
+    of its own. ``on_success`` gets the finished file's path.
+    """
+    progress = ExportProgress(worker, total)
+    window = parent.window()
+    status = window.statusBar() if isinstance(window, QtWidgets.QMainWindow) else None
+    if status is not None:
+        status.addPermanentWidget(progress)
+    else:
+        progress.setWindowTitle("Export")
+        progress.show()
+
+    def finish(message: str, error: bool = False) -> None:
+        if status is not None:
+            status.removeWidget(progress)
+            status.showMessage(message, 5000)
+        progress.deleteLater()
+        if error:
+            QtWidgets.QMessageBox.critical(parent, "Error", message)
+
+    def succeeded(path: str, count: int) -> None:
+        finish(f"Exported {count:,} {worker.noun} to {path}")
+        if on_success is not None:
+            on_success(path)
+
+    worker.succeeded.connect(succeeded)
+    worker.cancelled.connect(lambda: finish("Export cancelled"))
+    worker.failed.connect(lambda msg: finish(msg, error=True))
+    worker.finished.connect(worker.deleteLater)
+    # Keep the worker alive until it is done
+    _running.add(worker)
+    worker.finished.connect(lambda: _running.discard(worker))
+    worker.start()
+    return worker
+
+
+def start_export(
+    parent: QtWidgets.QWidget,
+    db: DatabaseManager,
+    path: str,
+    rows: RowSource,
+    headers: Optional[Sequence[str]] = None,
+    total: Optional[int] = None,
+) -> BackgroundJob:
+    """Export rows in the background; the file appears at ``path`` only once complete."""
+    return run_in_background(parent, ExportWorker(db, path, rows, headers), total)
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 from PyQt6 import QtWidgets
+from PyQt6.QtCore import QTimer, Qt
 from typing import Optional, Dict, Any, List
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.pricing import apply_price_revision, preview_price_revision
+from ggs_accounting.models.tax import gst_enabled
+from ggs_accounting.ui.table_model import Column, IndexedRowsModel, source_row, table_view
+
+INVENTORY_COLUMNS = [
+    Column("Name", "name"),
+    Column("Customer", "customer_name"),
+    Column("Price", "price_excl_tax", "₹{:.2f}"),
+    Column("Stock", "stock_qty"),
+]
+
+# Quiet time after a keystroke before the search runs
+SEARCH_DELAY_MS = 150
 
 
 class ItemDialog(QtWidgets.QDialog):
@@ -17,6 +31,10 @@ class ItemDialog(QtWidgets.QDialog):
 
         self.name_edit = QtWidgets.QLineEdit()
         self.code_edit = QtWidgets.QLineEdit()
+        self.hsn_edit = QtWidgets.QLineEdit()
+        self.gst_spin = QtWidgets.QDoubleSpinBox()
+        self.gst_spin.setMaximum(100)
+        self.gst_spin.setSuffix("%")
         self.price_edit = QtWidgets.QDoubleSpinBox()
         self.price_edit.setMaximum(1e9)
         self.price_edit.setPrefix("₹")
@@ -27,6 +45,8 @@ class ItemDialog(QtWidgets.QDialog):
         form = QtWidgets.QFormLayout()
         form.addRow("Name", self.name_edit)
         form.addRow("Code", self.code_edit)
+        form.addRow("HSN", self.hsn_edit)
+        form.addRow("GST Rate", self.gst_spin)
         form.addRow("Price", self.price_edit)
         form.addRow("Stock", self.stock_edit)
         form.addRow("Customer", self.customer_combo)
@@ -52,6 +72,8 @@ class ItemDialog(QtWidgets.QDialog):
         if item:
             self.name_edit.setText(item.get("name", ""))
             self.code_edit.setText(item.get("item_code", ""))
+            self.hsn_edit.setText(item.get("hsn_code") or "")
+            self.gst_spin.setValue(float(item.get("gst_rate") or 0))
             self.price_edit.setValue(float(item.get("price_excl_tax", 0)))
             self.stock_edit.setValue(float(item.get("stock_qty", 0)))
             idx = self.customer_combo.findData(item.get("customer_id"))
@@ -77,6 +99,8 @@ class ItemDialog(QtWidgets.QDialog):
         data = {
             "name": name,
             "item_code": self.code_edit.text().strip(),
+            "hsn_code": self.hsn_edit.text().strip(),
+            "gst_rate": self.gst_spin.value(),
             "price_excl_tax": price,
             "stock_qty": self.stock_edit.value(),
             "customer_id": self.customer_combo.currentData(),
@@ -101,14 +125,113 @@ class ItemDialog(QtWidgets.QDialog):
         super().accept()
 
 
+class PriceRevisionDialog(QtWidgets.QDialog):
+    """Preview and apply a percentage or absolute change to many prices."""
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._rows: List[Dict[str, Any]] = []
+        self.setWindowTitle("Revise Prices")
+
+        self.item_combo = QtWidgets.QComboBox()
+        self.item_combo.addItem("All items", None)
+        items = {it["item_id"]: it["name"] for it in self._db.get_all_items()}
+        for item_id, name in sorted(items.items(), key=lambda kv: kv[1]):
+            self.item_combo.addItem(name, item_id)
+        self.grower_combo = QtWidgets.QComboBox()
+        self.grower_combo.addItem("All growers", None)
+        for g in self._db.get_customers_by_type("Grower"):
+            self.grower_combo.addItem(g["name"], g["customer_id"])
+        self.code_edit = QtWidgets.QLineEdit()
+        self.code_edit.setPlaceholderText("e.g. APL% (blank for any)")
+        self.mode_combo = QtWidgets.QComboBox()
+        self.mode_combo.addItems(["Percent", "Amount"])
+        self.value_spin = QtWidgets.QDoubleSpinBox()
+        self.value_spin.setRange(-1e6, 1e6)
+        self.value_spin.setDecimals(2)
+
+        form = QtWidgets.QFormLayout()
+        form.addRow("Item", self.item_combo)
+        form.addRow("Grower", self.grower_combo)
+        form.addRow("Code Pattern", self.code_edit)
+        form.addRow("Change", self.mode_combo)
+        form.addRow("By", self.value_spin)
+
+        self.table = QtWidgets.QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Item", "Grower", "Old Price", "New Price"])
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.summary_label = QtWidgets.QLabel("")
+
+        preview_btn = QtWidgets.QPushButton("Preview")
+        preview_btn.clicked.connect(self._preview)
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Apply
+            | QtWidgets.QDialogButtonBox.StandardButton.Close
+        )
+        apply_btn = buttons.button(QtWidgets.QDialogButtonBox.StandardButton.Apply)
+        if apply_btn is not None:
+            apply_btn.clicked.connect(self._apply)
+        buttons.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(form)
+        layout.addWidget(preview_btn)
+        layout.addWidget(self.table)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(buttons)
+
+    def _preview(self) -> None:
+        value = self.value_spin.value()
+        is_percent = self.mode_combo.currentText() == "Percent"
+        try:
+            self._rows = preview_price_revision(
+                self._db,
+                item_id=self.item_combo.currentData(),
+                customer_id=self.grower_combo.currentData(),
+                code_pattern=self.code_edit.text().strip() or None,
+                percent=value if is_percent else None,
+                amount=None if is_percent else value,
+            )
+        except ValueError as exc:
+            self._rows = []
+            QtWidgets.QMessageBox.warning(self, "Validation", str(exc))
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            self._rows = []
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+        self.table.setRowCount(len(self._rows))
+        for row, rec in enumerate(self._rows):
+            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(rec["name"]))
+            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(rec["customer_name"]))
+            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{rec['old_price']:.2f}"))
+            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"₹{rec['new_price']:.2f}"))
+        self.summary_label.setText(f"{len(self._rows)} prices will change")
+
+    def _apply(self) -> None:
+        if not self._rows:
+            QtWidgets.QMessageBox.warning(self, "Validation", "Preview a revision first")
+            return
+        try:
+            count = apply_price_revision(self._db, self._rows)
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        QtWidgets.QMessageBox.information(self, "Saved", f"Updated {count} prices")
+        self.accept()
+
+
 class InventoryPanel(QtWidgets.QWidget):
     """Widget for managing inventory items."""
 
+    # Rows archived per event-loop turn while compacting
+    COMPACT_BATCH = 200
+
     def __init__(self, db: DatabaseManager) -> None:
         super().__init__()
         self._db = db
         self._items: List[Dict[str, Any]] = []
         self._customers: List[Dict[str, Any]] = []
+        self._growers: Dict[int, str] = {}
         self._init_ui()
         self._load_customers()
         self._load_items()
@@ -119,33 +242,46 @@ class InventoryPanel(QtWidgets.QWidget):
         controls = QtWidgets.QHBoxLayout()
         self.search_edit = QtWidgets.QLineEdit()
         self.search_edit.setPlaceholderText("Search...")
-        self.search_edit.textChanged.connect(self._apply_filter)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._apply_filter)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        self.search_edit.returnPressed.connect(self._apply_filter)
         add_btn = QtWidgets.QPushButton("Add")
         edit_btn = QtWidgets.QPushButton("Edit")
         del_btn = QtWidgets.QPushButton("Delete")
         refresh_btn = QtWidgets.QPushButton("Refresh")
+        compact_btn = QtWidgets.QPushButton("Compact")
+        revise_btn = QtWidgets.QPushButton("Revise Prices")
+        stock_take_btn = QtWidgets.QPushButton("Stock Take")
         add_btn.clicked.connect(self._add_item)
         edit_btn.clicked.connect(self._edit_item)
         del_btn.clicked.connect(self._delete_item)
         refresh_btn.clicked.connect(self._load_items)
+        compact_btn.clicked.connect(self._compact)
+        revise_btn.clicked.connect(self._revise_prices)
+        stock_take_btn.clicked.connect(self._stock_take)
         controls.addWidget(self.search_edit)
-        for btn in [add_btn, edit_btn, del_btn, refresh_btn]:
+        for btn in [add_btn, edit_btn, del_btn, refresh_btn, revise_btn, stock_take_btn, compact_btn]:
             controls.addWidget(btn)
         layout.addLayout(controls)
 
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Name", "Customer", "Price", "Stock"])
-        header = self.table.horizontalHeader()
-        if header is not None:
-            header.setStretchLastSection(True)
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        # Search matches the item name only
+        self.model = IndexedRowsModel(INVENTORY_COLUMNS, "name", parent=self)
+        self.table = table_view(self.model)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         layout.addWidget(self.table)
 
-        gst = self._db.get_setting("GST")
-        if gst:
+        if gst_enabled(self._db.get_setting("GST")):
             note = QtWidgets.QLabel("Prices exclude GST; tax added on invoices.")
             layout.addWidget(note)
 
+        self.status_label = QtWidgets.QLabel("")
+        layout.addWidget(self.status_label)
+        self._compacting = False
+        self._compacted = 0
+
     # ---- UI helpers ----
     def _load_customers(self) -> None:
         """Load growers for customer lookups."""
@@ -154,6 +290,7 @@ class InventoryPanel(QtWidgets.QWidget):
         except Exception as exc:  # pragma: no cover - unexpected errors
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             self._customers = []
+        self._growers = {g["customer_id"]: g["name"] for g in self._customers}
 
     def _load_items(self) -> None:
         self._load_customers()
@@ -162,38 +299,20 @@ class InventoryPanel(QtWidgets.QWidget):
         except Exception as exc:  # pragma: no cover - unexpected errors
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             self._items = []
-        self._apply_filter()
+        self._populate_table(self._items)
 
     def _apply_filter(self) -> None:
-        query = self.search_edit.text().strip().lower()
-        filtered = [item for item in self._items if query in item["name"].lower()]
-        self._populate_table(filtered)
+        self._search_timer.stop()
+        self.model.set_search(self.search_edit.text())
 
     def _populate_table(self, items: List[Dict[str, Any]]) -> None:
-        self.table.setRowCount(len(items))
-        for row, item in enumerate(items):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(item.get("name", ""))))
-            customer_name = ""
-            if item.get("customer_id"):
-                customer = next((g for g in self._customers if g["customer_id"] == item["customer_id"]), None)
-                if customer:
-                    customer_name = customer["name"]
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(customer_name))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{item.get('price_excl_tax', 0):.2f}"))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(str(item.get("stock_qty", 0))))
-            self.table.setRowHeight(row, 20)
-        self.table.resizeColumnsToContents()
+        growers = self._growers
+        for item in items:
+            item["customer_name"] = growers.get(item.get("customer_id"), "")
+        self.model.set_rows(items)
 
     def _get_selected_item(self) -> Optional[Dict[str, Any]]:
-        row = self.table.currentRow()
-        if row < 0 or row >= self.table.rowCount():
-            return None
-        # map table row to item via filter
-        query = self.search_edit.text().strip().lower()
-        filtered = [item for item in self._items if query in item["name"].lower()]
-        if row >= len(filtered):
-            return None
-        return filtered[row]
+        return source_row(self.table)
 
     # ---- Button handlers ----
     def _add_item(self) -> None:
@@ -226,9 +345,47 @@ class InventoryPanel(QtWidgets.QWidget):
                 QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             self._load_items()
 
+    def _revise_prices(self) -> None:
+        dlg = PriceRevisionDialog(self._db)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self._load_items()
+
+    def _stock_take(self) -> None:
+        from ggs_accounting.ui.stock_take_dialog import StockTakeDialog
+
+        dlg = StockTakeDialog(self._db)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self._load_items()
+
+    # ---- Compaction ----
+    def _compact(self) -> None:
+        """Archive sold-out price rows one small batch per event-loop turn."""
+        if self._compacting:
+            return
+        self._compacting = True
+        self._compacted = 0
+        QTimer.singleShot(0, self._compact_batch)
+
+    def _compact_batch(self) -> None:
+        try:
+            removed = self._db.compact_inventory(self.COMPACT_BATCH, max_batches=1)
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            self._compacting = False
+            self.status_label.setText(str(exc))
+            return
+        self._compacted += removed
+        if removed >= self.COMPACT_BATCH:
+            QTimer.singleShot(0, self._compact_batch)
+            return
+        self._compacting = False
+        if self._compacted:
+            self.status_label.setText(f"Archived {self._compacted} sold-out price rows")
+            self._load_items()
+
     def showEvent(self, a0):
         """Refresh data when the panel becomes visible."""
         self._load_customers()
         self._load_items()
+        self._compact()
         super().showEvent(a0)
 
@@ -3,22 +3,48 @@ from __future__ import annotations
 from PyQt6 import QtWidgets
 from PyQt6.QtCore import Qt
 from datetime import date
-from typing import List, Dict, Any, cast, Tuple, Optional
+from typing import List, Dict, Any, Iterable, cast, Tuple, Optional
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.bill_totals import BillTotals
 from ggs_accounting.models.invoice_logic import InvoiceLogic
+from ggs_accounting.models.pricing import PriceSuggester
+from ggs_accounting.models.tax import gst_enabled
+from ggs_accounting.printing.thermal import ThermalPrinter
+from ggs_accounting.ui.name_list import NameListModel, name_combo
+
+
+def _by_name(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index records by name; the first record wins when names repeat."""
+    index: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        index.setdefault(rec["name"], rec)
+    return index
 
 
 class InvoicePanel(QtWidgets.QWidget):
     """Simple panel for creating sales or purchase invoices."""
 
-    def __init__(self, db: DatabaseManager) -> None:
+    def __init__(self, db: DatabaseManager, logic: Optional[InvoiceLogic] = None) -> None:
         super().__init__()
         self._db = db
-        self._logic = InvoiceLogic(db)
-        self._items: List[Dict[str, Any]] = []
-        self._customers: List[Dict[str, Any]] = []
-        self._growers: List[Dict[str, Any]] = []
+        self._logic = logic or InvoiceLogic(db)
+        self._prices = PriceSuggester(db)
+        self._logic.add_listener(self._prices.on_invoice_saved)
+        # Records by name, so a row's lookups cost the same however many
+        # parties and items there are
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._customers: Dict[str, Dict[str, Any]] = {}
+        self._growers: Dict[str, Dict[str, Any]] = {}
+        self._totals = BillTotals()
+        self._charge_gst = False
+        self._gst_rates: Dict[str, float] = {}
+        # One list per column, shared by the combos of every row
+        self.customer_names = NameListModel(parent=self)
+        self.item_names = NameListModel(parent=self)
+        self.grower_names = NameListModel(parent=self)
+        # Printer setting the slip box was last defaulted from
+        self._slip_printer: Optional[str] = None
         self._init_ui()
         self._load_customers()
         self._load_items()
@@ -46,12 +72,13 @@ class InvoicePanel(QtWidgets.QWidget):
         add_line_btn.clicked.connect(self._add_line)
         layout.addWidget(add_line_btn)
 
-        # Table: Customer, Item, Item Source, Qty, Price, Total, Delete
-        self.table = QtWidgets.QTableWidget(0, 7)
+        # Table: Customer, Item, Item Source, Available, Qty, Price, Total, Delete
+        self.table = QtWidgets.QTableWidget(0, 8)
         self.table.setHorizontalHeaderLabels([
             "Customer",
             "Item",
             "Item Source",
+            "Available",
             "Qty",
             "Price (₹)",
             "Total (₹)",
@@ -65,7 +92,9 @@ class InvoicePanel(QtWidgets.QWidget):
         buttons = QtWidgets.QHBoxLayout()
         save_btn = QtWidgets.QPushButton("Save")
         save_btn.clicked.connect(self._save_invoice)
+        self.slip_check = QtWidgets.QCheckBox("Print slip")
         buttons.addStretch()
+        buttons.addWidget(self.slip_check)
         buttons.addWidget(save_btn)
         layout.addLayout(buttons)
 
@@ -73,10 +102,13 @@ class InvoicePanel(QtWidgets.QWidget):
         self.amount_paid = QtWidgets.QDoubleSpinBox()
         self.amount_paid.setMaximum(1e9)
         self.amount_paid.setPrefix("₹")
+        self.amount_paid.valueChanged.connect(self._on_paid_changed)
         self.subtotal_label = QtWidgets.QLabel("Subtotal: 0.00")
         self.due_label = QtWidgets.QLabel("Due: 0.00")
+        self.tax_label = QtWidgets.QLabel("GST: 0.00")
         totals_layout.addRow("Paid", self.amount_paid)
         totals_layout.addRow(self.subtotal_label, self.due_label)
+        totals_layout.addRow(self.tax_label)
         layout.addLayout(totals_layout)
 
     # ---- Data loading ----
@@ -86,41 +118,25 @@ class InvoicePanel(QtWidgets.QWidget):
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             all_cust = []
-        self._customers = all_cust
-        self._growers = [c for c in all_cust if c.get("customer_type") == "Grower"]
-        for row in range(self.table.rowCount()):
-            cust_combo = self.table.cellWidget(row, 0)
-            src_combo = self.table.cellWidget(row, 2)
-            if isinstance(cust_combo, QtWidgets.QComboBox):
-                current = cust_combo.currentText()
-                cust_combo.clear()
-                cust_combo.addItem("")
-                cust_combo.addItems([c["name"] for c in self._customers])
-                idx = cust_combo.findText(current)
-                cust_combo.setCurrentIndex(idx if idx >= 0 else 0)
-            if isinstance(src_combo, QtWidgets.QComboBox):
-                current = src_combo.currentText()
-                src_combo.clear()
-                src_combo.addItem("")
-                src_combo.addItems([c["name"] for c in self._growers])
-                idx = src_combo.findText(current)
-                src_combo.setCurrentIndex(idx if idx >= 0 else 0)
+        self._customers = _by_name(all_cust)
+        self._growers = _by_name(c for c in all_cust if c.get("customer_type") == "Grower")
+        self.customer_names.set_names(self._customers)
+        self.grower_names.set_names(self._growers)
 
     def _load_items(self) -> None:
         try:
-            self._items = self._db.get_all_items()
+            items = self._db.get_all_items()
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
-            self._items = []
-        for row in range(self.table.rowCount()):
-            item_combo = self.table.cellWidget(row, 1)
-            if isinstance(item_combo, QtWidgets.QComboBox):
-                current = item_combo.currentText()
-                item_combo.clear()
-                item_combo.addItem("")
-                item_combo.addItems([it["name"] for it in self._items])
-                idx = item_combo.findText(current)
-                item_combo.setCurrentIndex(idx if idx >= 0 else 0)
+            items = []
+        self._items = _by_name(items)
+        self.item_names.set_names(self._items)
+        self._charge_gst = gst_enabled(self._db.get_setting("GST"))
+        self._gst_rates = (
+            {name: float(it.get("gst_rate") or 0) for name, it in self._items.items()} if self._charge_gst else {}
+        )
+        # Rates or the GST setting may have changed
+        self._recalc_totals()
 
     def _add_customer(self) -> None:
         from ggs_accounting.ui.party_dialog import CustomerDialog
@@ -135,39 +151,19 @@ class InvoicePanel(QtWidgets.QWidget):
             widget = self.table.cellWidget(row, 2)
             if isinstance(widget, QtWidgets.QComboBox):
                 widget.setEnabled(not is_purchase)
+        self._refresh_available()
 
     # ---- Table helpers ----
     def _add_line(self) -> None:
         row = self.table.rowCount()
         self.table.insertRow(row)
         # Customer dropdown per row
-        customer_combo = QtWidgets.QComboBox()
-        customer_combo.setEditable(True)
-        customer_combo.addItem("")
-        customer_combo.addItems([c["name"] for c in self._customers])
-        customer_combo.setInsertPolicy(QtWidgets.QComboBox.InsertPolicy.NoInsert)
-        customer_combo.setCurrentIndex(0)
-        customer_combo.lineEdit().textEdited.connect(customer_combo.showPopup)
+        customer_combo = name_combo(self.customer_names)
         # Item dropdown (independent of customer)
-        item_combo = QtWidgets.QComboBox()
-        item_combo.setEditable(True)
-        item_combo.addItem("")
-        item_combo.addItems([it["name"] for it in self._items])
-        item_combo.setInsertPolicy(QtWidgets.QComboBox.InsertPolicy.NoInsert)
-        item_combo.setCurrentIndex(0)
-        item_combo.lineEdit().textEdited.connect(item_combo.showPopup)
-        # Item source dropdown per row
-        source_combo = QtWidgets.QComboBox()
-        source_combo.setEditable(True)
-        if self.type_combo.currentText() == "Sale":
-            source_combo.addItem("")
-            source_combo.addItems([c["name"] for c in self._growers])
-            source_combo.setEnabled(True)
-        else:
-            # For purchase, do not preload any names and keep disabled
-            source_combo.clear()
-            source_combo.setEnabled(False)
-        source_combo.lineEdit().textEdited.connect(source_combo.showPopup)
+        item_combo = name_combo(self.item_names)
+        # Item source: the grower supplying a sale; not used for purchases
+        source_combo = name_combo(self.grower_names)
+        source_combo.setEnabled(self.type_combo.currentText() == "Sale")
         qty_spin = QtWidgets.QDoubleSpinBox()
         qty_spin.setMaximum(1e6)
         qty_spin.setValue(1)
@@ -176,25 +172,109 @@ class InvoicePanel(QtWidgets.QWidget):
         price_spin.setPrefix("₹")
         price_spin.setValue(0.0)
         total_item = QtWidgets.QTableWidgetItem("₹0.00")
+        available_item = QtWidgets.QTableWidgetItem("")
+        available_item.setFlags(available_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
         del_btn = QtWidgets.QPushButton("Delete")
-        del_btn.clicked.connect(lambda _, r=row: self._delete_row(r))
-        qty_spin.valueChanged.connect(self._recalc_totals)
-        price_spin.valueChanged.connect(self._recalc_totals)
-        item_combo.currentTextChanged.connect(self._recalc_totals)
-        source_combo.currentTextChanged.connect(self._recalc_totals)
-        customer_combo.currentTextChanged.connect(self._recalc_totals)
+        del_btn.clicked.connect(lambda _=False, t=total_item: self._delete_line(t))
+
+        def line_changed(*_args: Any) -> None:
+            if self._set_line(total_item, item_combo, qty_spin, price_spin):
+                self._show_totals()
+
+        def show_available(*_args: Any) -> None:
+            self._show_available(item_combo, source_combo, qty_spin, available_item)
+
+        def suggest_price(*_args: Any) -> None:
+            self._suggest_price(item_combo, customer_combo, price_spin)
+
+        qty_spin.valueChanged.connect(line_changed)
+        price_spin.valueChanged.connect(line_changed)
+        item_combo.currentTextChanged.connect(line_changed)
+        item_combo.currentTextChanged.connect(show_available)
+        source_combo.currentTextChanged.connect(show_available)
+        qty_spin.valueChanged.connect(show_available)
+        item_combo.currentTextChanged.connect(suggest_price)
+        customer_combo.currentTextChanged.connect(suggest_price)
         self.table.setCellWidget(row, 0, customer_combo)
         self.table.setCellWidget(row, 1, item_combo)
         self.table.setCellWidget(row, 2, source_combo)
-        self.table.setCellWidget(row, 3, qty_spin)
-        self.table.setCellWidget(row, 4, price_spin)
-        self.table.setItem(row, 5, total_item)
-        self.table.setCellWidget(row, 6, del_btn)
-        self._recalc_totals()
+        self.table.setItem(row, 3, available_item)
+        self.table.setCellWidget(row, 4, qty_spin)
+        self.table.setCellWidget(row, 5, price_spin)
+        self.table.setItem(row, 6, total_item)
+        self.table.setCellWidget(row, 7, del_btn)
+        line_changed()
+
+    def _show_available(
+        self,
+        item_combo: QtWidgets.QComboBox,
+        source_combo: QtWidgets.QComboBox,
+        qty_spin: QtWidgets.QDoubleSpinBox,
+        cell: QtWidgets.QTableWidgetItem,
+    ) -> None:
+        """Show the stock left for the row's item and source grower."""
+        item = self._items.get(item_combo.currentText().strip())
+        source = self._growers.get(source_combo.currentText().strip())
+        if self.type_combo.currentText() != "Sale" or item is None or source is None:
+            cell.setText("")
+            cell.setForeground(self.palette().text())
+            return
+        try:
+            available = self._logic.stock.available(item["item_id"], source["customer_id"])
+        except Exception:  # pragma: no cover
+            cell.setText("")
+            return
+        cell.setText(f"{available:g}")
+        cell.setForeground(Qt.GlobalColor.red if qty_spin.value() > available else self.palette().text())
 
-    def _delete_row(self, row: int) -> None:
+    def _suggest_price(
+        self,
+        item_combo: QtWidgets.QComboBox,
+        customer_combo: QtWidgets.QComboBox,
+        price_spin: QtWidgets.QDoubleSpinBox,
+    ) -> None:
+        """Prefill the row price with the party's last price for the item.
+
+        A price typed by hand is left alone; only an empty price or one this
+        method filled in earlier is replaced.
+        """
+        suggested = price_spin.property("suggested")
+        if price_spin.value() != 0 and price_spin.value() != suggested:
+            return
+        item = self._items.get(item_combo.currentText().strip())
+        customer = self._customers.get(customer_combo.currentText().strip())
+        if item is None or customer is None:
+            return
+        try:
+            price = self._prices.suggest(item["item_id"], customer["customer_id"], self.type_combo.currentText())
+        except Exception:  # pragma: no cover
+            return
+        if price is None:
+            return
+        price_spin.setProperty("suggested", price)
+        price_spin.setValue(price)
+
+    def _refresh_available(self) -> None:
+        for row in range(self.table.rowCount()):
+            item_combo = self.table.cellWidget(row, 1)
+            source_combo = self.table.cellWidget(row, 2)
+            qty_spin = self.table.cellWidget(row, 4)
+            cell = self.table.item(row, 3)
+            if (
+                isinstance(item_combo, QtWidgets.QComboBox)
+                and isinstance(source_combo, QtWidgets.QComboBox)
+                and isinstance(qty_spin, QtWidgets.QDoubleSpinBox)
+                and cell is not None
+            ):
+                self._show_available(item_combo, source_combo, qty_spin, cell)
+
+    def _delete_line(self, total_item: QtWidgets.QTableWidgetItem) -> None:
+        row = self.table.row(total_item)
+        if row < 0:
+            return
+        self._totals.remove_line(id(total_item))
         self.table.removeRow(row)
-        self._recalc_totals()
+        self._show_totals()
 
     def _gather_items(self) -> Tuple[Optional[int], List[Dict[str, Any]]]:
         items: List[Dict[str, Any]] = []
@@ -204,8 +284,8 @@ class InvoicePanel(QtWidgets.QWidget):
             customer_widget = self.table.cellWidget(row, 0)
             item_widget = self.table.cellWidget(row, 1)
             source_widget = self.table.cellWidget(row, 2)
-            qty_widget = self.table.cellWidget(row, 3)
-            price_widget = self.table.cellWidget(row, 4)
+            qty_widget = self.table.cellWidget(row, 4)
+            price_widget = self.table.cellWidget(row, 5)
             if not isinstance(customer_widget, QtWidgets.QComboBox) or not isinstance(item_widget, QtWidgets.QComboBox) or not isinstance(source_widget, QtWidgets.QComboBox):
                 continue
             customer_name = customer_widget.currentText().strip()
@@ -223,7 +303,7 @@ class InvoicePanel(QtWidgets.QWidget):
                     QtWidgets.QMessageBox.warning(self, "Validation", f"Item source required in row {row+1}")
                     return []
             # Find or add customer
-            customer = next((c for c in self._customers if c["name"] == customer_name), None)
+            customer = self._customers.get(customer_name)
             if customer is None:
                 ans = QtWidgets.QMessageBox.question(self, "Add Customer?", f"Customer '{customer_name}' not found. Add new?", QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No)
                 if ans == QtWidgets.QMessageBox.StandardButton.Yes:
@@ -232,14 +312,14 @@ class InvoicePanel(QtWidgets.QWidget):
                     dlg.name_edit.setText(customer_name)
                     if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
                         self._load_customers()
-                        customer = next((c for c in self._customers if c["name"] == customer_name), None)
+                        customer = self._customers.get(customer_name)
                 if customer is None:
                     QtWidgets.QMessageBox.warning(self, "Validation", f"Customer '{customer_name}' not found.")
                     return []
             # Find or add item source (only for Sale)
             source = None
             if not is_purchase:
-                source = next((c for c in self._growers if c["name"] == source_name), None)
+                source = self._growers.get(source_name)
                 if source is None:
                     ans = QtWidgets.QMessageBox.question(self, "Add Customer?", f"Item source '{source_name}' not found. Add new?", QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No)
                     if ans == QtWidgets.QMessageBox.StandardButton.Yes:
@@ -248,12 +328,12 @@ class InvoicePanel(QtWidgets.QWidget):
                         dlg.name_edit.setText(source_name)
                         if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
                             self._load_customers()
-                            source = next((c for c in self._growers if c["name"] == source_name), None)
+                            source = self._growers.get(source_name)
                     if source is None:
                         QtWidgets.QMessageBox.warning(self, "Validation", f"Item source '{source_name}' not found.")
                         return []
             # Find or add item (independent of customer)
-            item = next((it for it in self._items if it["name"] == item_name), None)
+            item = self._items.get(item_name)
             if item is None:
                 ans = QtWidgets.QMessageBox.question(self, "Add Item?", f"Item '{item_name}' not found. Add new?", QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No)
                 if ans == QtWidgets.QMessageBox.StandardButton.Yes:
@@ -274,7 +354,7 @@ class InvoicePanel(QtWidgets.QWidget):
                             customer_id=supplier_id,
                         )
                         self._load_items()
-                        item = next((it for it in self._items if it["name"] == item_name), None)
+                        item = self._items.get(item_name)
                     except Exception as exc:
                         QtWidgets.QMessageBox.critical(self, "Error", f"Failed to add new item '{item_name}': {exc}")
                         return []
@@ -299,21 +379,56 @@ class InvoicePanel(QtWidgets.QWidget):
             items.append(item_dict)
         return inv_customer_id, items
 
+    def _set_line(
+        self,
+        total_item: QtWidgets.QTableWidgetItem,
+        item_combo: QtWidgets.QComboBox,
+        qty_spin: QtWidgets.QDoubleSpinBox,
+        price_spin: QtWidgets.QDoubleSpinBox,
+    ) -> bool:
+        """Update one line's total cell and its share of the bill totals.
+
+        Lines are keyed by their total item, which moves with the row
+        when rows above it are deleted. Returns whether the line's figures
+        changed.
+        """
+        key = id(total_item)
+        rate = self._gst_rates.get(item_combo.currentText().strip(), 0.0) if self._charge_gst else 0.0
+        if not self._totals.set_line(key, qty_spin.value(), price_spin.value(), rate):
+            return False
+        text = f"₹{self._totals.amount(key):.2f}"
+        if total_item.text() != text:
+            total_item.setText(text)
+        return True
+
     def _recalc_totals(self) -> None:
-        subtotal = 0.0
+        """Re-run every line, as after the GST rates are reloaded."""
         for row in range(self.table.rowCount()):
-            qty_widget = self.table.cellWidget(row, 3)
-            price_widget = self.table.cellWidget(row, 4)
-            qty = cast(QtWidgets.QDoubleSpinBox, qty_widget).value()
-            price = cast(QtWidgets.QDoubleSpinBox, price_widget).value()
-            total = qty * price
-            subtotal += total
-            item = QtWidgets.QTableWidgetItem(f"₹{total:.2f}")
-            self.table.setItem(row, 5, item)
-        paid = self.amount_paid.value() if hasattr(self, "amount_paid") else 0.0
-        due = subtotal - paid
-        self.subtotal_label.setText(f"Subtotal: ₹{subtotal:.2f}")
-        self.due_label.setText(f"Due: ₹{due:.2f}")
+            total_item = self.table.item(row, 6)
+            item_widget = self.table.cellWidget(row, 1)
+            qty_widget = self.table.cellWidget(row, 4)
+            price_widget = self.table.cellWidget(row, 5)
+            if total_item is None or not isinstance(item_widget, QtWidgets.QComboBox):
+                continue
+            self._set_line(
+                total_item,
+                item_widget,
+                cast(QtWidgets.QDoubleSpinBox, qty_widget),
+                cast(QtWidgets.QDoubleSpinBox, price_widget),
+            )
+        self._show_totals()
+
+    def _on_paid_changed(self, value: float) -> None:
+        self._totals.paid = value
+        self._show_due()
+
+    def _show_totals(self) -> None:
+        self.subtotal_label.setText(f"Subtotal: ₹{self._totals.subtotal:.2f}")
+        self.tax_label.setText(f"GST: ₹{self._totals.tax:.2f}")
+        self._show_due()
+
+    def _show_due(self) -> None:
+        self.due_label.setText(f"Due: ₹{self._totals.due:.2f}")
 
     # ---- Save ----
     def _save_invoice(self) -> None:
@@ -325,7 +440,7 @@ class InvoicePanel(QtWidgets.QWidget):
         date_str = self.date_edit.date().toString("yyyy-MM-dd")
         # customer_id already determined in _gather_items
         try:
-            self._logic.create_invoice(
+            inv_id = self._logic.create_invoice(
                 inv_type,
                 customer_id,  # Pass correct customer_id
                 items,
@@ -337,13 +452,30 @@ class InvoicePanel(QtWidgets.QWidget):
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             return
         self.table.setRowCount(0)
-        self._recalc_totals()
+        self._totals.clear()
+        self._show_totals()
         self.amount_paid.setValue(0.0)
+        if self.slip_check.isChecked():
+            try:
+                ThermalPrinter(self._db).print_invoice(inv_id)
+            except Exception as exc:
+                QtWidgets.QMessageBox.warning(self, "Slip", f"Invoice saved, but the slip did not print: {exc}")
+            return
         QtWidgets.QMessageBox.information(self, "Saved", "Invoice saved")
 
     def showEvent(self, a0):
         """Refresh data when the panel becomes visible."""
         self._load_customers()
         self._load_items()
+        printer = self._db.get_setting("thermal_printer") or ""
+        self.slip_check.setEnabled(bool(printer))
+        # Default the box only when the printer setting changes, so the
+        # cashier's choice survives switching tabs
+        if printer != self._slip_printer:
+            self._slip_printer = printer
+            self.slip_check.setChecked(bool(printer))
+        # Stock may have been edited on another tab
+        self._logic.stock.invalidate()
+        self._refresh_available()
         super().showEvent(a0)
 
@@ -59,14 +59,29 @@ class MainWindow(QtWidgets.QMainWindow):
         from .payment_panel import PaymentPanel
         from .reports_inventory import InventoryValuationPanel
         from .settings_panel import SettingsPanel
+        from .reports_cube import SalesCubePanel
+        from .reports_ageing import AgeingPanel
+        from .reports_margin import MarginPanel
+        from .reports_gst import GstSummaryPanel
+        from ggs_accounting.models.invoice_logic import InvoiceLogic
+        from ggs_accounting.reports.cube import SalesCube
+
+        # Shared so panels see invoices saved from the billing tab
+        self._logic = InvoiceLogic(self._db)
+        self._cube = SalesCube(self._db)
+        self._logic.add_listener(self._cube.on_invoice_saved)
 
         self._stack.addTab(InventoryPanel(self._db), "Inventory")
-        self._stack.addTab(InvoicePanel(self._db), "Billing")
+        self._stack.addTab(InvoicePanel(self._db, self._logic), "Billing")
         self._stack.addTab(PaymentPanel(self._db), "Payments")
         self._stack.addTab(ReceiptConsole(self._db), "Receipts")
         self._stack.addTab(ReportsPanel(self._db), "SQL")
         self._stack.addTab(CustomerBalancePanel(self._db), "Customer Balances")
+        self._stack.addTab(AgeingPanel(self._db), "Ageing")
         self._stack.addTab(InventoryValuationPanel(self._db), "Inventory Value")
+        self._stack.addTab(SalesCubePanel(self._cube), "Sales Analysis")
+        self._stack.addTab(MarginPanel(self._db), "Margins")
+        self._stack.addTab(GstSummaryPanel(self._db), "GST Summary")
         self._stack.addTab(self._create_placeholder("Backup"), "Backup")
 
         if self._role is UserRole.ADMIN:
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtCore import Qt
+
+
+def _order(name: str) -> tuple:
+    return (name.casefold(), name)
+
+
+class NameListModel(QtCore.QStringListModel):
+    """Sorted, distinct names shared by every combo that picks from one list.
+
+    The first row is always ``""`` so a combo can show nothing chosen.
+    :meth:`set_names` merges a new list into the current one, inserting
+    and removing only the rows that changed; combos keep their selection
+    and views redraw only what moved.
+    """
+
+    def __init__(self, names: Iterable[str] = (), parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__([""], parent)
+        self.set_names(names)
+
+    def set_names(self, names: Iterable[str]) -> None:
+        wanted: List[str] = [""] + sorted({n for n in names if n}, key=_order)
+        current = self.stringList()
+        if current == wanted:
+            return
+        # Both lists are sorted the same way, so one merge pass finds the
+        # runs of rows to remove and to insert
+        row = i = 1
+        while i < len(wanted) or row < len(current):
+            if row < len(current) and i < len(wanted) and current[row] == wanted[i]:
+                row += 1
+                i += 1
+                continue
+            end = row
+            while end < len(current) and (i == len(wanted) or _order(current[end]) < _order(wanted[i])):
+                end += 1
+            if end > row:
+                self.removeRows(row, end - row)
+                del current[row:end]
+                continue
+            end = i
+            while end < len(wanted) and (row == len(current) or _order(wanted[end]) < _order(current[row])):
+                end += 1
+            self._insert(row, wanted[i:end])
+            current[row:row] = wanted[i:end]
+            row += end - i
+            i = end
+
+    def _insert(self, row: int, names: List[str]) -> None:
+        self.insertRows(row, len(names))
+        for offset, name in enumerate(names):
+            self.setData(self.index(row + offset), name)
+
+
+def name_combo(model: NameListModel, parent: Optional[QtWidgets.QWidget] = None) -> QtWidgets.QComboBox:
+    """An editable combo over a shared ``model``, completing on any part of a name.
+
+    The combo holds no copy of the names: its drop-down and the
+    completer's popup read the shared model, and only for the rows on
+    screen when opened.
+    """
+    combo = QtWidgets.QComboBox(parent)
+    combo.setEditable(True)
+    combo.setInsertPolicy(QtWidgets.QComboBox.InsertPolicy.NoInsert)
+    combo.setModel(model)
+    completer = QtWidgets.QCompleter(model, combo)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setFilterMode(Qt.MatchFlag.MatchContains)
+    completer.setCompletionMode(QtWidgets.QCompleter.CompletionMode.PopupCompletion)
+    combo.setCompleter(completer)
+    combo.setCurrentIndex(0)
+    return combo
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional
 
 from PyQt6 import QtWidgets
+from PyQt6.QtCore import Qt
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.ui.table_model import Column, PagedQueryModel, table_view
+
+PAYMENTS_SQL = """
+    SELECT Payments.payment_id, Payments.date, COALESCE(Customers.name, '') AS customer,
+           Payments.amount, CASE Payments.received WHEN 1 THEN 'Received' ELSE 'Paid' END AS type
+    FROM Payments
+    LEFT JOIN Customers ON Customers.customer_id = Payments.customer_id
+"""
+PAYMENT_COLUMNS = [
+    Column("Date", "date"),
+    Column("Customer", "customer"),
+    Column("Amount", "amount", "₹{:.2f}"),
+    Column("Type", "type"),
+]
 
 
 class PaymentPanel(QtWidgets.QWidget):
@@ -14,7 +29,6 @@ class PaymentPanel(QtWidgets.QWidget):
     def __init__(self, db: DatabaseManager) -> None:
         super().__init__()
         self._db = db
-        self._payments: List[Dict[str, Any]] = []
         self._customers: List[Dict[str, Any]] = []
         self._init_ui()
         self._load_customers()
@@ -37,17 +51,42 @@ class PaymentPanel(QtWidgets.QWidget):
         form.addRow("Amount", self.amount_spin)
         form.addRow("Type", self.type_combo)
         layout.addLayout(form)
+
+        # Open bills of the selected customer; selecting rows overrides FIFO
+        self.open_table = QtWidgets.QTableWidget(0, 3)
+        self.open_table.setHorizontalHeaderLabels(["Date", "Invoice", "Due"])
+        self.open_table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.open_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.open_table.setMaximumHeight(150)
+        open_header = self.open_table.horizontalHeader()
+        if open_header is not None:
+            open_header.setStretchLastSection(True)
+        layout.addWidget(QtWidgets.QLabel("Open invoices (select to settle specific bills)"))
+        layout.addWidget(self.open_table)
+        self.customer_combo.currentIndexChanged.connect(self._load_open_invoices)
+
         add_btn = QtWidgets.QPushButton("Record Payment")
         add_btn.clicked.connect(self._record)
-        layout.addWidget(add_btn)
-
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Date", "Customer", "Amount", "Type"])
-        header = self.table.horizontalHeader()
-        if header is not None:
-            header.setStretchLastSection(True)
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        import_btn = QtWidgets.QPushButton("Import Bank Statement")
+        import_btn.clicked.connect(self._import_statement)
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(add_btn)
+        buttons.addWidget(import_btn)
+        layout.addLayout(buttons)
+
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search payments...")
+        layout.addWidget(self.search_edit)
+        self.total_label = QtWidgets.QLabel()
+        self.model = PagedQueryModel(
+            self._db, PAYMENTS_SQL, PAYMENT_COLUMNS, totals=["amount"], key="payment_id", parent=self
+        )
+        self.model.modelReset.connect(self._show_total)
+        self.search_edit.textChanged.connect(self.model.set_search)
+        self.table = table_view(self.model)
+        self.table.sortByColumn(0, Qt.SortOrder.DescendingOrder)
         layout.addWidget(self.table)
+        layout.addWidget(self.total_label)
 
     def _load_customers(self) -> None:
         try:
@@ -55,31 +94,54 @@ class PaymentPanel(QtWidgets.QWidget):
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             self._customers = []
+        self.customer_combo.blockSignals(True)
         self.customer_combo.clear()
         for c in self._customers:
             self.customer_combo.addItem(c["name"], c["customer_id"])
+        self.customer_combo.blockSignals(False)
+        self._load_open_invoices()
+
+    def _load_open_invoices(self) -> None:
+        customer_id = self.customer_combo.currentData()
+        self._open_invoices: List[Dict[str, Any]] = []
+        if customer_id is not None:
+            try:
+                self._open_invoices = self._db.get_open_invoices(customer_id)
+            except Exception as exc:  # pragma: no cover
+                QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+        self.open_table.setRowCount(len(self._open_invoices))
+        for row, inv in enumerate(self._open_invoices):
+            self.open_table.setItem(row, 0, QtWidgets.QTableWidgetItem(inv["date"]))
+            self.open_table.setItem(row, 1, QtWidgets.QTableWidgetItem(f"{inv['type']} #{inv['inv_id']}"))
+            self.open_table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{inv['balance_due']:.2f}"))
+        self.open_table.resizeColumnsToContents()
+
+    def _manual_allocations(self, amount: float) -> Optional[Dict[int, float]]:
+        """Spread ``amount`` over the selected open invoices, oldest first."""
+        model = self.open_table.selectionModel()
+        rows = sorted({idx.row() for idx in model.selectedRows()}) if model is not None else []
+        if not rows:
+            return None
+        allocations: Dict[int, float] = {}
+        remaining = amount
+        for row in rows:
+            inv = self._open_invoices[row]
+            applied = min(remaining, float(inv["balance_due"]))
+            if applied <= 0:
+                break
+            allocations[inv["inv_id"]] = applied
+            remaining -= applied
+        return allocations
 
     def _load_payments(self) -> None:
         try:
-            self._payments = self._db.get_payments()
+            self.model.refresh()
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
-            self._payments = []
-        self.table.setRowCount(len(self._payments) + 1)
-        parties = {c["customer_id"]: c["name"] for c in self._customers}
-        total = 0.0
-        for row, p in enumerate(self._payments):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(p["date"]))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(parties.get(p["customer_id"], "")))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{p['amount']:.2f}"))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem("Received" if p.get("received", 1) else "Paid"))
-            total += float(p["amount"])
-        # total row
-        total_row = self.table.rowCount() - 1
-        self.table.setSpan(total_row, 0, 1, 2)
-        self.table.setItem(total_row, 0, QtWidgets.QTableWidgetItem("Total"))
-        self.table.setItem(total_row, 2, QtWidgets.QTableWidgetItem(f"₹{total:.2f}"))
-        self.table.resizeColumnsToContents()
+
+    def _show_total(self) -> None:
+        count = self.model.rowCount()
+        self.total_label.setText(f"{count:,} payments, total ₹{self.model.totals['amount']:.2f}")
 
     def _record(self) -> None:
         customer_id = self.customer_combo.currentData()
@@ -90,12 +152,27 @@ class PaymentPanel(QtWidgets.QWidget):
             return
         received = self.type_combo.currentText() == "Received"
         try:
-            self._db.record_payment(customer_id, amount, date_str, received=received)
+            self._db.record_payment(
+                customer_id,
+                amount,
+                date_str,
+                received=received,
+                allocations=self._manual_allocations(amount),
+            )
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             return
         self.amount_spin.setValue(0.0)
         self._load_payments()
+        self._load_open_invoices()
+
+    def _import_statement(self) -> None:
+        from ggs_accounting.ui.bank_import_dialog import BankImportDialog
+
+        dlg = BankImportDialog(self._db)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self._load_payments()
+            self._load_open_invoices()
 
     def showEvent(self, a0):
         """Refresh data when the panel becomes visible."""
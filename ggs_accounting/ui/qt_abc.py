@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import abc
+
+from PyQt6 import QtCore
+
+
+class QtABCMeta(type(QtCore.QObject), abc.ABCMeta):
+    """Metaclass letting Qt classes declare :func:`abc.abstractmethod` hooks.
+
+    A subclass missing an override cannot be instantiated, rather than
+    failing the first time the hook is called.
+    """
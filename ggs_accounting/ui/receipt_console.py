@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import webbrowser
 from datetime import date
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from PyQt6 import QtWidgets
 
 from ggs_accounting.db.db_manager import DatabaseManager
-from ggs_accounting.printing.print_receipts import ReceiptPrinter
+from ggs_accounting.printing.pdf_cache import PdfCache
+from ggs_accounting.printing.print_receipts import (
+    ReceiptPrinter,
+    iter_summary_rows,
+    render_detailed,
+    summary_query,
+    write_summary_pdf,
+)
+from ggs_accounting.printing.print_statements import INDEX_NAME, write_statements
+from ggs_accounting.ui.export_job import BackgroundJob, run_in_background
+from ggs_accounting.ui.table_model import Column, PagedQueryModel, table_view
+
+SUMMARY_COLUMNS = [
+    Column("Date", "date"),
+    Column("Invoice", "inv_id"),
+    Column("Party", "party"),
+    Column("Total (₹)", "total_amount", "₹{:.2f}"),
+]
 
 
 class ReceiptConsole(QtWidgets.QWidget):
@@ -34,7 +53,7 @@ class ReceiptConsole(QtWidgets.QWidget):
         self.type_combo = QtWidgets.QComboBox()
         self.type_combo.addItems(["All", "Sale", "Purchase"])
         self.format_combo = QtWidgets.QComboBox()
-        self.format_combo.addItems(["Detailed", "Summary"])
+        self.format_combo.addItems(["Detailed", "Detailed (zip)", "Summary"])
 
         form.addRow("From", self.from_date)
         form.addRow("To", self.to_date)
@@ -46,17 +65,21 @@ class ReceiptConsole(QtWidgets.QWidget):
         btns = QtWidgets.QHBoxLayout()
         show_btn = QtWidgets.QPushButton("Show")
         print_btn = QtWidgets.QPushButton("Print")
+        settle_btn = QtWidgets.QPushButton("Grower Settlements")
         show_btn.clicked.connect(self._show)
         print_btn.clicked.connect(self._print)
+        settle_btn.clicked.connect(self._settlements)
+        statements_btn = QtWidgets.QPushButton("Party Statements")
+        statements_btn.clicked.connect(self._statements)
         btns.addWidget(show_btn)
         btns.addWidget(print_btn)
+        btns.addWidget(settle_btn)
+        btns.addWidget(statements_btn)
         layout.addLayout(btns)
 
-        self.summary_table = QtWidgets.QTableWidget(0, 4)
-        self.summary_table.setHorizontalHeaderLabels(["Date", "Invoice", "Party", "Total (₹)"])
-        header = self.summary_table.horizontalHeader()
-        if header is not None:
-            header.setStretchLastSection(True)
+        sql, params = summary_query()
+        self.summary_model = PagedQueryModel(self._db, sql, SUMMARY_COLUMNS, params, key="inv_id", parent=self)
+        self.summary_table = table_view(self.summary_model)
         layout.addWidget(self.summary_table)
 
     def _load_customers(self) -> None:
@@ -70,33 +93,153 @@ class ReceiptConsole(QtWidgets.QWidget):
         for p in parties:
             self.party_combo.addItem(p["name"], p["customer_id"])
 
-    def _fetch(self) -> list:
-        start = self.from_date.date().toString("yyyy-MM-dd")
-        end = self.to_date.date().toString("yyyy-MM-dd")
-        party = self.party_combo.currentData()
+    def _filters(self) -> Dict[str, Any]:
         inv_type = self.type_combo.currentText()
-        if inv_type == "All":
-            inv_type = None
-        return self._printer.fetch_invoices(start, end, party, inv_type)
+        return {
+            "start_date": self.from_date.date().toString("yyyy-MM-dd"),
+            "end_date": self.to_date.date().toString("yyyy-MM-dd"),
+            "customer_id": self.party_combo.currentData(),
+            "inv_type": None if inv_type == "All" else inv_type,
+        }
 
     def _show(self) -> None:
-        invoices = self._fetch()
-        self.summary_table.setRowCount(len(invoices))
-        parties = {p["customer_id"]: p["name"] for p in self._db.get_all_customers()}
-        for row, inv in enumerate(invoices):
-            self.summary_table.setItem(row, 0, QtWidgets.QTableWidgetItem(inv["date"]))
-            self.summary_table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(inv["inv_id"])))
-            self.summary_table.setItem(row, 2, QtWidgets.QTableWidgetItem(parties.get(inv["customer_id"], "")))
-            self.summary_table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"₹{inv['total_amount']:.2f}"))
-        self.summary_table.resizeColumnsToContents()
+        try:
+            self.summary_model.set_query(*summary_query(**self._filters()))
+        except Exception as exc:  # pragma: no cover
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+
+    def _settlements(self) -> None:
+        out_dir = QtWidgets.QFileDialog.getExistingDirectory(self, "Settlement folder")
+        if not out_dir:
+            return
+        start = self.from_date.date().toString("yyyy-MM-dd")
+        end = self.to_date.date().toString("yyyy-MM-dd")
+        run_in_background(self, SettlementsJob(self._db, Path(out_dir), start, end))
+
+    def _statements(self) -> None:
+        out_dir = QtWidgets.QFileDialog.getExistingDirectory(self, "Statement folder")
+        if not out_dir:
+            return
+        start = self.from_date.date().toString("yyyy-MM-dd")
+        end = self.to_date.date().toString("yyyy-MM-dd")
+        run_in_background(self, StatementsJob(self._db, Path(out_dir), start, end))
 
     def _print(self) -> None:
-        invoices = self._fetch()
-        if not invoices:
+        filters = self._filters()
+        # Only the count is read here; the jobs read the invoices themselves
+        try:
+            count, _totals = self._db.summarize_query(*summary_query(**filters))
+        except Exception as exc:  # pragma: no cover
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        if not count:
             QtWidgets.QMessageBox.information(self, "No Data", "No invoices found")
             return
         fmt = self.format_combo.currentText()
         if fmt == "Summary":
-            self._printer.print_summary(invoices)
-        else:
-            self._printer.print_detailed(invoices)
+            job = SummaryJob(self._db, self._printer.output_path("summary"), filters)
+            run_in_background(self, job, count, on_success=webbrowser.open)
+            return
+        if fmt == "Detailed (zip)":
+            path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Invoices", filter="Zip Files (*.zip)")
+            if path:
+                job = DetailedReceiptJob(self._db, filters, path, as_zip=True, cache=self._printer.cache)
+                run_in_background(self, job, count)
+            return
+        job = DetailedReceiptJob(self._db, filters, self._printer.output_path("invoices"), cache=self._printer.cache)
+        run_in_background(self, job, count, on_success=webbrowser.open)
+
+
+class DetailedReceiptJob(BackgroundJob):
+    """Render the invoices matching ``filters`` through the process pool."""
+
+    noun = "invoices"
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        filters: Dict[str, Any],
+        path: str,
+        as_zip: bool = False,
+        cache: Optional[PdfCache] = None,
+    ) -> None:
+        super().__init__(path)
+        self._db = db
+        self._filters = filters
+        self._as_zip = as_zip
+        self._cache = cache
+
+    def work(self) -> int:
+        reader = DatabaseManager(self._db.db_path, read_only=True)
+        try:
+            inv_ids = [row[1] for row in iter_summary_rows(reader, **self._filters)]
+        finally:
+            reader.conn.close()
+        # Only the database path is used here; workers open their own connections
+        render_detailed(
+            self._db, inv_ids, self.path, as_zip=self._as_zip, progress=self._progress, cache=self._cache
+        )
+        return len(inv_ids)
+
+
+class SummaryJob(BackgroundJob):
+    """Stream the invoice summary PDF from a read-only connection."""
+
+    noun = "invoices"
+
+    def __init__(self, db: DatabaseManager, path: str, filters: Dict[str, Any]) -> None:
+        super().__init__(path)
+        self._db_path = db.db_path
+        self._filters = filters
+
+    def work(self) -> int:
+        reader = DatabaseManager(self._db_path, read_only=True)
+        try:
+            rows = iter_summary_rows(reader, **self._filters)
+            return write_summary_pdf(self.path, rows, progress=self._progress)
+        finally:
+            reader.conn.close()
+
+
+class StatementsJob(BackgroundJob):
+    """Write every party's statement from a read-only connection."""
+
+    noun = "statements"
+
+    def __init__(self, db: DatabaseManager, out_dir: Path, start_date: str, end_date: str) -> None:
+        super().__init__(str(out_dir / INDEX_NAME))
+        self._db_path = db.db_path
+        self._out_dir = out_dir
+        self._start = start_date
+        self._end = end_date
+
+    def work(self) -> int:
+        reader = DatabaseManager(self._db_path, read_only=True)
+        try:
+            write_statements(reader, self._start, self._end, self._out_dir, progress=self._progress)
+        finally:
+            reader.conn.close()
+        return self._written
+
+
+class SettlementsJob(BackgroundJob):
+    """Write every grower's settlement from a read-only connection."""
+
+    noun = "settlements"
+
+    def __init__(self, db: DatabaseManager, out_dir: Path, start_date: str, end_date: str) -> None:
+        super().__init__(str(out_dir))
+        self._db_path = db.db_path
+        self._out_dir = out_dir
+        self._start = start_date
+        self._end = end_date
+
+    def work(self) -> int:
+        from ggs_accounting.printing.print_settlements import write_settlement_pdfs
+
+        reader = DatabaseManager(self._db_path, read_only=True)
+        try:
+            paths = write_settlement_pdfs(reader, self._start, self._end, self._out_dir, progress=self._progress)
+        finally:
+            reader.conn.close()
+        return len(paths)
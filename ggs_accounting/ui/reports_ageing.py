@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QDate
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.ageing import AGEING_BUCKETS, compute_ageing
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, RowsModel, filter_proxy, search_edit, table_view
+
+
+class AgeingPanel(QtWidgets.QWidget):
+    """Receivables and payables split into ageing buckets."""
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._init_ui()
+        self._load_data()
+
+    def _init_ui(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+        btns = QtWidgets.QHBoxLayout()
+        self.as_of = QtWidgets.QDateEdit()
+        self.as_of.setCalendarPopup(True)
+        self.as_of.setDate(QDate.currentDate())
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        export_btn = QtWidgets.QPushButton("Export")
+        refresh_btn.clicked.connect(self._load_data)
+        export_btn.clicked.connect(self._export)
+        btns.addWidget(QtWidgets.QLabel("As of"))
+        btns.addWidget(self.as_of)
+        labels = [label for label, _low, _high in AGEING_BUCKETS]
+        columns = [
+            Column("Customer", "name"),
+            Column("Status", "status"),
+            *(Column(label, label, "{:.2f}") for label in labels),
+            Column("Balance", "balance", "{:.2f}"),
+        ]
+        self.model = RowsModel(columns, parent=self)
+        self.proxy = filter_proxy(self.model, self)
+        btns.addWidget(search_edit(self.proxy))
+        btns.addWidget(refresh_btn)
+        btns.addWidget(export_btn)
+        layout.addLayout(btns)
+
+        self.table = table_view(self.proxy)
+        layout.addWidget(self.table)
+
+    def _load_data(self) -> None:
+        try:
+            data = compute_ageing(self._db, self.as_of.date().toString("yyyy-MM-dd"))
+        except Exception as exc:  # pragma: no cover
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        self.model.set_rows(data)
+        self._data = data
+
+    def _export(self) -> None:
+        if not getattr(self, "_data", None):
+            return
+        path = ask_export_path(self)
+        if path:
+            data = list(self._data)
+            start_export(self, self._db, path, lambda _reader: data, total=len(data))
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QDate
+
+from ggs_accounting.reports.cube import DIMENSIONS, SalesCube
+from ggs_accounting.ui.table_model import Column, RowsModel, filter_proxy, search_edit, table_view
+
+CUBE_COLUMNS = [
+    Column("Group", "label"),
+    Column("Lines", "lines"),
+    Column("Qty", "quantity", "{:.2f}"),
+    Column("Amount (₹)", "amount", "₹{:.2f}"),
+]
+
+
+class SalesCubePanel(QtWidgets.QWidget):
+    """Slice and dice sales from the in-memory cube with drill-down."""
+
+    def __init__(self, cube: SalesCube) -> None:
+        super().__init__()
+        self._cube = cube
+        self._path: List[Tuple[str, Any]] = []
+        self._rows: List[Dict[str, Any]] = []
+        self._init_ui()
+
+    def _init_ui(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.from_date = QtWidgets.QDateEdit()
+        self.from_date.setCalendarPopup(True)
+        self.from_date.setDate(QDate.currentDate().addMonths(-1))
+        self.to_date = QtWidgets.QDateEdit()
+        self.to_date.setCalendarPopup(True)
+        self.to_date.setDate(QDate.currentDate())
+        self.dim_combo = QtWidgets.QComboBox()
+        self.dim_combo.addItems(list(DIMENSIONS))
+        back_btn = QtWidgets.QPushButton("Back")
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        self.from_date.dateChanged.connect(self._refresh)
+        self.to_date.dateChanged.connect(self._refresh)
+        self.dim_combo.currentTextChanged.connect(self._refresh)
+        back_btn.clicked.connect(self._drill_up)
+        refresh_btn.clicked.connect(self._refresh)
+        controls.addWidget(QtWidgets.QLabel("From"))
+        controls.addWidget(self.from_date)
+        controls.addWidget(QtWidgets.QLabel("To"))
+        controls.addWidget(self.to_date)
+        controls.addWidget(QtWidgets.QLabel("Group by"))
+        controls.addWidget(self.dim_combo)
+        controls.addWidget(back_btn)
+        controls.addWidget(refresh_btn)
+        layout.addLayout(controls)
+
+        self.path_label = QtWidgets.QLabel("All sales")
+        layout.addWidget(self.path_label)
+
+        self.model = RowsModel(CUBE_COLUMNS, parent=self)
+        self.proxy = filter_proxy(self.model, self)
+        controls.addWidget(search_edit(self.proxy))
+        self.table = table_view(self.proxy)
+        self.table.doubleClicked.connect(lambda index: self._drill_down(self.proxy.mapToSource(index).row()))
+        layout.addWidget(self.table)
+
+        self.total_label = QtWidgets.QLabel()
+        layout.addWidget(self.total_label)
+
+    def _filters(self) -> Dict[str, Any]:
+        return {
+            "start": self.from_date.date().toString("yyyy-MM-dd"),
+            "end": self.to_date.date().toString("yyyy-MM-dd"),
+        }
+
+    def _refresh(self) -> None:
+        try:
+            # Picks up invoices saved outside the billing tab, e.g. imports
+            self._cube.refresh()
+            self._rows = self._cube.drill_down(self._path, self.dim_combo.currentText(), self._filters())
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        self.model.set_rows(self._rows)
+        total = sum(g["amount"] for g in self._rows)
+        self.total_label.setText(f"Total: ₹{total:.2f}")
+        crumbs = [f"{dim}={self._cube.label(dim, key)}" for dim, key in self._path]
+        self.path_label.setText(" > ".join(crumbs) or "All sales")
+
+    def _drill_down(self, row: int, _column: int = 0) -> None:
+        if row < 0 or row >= len(self._rows):
+            return
+        dim = self.dim_combo.currentText()
+        self._path.append((dim, self._rows[row]["key"]))
+        used = {d for d, _ in self._path}
+        remaining = [d for d in DIMENSIONS if d not in used]
+        if not remaining:
+            self._path.pop()
+            return
+        self.dim_combo.blockSignals(True)
+        self.dim_combo.setCurrentText(remaining[0])
+        self.dim_combo.blockSignals(False)
+        self._refresh()
+
+    def _drill_up(self) -> None:
+        if not self._path:
+            return
+        dim, _ = self._path.pop()
+        self.dim_combo.blockSignals(True)
+        self.dim_combo.setCurrentText(dim)
+        self.dim_combo.blockSignals(False)
+        self._refresh()
+
+    def showEvent(self, a0):
+        """Refresh the view when the panel becomes visible."""
+        self._refresh()
+        super().showEvent(a0)
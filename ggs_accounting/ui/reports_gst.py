@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QDate
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.gst import gst_summary
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, RowsModel, filter_proxy, search_edit, table_view
+
+
+class GstSummaryPanel(QtWidgets.QWidget):
+    """Rate-wise and HSN-wise GST totals for a filing period."""
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._init_ui()
+        self._load_data()
+
+    def _init_ui(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+        btns = QtWidgets.QHBoxLayout()
+        self.from_date = QtWidgets.QDateEdit()
+        self.from_date.setCalendarPopup(True)
+        today = QDate.currentDate()
+        self.from_date.setDate(QDate(today.year(), today.month(), 1))
+        self.to_date = QtWidgets.QDateEdit()
+        self.to_date.setCalendarPopup(True)
+        self.to_date.setDate(today)
+        self.by_combo = QtWidgets.QComboBox()
+        self.by_combo.addItem("Rate-wise", "rate")
+        self.by_combo.addItem("HSN-wise", "hsn")
+        self.type_combo = QtWidgets.QComboBox()
+        self.type_combo.addItems(["Sale", "Purchase"])
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        export_btn = QtWidgets.QPushButton("Export")
+        self.by_combo.currentIndexChanged.connect(self._load_data)
+        self.type_combo.currentIndexChanged.connect(self._load_data)
+        refresh_btn.clicked.connect(self._load_data)
+        export_btn.clicked.connect(self._export)
+        self.model = RowsModel([], parent=self)
+        self.proxy = filter_proxy(self.model, self)
+        search = search_edit(self.proxy)
+        for widget in (self.from_date, self.to_date, self.by_combo, self.type_combo, search, refresh_btn, export_btn):
+            btns.addWidget(widget)
+        layout.addLayout(btns)
+
+        self.table = table_view(self.proxy)
+        layout.addWidget(self.table)
+
+    def _load_data(self) -> None:
+        try:
+            data = gst_summary(
+                self._db,
+                self.from_date.date().toString("yyyy-MM-dd"),
+                self.to_date.date().toString("yyyy-MM-dd"),
+                by=self.by_combo.currentData(),
+                inv_type=self.type_combo.currentText(),
+            )
+        except Exception as exc:  # pragma: no cover
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        cols = list(data[0].keys()) if data else []
+        self.model.set_rows(data, [Column(c, c) for c in cols])
+        self._data = data
+
+    def _export(self) -> None:
+        if not getattr(self, "_data", None):
+            return
+        path = ask_export_path(self)
+        if path:
+            data = list(self._data)
+            start_export(self, self._db, path, lambda _reader: data, total=len(data))
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 from PyQt6 import QtWidgets
-import pandas as pd
+from PyQt6.QtCore import Qt
 
 from ggs_accounting.db.db_manager import DatabaseManager
-from ggs_accounting.models.reporting import get_inventory_values
+from ggs_accounting.models.reporting import inventory_values_query, iter_inventory_values
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, PagedQueryModel, table_view
+
+VALUATION_COLUMNS = [
+    Column("Item", "name"),
+    Column("Stock", "stock"),
+    Column("Price (₹)", "price", "₹{:.2f}"),
+    Column("Value (₹)", "value", "₹{:.2f}"),
+]
+INVENTORY_EXPORT_COLUMNS = ["item_id", "name", "customer_id", "customer_name", "stock", "price", "value"]
 
 
 class InventoryValuationPanel(QtWidgets.QWidget):
@@ -35,71 +45,76 @@ class InventoryValuationPanel(QtWidgets.QWidget):
         self.customer_combo = QtWidgets.QComboBox()
         self.item_combo.currentIndexChanged.connect(self._load_data)
         self.customer_combo.currentIndexChanged.connect(self._load_data)
+        self.total_label = QtWidgets.QLabel()
+        sql, params = inventory_values_query()
+        self.model = PagedQueryModel(
+            self._db,
+            sql,
+            VALUATION_COLUMNS,
+            params,
+            search_columns=["name", "customer_name"],
+            totals=["stock", "price", "value"],
+            key="inventory_id",
+            parent=self,
+        )
+        self.model.modelReset.connect(self._show_totals)
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search...")
+        self.search_edit.textChanged.connect(self.model.set_search)
         filters.addWidget(self.item_combo)
         filters.addWidget(self.customer_combo)
+        filters.addWidget(self.search_edit)
         layout.addLayout(filters)
 
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Item", "Stock", "Price (₹)", "Value (₹)"])
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
-        header = self.table.horizontalHeader()
-        if header is not None:
-            header.setStretchLastSection(True)
+        self.table = table_view(self.model)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         layout.addWidget(self.table)
-
-        self.total_label = QtWidgets.QLabel()
         layout.addWidget(self.total_label)
 
     def _load_filters(self) -> None:
         try:
-            self._items = self._db.get_all_items()
+            self._items = self._db.get_item_names()
             self._customers = self._db.get_customers_by_type("Grower")
         except Exception as exc:  # pragma: no cover - unexpected errors
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             self._items = []
             self._customers = []
+        # Filling the combos would reload the table once per entry
+        self.item_combo.blockSignals(True)
+        self.customer_combo.blockSignals(True)
         self.item_combo.clear()
         self.item_combo.addItem("All Items", None)
-        added = set()
         for it in self._items:
-            if it["item_id"] in added:
-                continue
-            added.add(it["item_id"])
             self.item_combo.addItem(it["name"], it["item_id"])
         self.customer_combo.clear()
         self.customer_combo.addItem("All Customers", None)
         for c in self._customers:
             self.customer_combo.addItem(c["name"], c["customer_id"])
+        self.item_combo.blockSignals(False)
+        self.customer_combo.blockSignals(False)
 
     def _load_data(self) -> None:
         item_id = self.item_combo.currentData()
         customer_id = self.customer_combo.currentData()
         try:
-            data, total = get_inventory_values(self._db, item_id=item_id, customer_id=customer_id)
+            self.model.set_query(*inventory_values_query(item_id, customer_id))
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
-            return
-        self.table.setRowCount(len(data))
-        for row, item in enumerate(data):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(item["name"]))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(item["stock"])))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"₹{item['price']:.2f}"))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"₹{item['value']:.2f}"))
-        self.table.resizeColumnsToContents()
-        total_stock = sum(d.get("stock", 0) for d in data)
-        total_price = sum(d.get("price", 0) for d in data)
+
+    def _show_totals(self) -> None:
+        totals = self.model.totals
         self.total_label.setText(
-            f"Totals - Stock: {total_stock:.2f} Price: ₹{total_price:.2f} Value: ₹{total:.2f}"
+            f"Totals - Stock: {totals['stock']:.2f} Price: ₹{totals['price']:.2f} Value: ₹{totals['value']:.2f}"
         )
-        self._data = data
 
     def _export(self) -> None:
-        if not getattr(self, "_data", None):
-            return
-        df = pd.DataFrame(self._data)
-        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export", filter="Excel Files (*.xlsx)")
+        path = ask_export_path(self)
         if path:
-            try:
-                df.to_excel(path, index=False)
-            except Exception as exc:  # pragma: no cover
-                QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            item_id = self.item_combo.currentData()
+            customer_id = self.customer_combo.currentData()
+            start_export(
+                self, self._db, path,
+                lambda reader: iter_inventory_values(reader, item_id=item_id, customer_id=customer_id),
+                INVENTORY_EXPORT_COLUMNS,
+                total=self.model.rowCount() or None,
+            )
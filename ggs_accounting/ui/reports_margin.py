@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QDate
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.margin import MARGIN_DIMENSIONS, margin_report
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, RowsModel, filter_proxy, search_edit, table_view
+
+MARGIN_COLUMNS = [
+    Column("Group", "label"),
+    Column("Qty", "quantity", "{:.2f}"),
+    Column("Revenue (₹)", "revenue", "₹{:.2f}"),
+    Column("Cost (₹)", "cost", "₹{:.2f}"),
+    Column("Margin (₹)", "margin", "₹{:.2f}"),
+    Column("Margin %", "margin_pct", "{:.1f}%"),
+]
+
+
+class MarginPanel(QtWidgets.QWidget):
+    """Sales margin by item, buyer, grower or day."""
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._init_ui()
+        self._load_data()
+
+    def _init_ui(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+        btns = QtWidgets.QHBoxLayout()
+        self.by_combo = QtWidgets.QComboBox()
+        self.by_combo.addItems(list(MARGIN_DIMENSIONS))
+        self.from_date = QtWidgets.QDateEdit()
+        self.from_date.setCalendarPopup(True)
+        self.from_date.setDate(QDate.currentDate().addMonths(-1))
+        self.to_date = QtWidgets.QDateEdit()
+        self.to_date.setCalendarPopup(True)
+        self.to_date.setDate(QDate.currentDate())
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        export_btn = QtWidgets.QPushButton("Export")
+        self.by_combo.currentTextChanged.connect(self._load_data)
+        refresh_btn.clicked.connect(self._load_data)
+        export_btn.clicked.connect(self._export)
+        btns.addWidget(QtWidgets.QLabel("By"))
+        btns.addWidget(self.by_combo)
+        btns.addWidget(self.from_date)
+        btns.addWidget(self.to_date)
+        self.model = RowsModel(MARGIN_COLUMNS, parent=self)
+        self.proxy = filter_proxy(self.model, self)
+        btns.addWidget(search_edit(self.proxy))
+        btns.addWidget(refresh_btn)
+        btns.addWidget(export_btn)
+        layout.addLayout(btns)
+
+        self.table = table_view(self.proxy)
+        layout.addWidget(self.table)
+
+        self.total_label = QtWidgets.QLabel()
+        layout.addWidget(self.total_label)
+
+    def _load_data(self) -> None:
+        try:
+            data = margin_report(
+                self._db,
+                self.by_combo.currentText(),
+                self.from_date.date().toString("yyyy-MM-dd"),
+                self.to_date.date().toString("yyyy-MM-dd"),
+            )
+        except Exception as exc:  # pragma: no cover
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        self.model.set_rows(data)
+        revenue = sum(d["revenue"] for d in data)
+        margin = sum(d["margin"] for d in data)
+        self.total_label.setText(f"Totals - Revenue: ₹{revenue:.2f} Margin: ₹{margin:.2f}")
+        self._data = data
+
+    def _export(self) -> None:
+        if not getattr(self, "_data", None):
+            return
+        path = ask_export_path(self)
+        if path:
+            data = list(self._data)
+            start_export(self, self._db, path, lambda _reader: data, total=len(data))
@@ -6,6 +6,8 @@ from PyQt6 import QtWidgets
 
 from ggs_accounting.db.db_manager import DatabaseManager
 from ggs_accounting.models import reporting
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, PagedQueryModel, table_view
 
 
 class ReportsPanel(QtWidgets.QWidget):
@@ -34,22 +36,25 @@ class ReportsPanel(QtWidgets.QWidget):
         self.name_edit.setPlaceholderText("Enter custom SQL name to be saved")
         run_btn = QtWidgets.QPushButton("Run")
         save_btn = QtWidgets.QPushButton("Save")
+        export_btn = QtWidgets.QPushButton("Export")
         run_btn.clicked.connect(self._run_query)
         save_btn.clicked.connect(self._save_query)
+        export_btn.clicked.connect(self._export)
 
         top.addWidget(self.template_combo)
         top.addWidget(self.saved_combo)
         top.addWidget(self.name_edit)
         top.addWidget(save_btn)
         top.addWidget(run_btn)
+        top.addWidget(export_btn)
         layout.addLayout(top)
 
         self.sql_edit = QtWidgets.QPlainTextEdit()
         self.sql_edit.setPlaceholderText("SELECT ...")
         layout.addWidget(self.sql_edit)
 
-        self.table = QtWidgets.QTableWidget(0, 0)
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.model = PagedQueryModel(self._db, "", [], parent=self)
+        self.table = table_view(self.model)
         layout.addWidget(self.table)
 
     def _apply_template(self, name: str) -> None:
@@ -78,17 +83,24 @@ class ReportsPanel(QtWidgets.QWidget):
         if not sql:
             return
         try:
-            cols, rows = reporting.run_query(self._db, sql)
+            # Rows are read a page at a time as the table scrolls
+            cols = self._db.query_columns(sql)
+            self.model.set_query(sql, columns=[Column(c, c) for c in cols])
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+
+    def _export(self) -> None:
+        """Run the query again in the background and stream every row to a file."""
+        sql = self.sql_edit.toPlainText().strip()
+        if not sql:
+            return
+        if not sql.lower().startswith("select"):
+            QtWidgets.QMessageBox.warning(self, "Validation", "Only SELECT queries are allowed")
             return
-        self.table.setColumnCount(len(cols))
-        self.table.setHorizontalHeaderLabels([str(c) for c in cols])
-        self.table.setRowCount(len(rows))
-        for r, row in enumerate(rows):
-            for c, val in enumerate(row):
-                self.table.setItem(r, c, QtWidgets.QTableWidgetItem(str(val)))
-        self.table.resizeColumnsToContents()
+        path = ask_export_path(self)
+        if path:
+            # Headers come from the cursor description
+            start_export(self, self._db, path, lambda reader: reader.stream_raw_query(sql)[1])
 
     def _save_query(self) -> None:
         name = self.name_edit.text().strip()
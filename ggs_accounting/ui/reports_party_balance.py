@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 from PyQt6 import QtWidgets
-import pandas as pd
+from PyQt6.QtCore import Qt
 
 from ggs_accounting.db.db_manager import DatabaseManager
-from ggs_accounting.models.reporting import get_customer_balances
+from ggs_accounting.models.reporting import CUSTOMER_BALANCES_SQL, iter_customer_balances
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+from ggs_accounting.ui.table_model import Column, PagedQueryModel, table_view
+
+BALANCE_COLUMNS = [
+    Column("Customer", "name"),
+    Column("Balance", "balance", "{:.2f}"),
+    Column("Status", "status"),
+]
 
 
 class CustomerBalancePanel(QtWidgets.QWidget):
@@ -23,39 +31,29 @@ class CustomerBalancePanel(QtWidgets.QWidget):
         export_btn = QtWidgets.QPushButton("Export")
         refresh_btn.clicked.connect(self._load_data)
         export_btn.clicked.connect(self._export)
+        self.model = PagedQueryModel(self._db, CUSTOMER_BALANCES_SQL, BALANCE_COLUMNS, key="customer_id", parent=self)
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search...")
+        self.search_edit.textChanged.connect(self.model.set_search)
+        btns.addWidget(self.search_edit)
         btns.addWidget(refresh_btn)
         btns.addWidget(export_btn)
         layout.addLayout(btns)
 
-        self.table = QtWidgets.QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["Customer", "Balance", "Status"])
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
-        header = self.table.horizontalHeader()
-        if header is not None:
-            header.setStretchLastSection(True)
+        self.table = table_view(self.model)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         layout.addWidget(self.table)
 
     def _load_data(self) -> None:
         try:
-            data = get_customer_balances(self._db)
+            self.model.refresh()
         except Exception as exc:  # pragma: no cover
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
-            return
-        self.table.setRowCount(len(data))
-        for row, item in enumerate(data):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(item["name"]))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(f"{item['balance']:.2f}"))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(item["status"]))
-        self.table.resizeColumnsToContents()
-        self._data = data
 
     def _export(self) -> None:
-        if not getattr(self, "_data", None):
-            return
-        df = pd.DataFrame(self._data)
-        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export", filter="Excel Files (*.xlsx)")
+        path = ask_export_path(self)
         if path:
-            try:
-                df.to_excel(path, index=False)
-            except Exception as exc:  # pragma: no cover
-                QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            start_export(
+                self, self._db, path, iter_customer_balances, ["name", "balance", "status"],
+                total=self.model.rowCount() or None,
+            )
@@ -3,6 +3,8 @@ from __future__ import annotations
 from PyQt6 import QtWidgets
 
 from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.tax import gst_enabled
+from ggs_accounting.printing.thermal import PAPER_COLUMNS
 
 
 class SettingsPanel(QtWidgets.QWidget):
@@ -18,15 +20,36 @@ class SettingsPanel(QtWidgets.QWidget):
         layout = QtWidgets.QFormLayout(self)
         self.company_edit = QtWidgets.QLineEdit()
         self.address_edit = QtWidgets.QLineEdit()
+        self.gst_check = QtWidgets.QCheckBox("Add GST to invoices")
+        self.commission_spin = QtWidgets.QDoubleSpinBox()
+        self.commission_spin.setMaximum(100)
+        self.commission_spin.setSuffix("%")
+        self.charge_spin = QtWidgets.QDoubleSpinBox()
+        self.charge_spin.setMaximum(1e6)
+        self.charge_spin.setPrefix("₹")
+        self.thermal_edit = QtWidgets.QLineEdit()
+        self.thermal_edit.setPlaceholderText("Device (e.g. /dev/usb/lp0) or spool folder")
+        self.paper_combo = QtWidgets.QComboBox()
+        self.paper_combo.addItems([f"{mm} mm" for mm in PAPER_COLUMNS])
         save_btn = QtWidgets.QPushButton("Save")
         save_btn.clicked.connect(self._save_settings)
         layout.addRow("Company Name", self.company_edit)
         layout.addRow("Address", self.address_edit)
+        layout.addRow("GST", self.gst_check)
+        layout.addRow("Grower Commission", self.commission_spin)
+        layout.addRow("Charge per Unit", self.charge_spin)
+        layout.addRow("Slip Printer", self.thermal_edit)
+        layout.addRow("Slip Paper", self.paper_combo)
         layout.addRow(save_btn)
 
     def _load_settings(self) -> None:
         self.company_edit.setText(self._db.get_setting("company_name") or "")
         self.address_edit.setText(self._db.get_setting("company_address") or "")
+        self.gst_check.setChecked(gst_enabled(self._db.get_setting("GST")))
+        self.commission_spin.setValue(float(self._db.get_setting("commission_rate") or 0))
+        self.charge_spin.setValue(float(self._db.get_setting("settlement_charge_per_unit") or 0))
+        self.thermal_edit.setText(self._db.get_setting("thermal_printer") or "")
+        self.paper_combo.setCurrentText(f"{self._db.get_setting('thermal_paper_mm') or 80} mm")
 
     def _save_settings(self) -> None:
         try:
@@ -34,6 +57,13 @@ class SettingsPanel(QtWidgets.QWidget):
             self._db.set_setting(
                 "company_address", self.address_edit.text().strip()
             )
+            self._db.set_setting("GST", "1" if self.gst_check.isChecked() else "")
+            self._db.set_setting("commission_rate", str(self.commission_spin.value()))
+            self._db.set_setting(
+                "settlement_charge_per_unit", str(self.charge_spin.value())
+            )
+            self._db.set_setting("thermal_printer", self.thermal_edit.text().strip())
+            self._db.set_setting("thermal_paper_mm", self.paper_combo.currentText().split()[0])
         except Exception as exc:  # pragma: no cover - unexpected errors
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             return
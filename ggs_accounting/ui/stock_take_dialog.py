@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List
+
+from PyQt6 import QtWidgets
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.stock_take import (
+    compute_variances,
+    post_variances,
+    read_count_sheet,
+    variance_report,
+)
+from ggs_accounting.ui.export_job import ask_export_path, start_export
+
+
+class StockTakeDialog(QtWidgets.QDialog):
+    """Import a physical count sheet, review variances and post them."""
+
+    COLUMNS = ["Line", "Code", "Item", "Grower", "System", "Counted", "Variance", "Value", "Status"]
+
+    def __init__(self, db: DatabaseManager) -> None:
+        super().__init__()
+        self._db = db
+        self._rows: List[Dict[str, Any]] = []
+        self.setWindowTitle("Stock Take")
+        self.resize(800, 500)
+
+        controls = QtWidgets.QHBoxLayout()
+        import_btn = QtWidgets.QPushButton("Import Counts")
+        export_btn = QtWidgets.QPushButton("Export Variances")
+        self.date_edit = QtWidgets.QDateEdit()
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDate(date.today())
+        self.reference_edit = QtWidgets.QLineEdit()
+        self.reference_edit.setPlaceholderText("Reference")
+        import_btn.clicked.connect(self._import)
+        export_btn.clicked.connect(self._export)
+        for widget in (import_btn, export_btn, self.date_edit, self.reference_edit):
+            controls.addWidget(widget)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.summary_label = QtWidgets.QLabel("")
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        post_btn = buttons.addButton("Post Adjustments", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        if post_btn is not None:
+            post_btn.clicked.connect(self._post)
+        buttons.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.table)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(buttons)
+
+    def load_sheet(self, path: str) -> None:
+        self._rows = compute_variances(self._db, read_count_sheet(path))
+        self._populate()
+
+    def _import(self) -> None:
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Import Counts", filter="Count Sheets (*.csv *.xlsx)"
+        )
+        if not path:
+            return
+        try:
+            self.load_sheet(path)
+        except ValueError as exc:
+            QtWidgets.QMessageBox.warning(self, "Validation", str(exc))
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+
+    def _populate(self) -> None:
+        self.table.setRowCount(len(self._rows))
+        for row, rec in enumerate(self._rows):
+            values = [
+                rec["line"], rec["item_code"], rec["item_name"] or "", rec["grower"],
+                f"{rec['system_qty']:g}", "" if rec["counted"] is None else f"{rec['counted']:g}",
+                f"{rec['variance']:g}", f"₹{rec['value']:.2f}", rec["status"],
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QtWidgets.QTableWidgetItem(str(value)))
+        changes = [r for r in self._rows if r["status"] == "OK" and r["variance"]]
+        problems = sum(1 for r in self._rows if r["status"] != "OK")
+        net = sum(r["value"] for r in changes)
+        self.summary_label.setText(
+            f"{len(self._rows)} lines, {len(changes)} variances (net ₹{net:.2f}), {problems} need attention"
+        )
+
+    def _post(self) -> None:
+        if not self._rows:
+            QtWidgets.QMessageBox.warning(self, "Validation", "Import a count sheet first")
+            return
+        try:
+            count = post_variances(
+                self._db,
+                self._rows,
+                self.date_edit.date().toString("yyyy-MM-dd"),
+                self.reference_edit.text().strip(),
+            )
+        except Exception as exc:  # pragma: no cover - unexpected errors
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
+        QtWidgets.QMessageBox.information(self, "Saved", f"Posted {count} adjustments")
+        self.accept()
+
+    def _export(self) -> None:
+        if not self._rows:
+            return
+        path = ask_export_path(self)
+        if path:
+            report = variance_report(self._rows)
+            rows = list(report.itertuples(index=False, name=None))
+            start_export(self, self._db, path, lambda _reader: rows, list(report.columns), total=len(rows))
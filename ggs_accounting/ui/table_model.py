@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import abc
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtCore import QModelIndex, Qt
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.ui.qt_abc import QtABCMeta
+
+# Raw cell values, so numbers sort as numbers whatever their display format
+SORT_ROLE = Qt.ItemDataRole.UserRole
+PAGE_SIZE = 500
+# Pages kept per model; older ones are read again if scrolled back to
+MAX_PAGES = 20
+ROW_HEIGHT = 20
+
+_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+
+class Column(NamedTuple):
+    """A table column: header, the row key (name or position) and a display format."""
+
+    title: str
+    key: Union[str, int]
+    fmt: str = "{}"
+
+
+class TableModel(QtCore.QAbstractTableModel, metaclass=QtABCMeta):
+    """Read-only table over rows fetched by :meth:`row`.
+
+    Cells are formatted only when the view asks for them, so the cost of a
+    refresh follows the visible rows rather than the row count.
+    """
+
+    def __init__(self, columns: Sequence[Column], parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.columns = list(columns)
+
+    @abc.abstractmethod
+    def row(self, n: int) -> Any:
+        """Row ``n``, indexable by the columns' keys."""
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section].title
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, SORT_ROLE, Qt.ItemDataRole.TextAlignmentRole):
+            return None
+        column = self.columns[index.column()]
+        try:
+            value = self.row(index.row())[column.key]
+        except IndexError:
+            # Rows deleted since the count; the next refresh drops them
+            return None
+        if role == SORT_ROLE:
+            return value
+        numeric = isinstance(value, (int, float))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return _RIGHT if numeric else None
+        if value is None:
+            return ""
+        try:
+            return column.fmt.format(value)
+        except (TypeError, ValueError):
+            # SQLite columns can mix types from row to row
+            return str(value)
+
+    def set_columns(self, columns: Sequence[Column]) -> None:
+        self.beginResetModel()
+        self.columns = list(columns)
+        self.endResetModel()
+
+
+class RowsModel(TableModel):
+    """Rows already in memory, such as a computed report.
+
+    Put a :func:`filter_proxy` in front of it for sorting and search.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Column],
+        rows: Iterable[Any] = (),
+        parent: Optional[QtCore.QObject] = None,
+    ) -> None:
+        super().__init__(columns, parent)
+        self._rows: List[Any] = list(rows)
+
+    def row(self, n: int) -> Any:
+        return self._rows[n]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def set_rows(self, rows: Iterable[Any], columns: Optional[Sequence[Column]] = None) -> None:
+        self.beginResetModel()
+        if columns is not None:
+            self.columns = list(columns)
+        self._rows = list(rows)
+        self.endResetModel()
+
+
+class IndexedRowsModel(RowsModel):
+    """In-memory rows searched through a precomputed index, sorting themselves.
+
+    :meth:`set_rows` builds an index from each distinct lowercased
+    ``search_key`` value to the rows having it. A search looks for the
+    text in the distinct values only, and when the text merely grows, in
+    the previous matches only, so typing in a large table does not
+    rescan it. The model's rows are the matched records in sort order,
+    so a view row maps straight to its record without a proxy.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Column],
+        search_key: Union[str, int],
+        rows: Iterable[Any] = (),
+        parent: Optional[QtCore.QObject] = None,
+    ) -> None:
+        super().__init__(columns, (), parent)
+        self.search_key = search_key
+        self._all: List[Any] = []
+        self._index: Dict[str, List[int]] = {}
+        self._order: List[int] = []
+        self._sort: Optional[tuple] = None
+        self._search = ""
+        self._matched: Optional[List[str]] = None
+        self.set_rows(rows)
+
+    @property
+    def total(self) -> int:
+        """Rows before the search."""
+        return len(self._all)
+
+    def set_rows(self, rows: Iterable[Any], columns: Optional[Sequence[Column]] = None) -> None:
+        """Replace the rows, keeping the current search and sort."""
+        self._all = list(rows)
+        index: Dict[str, List[int]] = {}
+        for n, rec in enumerate(self._all):
+            index.setdefault(str(rec[self.search_key] or "").lower(), []).append(n)
+        self._index = index
+        self._matched = None
+        if columns is not None:
+            self.columns = list(columns)
+        self._order = self._sorted()
+        search, self._search = self._search, ""
+        self.set_search(search, force=True)
+
+    def set_search(self, text: str, force: bool = False) -> None:
+        needle = text.strip().lower()
+        if needle == self._search and not force:
+            return
+        if not needle:
+            matched = None
+        else:
+            narrowing = self._matched is not None and self._search and needle.startswith(self._search)
+            values = self._matched if narrowing else self._index
+            matched = [v for v in values if needle in v]  # type: ignore[union-attr]
+        self._search = needle
+        self._matched = matched
+        self._show()
+
+    def _show(self) -> None:
+        self.beginResetModel()
+        if self._matched is None:
+            self._rows = [self._all[n] for n in self._order]
+        else:
+            hits = {n for value in self._matched for n in self._index[value]}
+            self._rows = [self._all[n] for n in self._order if n in hits]
+        self.endResetModel()
+
+    def _sorted(self) -> List[int]:
+        positions = list(range(len(self._all)))
+        if self._sort is None:
+            return positions
+        key, descending = self._sort
+        values = [rec[key] for rec in self._all]
+        try:
+            positions.sort(key=lambda n: (values[n] is not None, values[n]), reverse=descending)
+        except TypeError:
+            # SQLite columns can mix types from row to row
+            positions.sort(key=lambda n: str(values[n] or ""), reverse=descending)
+        return positions
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        if not 0 <= column < len(self.columns):
+            return
+        self._sort = (self.columns[column].key, order == Qt.SortOrder.DescendingOrder)
+        self._order = self._sorted()
+        self._show()
+
+
+class PagedQueryModel(TableModel):
+    """Rows of a SELECT read a page at a time as the view scrolls.
+
+    Only the row count is read up front. Search and sort run in SQL: a
+    sort/filter proxy would have to read every row to do either, which
+    is what this model avoids. Column keys are result column names.
+
+    ``key`` names a result column unique per row. It breaks ties in the
+    sort, and lets a page read after its predecessor start from that
+    page's last row instead of counting past every row before it.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        sql: str,
+        columns: Sequence[Column],
+        params: Sequence[Any] = (),
+        search_columns: Optional[Sequence[str]] = None,
+        totals: Sequence[str] = (),
+        key: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        parent: Optional[QtCore.QObject] = None,
+    ) -> None:
+        super().__init__(columns, parent)
+        self._db = db
+        self._key = key
+        self._sql = sql
+        self._params = list(params)
+        self._search_columns = search_columns
+        self._search = ""
+        self._order: Optional[str] = None
+        self._descending = False
+        self.page_size = page_size
+        self._pages: "OrderedDict[int, List[Any]]" = OrderedDict()
+        # (sort value, key) of the last row of each page read
+        self._bounds: Dict[int, tuple] = {}
+        self._count = 0
+        self._totals = list(totals)
+        # Sums of the ``totals`` columns over the searched rows
+        self.totals: Dict[str, float] = {c: 0.0 for c in totals}
+
+    def set_query(
+        self,
+        sql: str,
+        params: Sequence[Any] = (),
+        columns: Optional[Sequence[Column]] = None,
+        search_columns: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Show another query; the sort order is kept if its column still exists."""
+        self._sql = sql
+        self._params = list(params)
+        if columns is not None:
+            self.columns = list(columns)
+            self._search_columns = search_columns
+            if self._order not in {str(c.key) for c in self.columns}:
+                self._order = None
+        self.refresh()
+
+    def set_search(self, text: str) -> None:
+        if text != self._search:
+            self._search = text
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Re-count the rows and drop cached pages."""
+        self.beginResetModel()
+        self._pages.clear()
+        self._bounds.clear()
+        self._count = 0
+        if not self._sql:
+            self.endResetModel()
+            return
+        try:
+            self._count, self.totals = self._db.summarize_query(
+                self._sql, self._params, self._search, self._searched(), self._totals
+            )
+        finally:
+            self.endResetModel()
+
+    def _searched(self) -> Sequence[str]:
+        if self._search_columns is not None:
+            return self._search_columns
+        return [c.key for c in self.columns if isinstance(c.key, str)]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._count
+
+    def row(self, n: int) -> Any:
+        number = n // self.page_size
+        page = self._pages.get(number)
+        if page is None:
+            page = self._db.fetch_query_page(
+                self._sql,
+                self._params,
+                search=self._search,
+                search_columns=self._searched(),
+                order_by=self._order,
+                descending=self._descending,
+                key=self._key,
+                after=self._bounds.get(number - 1),
+                limit=self.page_size,
+                offset=number * self.page_size,
+            )
+            self._pages[number] = page
+            if page and self._key and self._order:
+                self._bounds[number] = (page[-1][self._order], page[-1][self._key])
+            if len(self._pages) > MAX_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page[n - number * self.page_size]
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self._order = str(self.columns[column].key) if 0 <= column < len(self.columns) else None
+        self._descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+
+def filter_proxy(model: TableModel, parent: Optional[QtCore.QObject] = None) -> QtCore.QSortFilterProxyModel:
+    """Sort and case-insensitive search over every column of ``model``."""
+    proxy = QtCore.QSortFilterProxyModel(parent)
+    proxy.setSourceModel(model)
+    proxy.setSortRole(SORT_ROLE)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    return proxy
+
+
+def search_edit(proxy: QtCore.QSortFilterProxyModel, placeholder: str = "Search...") -> QtWidgets.QLineEdit:
+    """A line edit that filters ``proxy`` as the user types."""
+    edit = QtWidgets.QLineEdit()
+    edit.setPlaceholderText(placeholder)
+    edit.textChanged.connect(proxy.setFilterFixedString)
+    return edit
+
+
+def table_view(model: QtCore.QAbstractItemModel, parent: Optional[QtWidgets.QWidget] = None) -> QtWidgets.QTableView:
+    """A read-only, sortable view with fixed row heights.
+
+    Fixed heights let the view lay out rows without asking the model for
+    them, so only the visible rows are ever read.
+    """
+    view = QtWidgets.QTableView(parent)
+    view.setModel(model)
+    view.setSortingEnabled(True)
+    view.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+    view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setWordWrap(False)
+    vertical = view.verticalHeader()
+    if vertical is not None:
+        vertical.setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        vertical.setDefaultSectionSize(ROW_HEIGHT)
+    header = view.horizontalHeader()
+    if header is not None:
+        header.setStretchLastSection(True)
+        header.setDefaultSectionSize(120)
+    return view
+
+
+def source_row(view: QtWidgets.QTableView) -> Optional[Any]:
+    """The source model's row under the view's current index, if any."""
+    index = view.currentIndex()
+    if not index.isValid():
+        return None
+    model = view.model()
+    while isinstance(model, QtCore.QSortFilterProxyModel):
+        index = model.mapToSource(index)
+        model = model.sourceModel()
+    if not isinstance(model, TableModel):
+        return None
+    return model.row(index.row())
@@ -1,13 +1,20 @@
 import csv
 import datetime as _dt
+import itertools
 import locale
 import os
+import sqlite3
 import subprocess
-from typing import Iterable, Mapping, Sequence, Optional
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Mapping, Sequence, Optional, Tuple
 
 __all__ = [
     "export_to_csv",
     "export_to_excel",
+    "export_rows",
+    "atomic_output",
+    "ExportCancelled",
     "print_pdf_via_windows",
     "open_pdf",
     "format_currency",
@@ -22,48 +29,159 @@ except Exception:  # pragma: no cover - openpyxl optional
     Workbook = None
 
 
-def export_to_csv(filename: str, data: Iterable[Mapping[str, object] | Sequence[object]], headers: Optional[Sequence[str]] = None) -> None:
-    """Export rows of data to a CSV file."""
+def _tabulate(
+    data: Iterable[Mapping[str, object] | Sequence[object]], headers: Optional[Sequence[str]]
+) -> Tuple[List[str], Iterator[Sequence[object]]]:
+    """Return ``(headers, rows)`` with rows as sequences, consuming ``data`` lazily.
+
+    Only the first row is read ahead, so generators and database cursors
+    are streamed. Without ``headers`` they come from the first mapping's
+    keys or a cursor's ``description``.
+    """
+    rows = iter(data)
+    first = next(rows, None)
+    if headers is None:
+        description = getattr(data, "description", None)
+        if description:
+            headers = [d[0] for d in description]
+        elif isinstance(first, Mapping):
+            headers = list(first.keys())
+    names = list(headers or [])
+    if first is None:
+        return names, iter(())
+    rows = itertools.chain((first,), rows)
+    if isinstance(first, Mapping):
+        return names, ([row.get(h) for h in names] for row in rows)  # type: ignore[union-attr]
+    return names, rows  # type: ignore[return-value]
+
+
+class ExportCancelled(Exception):
+    """Raised from an export ``progress`` callback to stop the export."""
+
+
+# Rows written between calls to an export's ``progress`` callback.
+PROGRESS_EVERY = 1000
+
+
+def _reporting(rows: Iterable[Sequence[object]], progress: Optional[Callable[[int], None]]) -> Iterator[Sequence[object]]:
+    if progress is None:
+        yield from rows
+        return
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            progress(count)
+    progress(count)
+
+
+def export_to_csv(
+    filename: str,
+    data: Iterable[Mapping[str, object] | Sequence[object]],
+    headers: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Export rows of data to a CSV file, writing them as they are read.
+
+    ``progress`` is called with the running row count; it may raise
+    :class:`ExportCancelled` to stop.
+    """
     try:
         with open(filename, "w", newline="", encoding="utf-8") as fh:
-            if headers:
-                writer = csv.DictWriter(fh, fieldnames=headers) if isinstance(next(iter(data), {}), Mapping) else csv.writer(fh)
-                if isinstance(writer, csv.DictWriter):
-                    writer.writeheader()
-                    writer.writerows(data)  # type: ignore[arg-type]
-                else:
-                    writer.writerow(headers)
-                    writer.writerows(data)  # type: ignore[arg-type]
-            else:
-                if isinstance(next(iter(data), {}), Mapping):
-                    headers = list(next(iter(data)).keys()) if data else []
-                    writer = csv.DictWriter(fh, fieldnames=headers)
-                    writer.writeheader()
-                    writer.writerows(data)  # type: ignore[arg-type]
-                else:
-                    writer = csv.writer(fh)
-                    writer.writerows(data)
-    except OSError as exc:
+            names, rows = _tabulate(data, headers)
+            writer = csv.writer(fh)
+            if names:
+                writer.writerow(names)
+            writer.writerows(_reporting(rows, progress))
+    except (OSError, sqlite3.Error) as exc:
         raise RuntimeError(f"Failed to export CSV: {exc}") from exc
 
 
-def export_to_excel(filename: str, data: Iterable[Mapping[str, object] | Sequence[object]], headers: Optional[Sequence[str]] = None) -> None:
-    """Export rows of data to an Excel (.xlsx) file using openpyxl."""
+# Rows per worksheet including the header; Excel cannot open more.
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def export_to_excel(
+    filename: str,
+    data: Iterable[Mapping[str, object] | Sequence[object]],
+    headers: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Export rows of data to an Excel (.xlsx) file using openpyxl.
+
+    The workbook is written in ``write_only`` mode so memory stays flat;
+    rows beyond one sheet's capacity continue on further sheets.
+    ``progress`` works as for :func:`export_to_csv`.
+    """
     if openpyxl is None:
         raise RuntimeError("openpyxl not installed")
+    wb = Workbook(write_only=True)
     try:
-        wb = Workbook()
-        ws = wb.active
-        if headers:
-            ws.append(list(headers))
-        for row in data:
-            if isinstance(row, Mapping):
-                ws.append([row.get(h) for h in headers or row.keys()])
-            else:
-                ws.append(list(row))
+        names, rows = _tabulate(data, headers)
+        ws = None
+        used = EXCEL_MAX_ROWS
+        for row in _reporting(rows, progress):
+            if used >= EXCEL_MAX_ROWS:
+                ws = wb.create_sheet(f"Sheet{len(wb.worksheets) + 1}")
+                used = 0
+                if names:
+                    ws.append(names)
+                    used = 1
+            ws.append(list(row))  # type: ignore[union-attr]
+            used += 1
+        if ws is None:
+            wb.create_sheet("Sheet1").append(names)
         wb.save(filename)
-    except Exception as exc:  # pragma: no cover - openpyxl errors
-        raise RuntimeError(f"Failed to export Excel: {exc}") from exc
+    except BaseException as exc:
+        # Finish the sheets' streams so their temp files are not left open
+        for sheet in wb.worksheets:
+            if not sheet.closed:
+                sheet.close()
+        if isinstance(exc, Exception) and not isinstance(exc, ExportCancelled):
+            raise RuntimeError(f"Failed to export Excel: {exc}") from exc
+        raise
+
+
+@contextmanager
+def atomic_output(filename: str) -> Iterator[str]:
+    """Yield a temporary path beside ``filename`` that replaces it on success.
+
+    If the block raises, the temporary file is removed and any existing
+    ``filename`` is left untouched.
+    """
+    target = os.path.abspath(filename)
+    folder, name = os.path.split(target)
+    # Not mkstemp: its 0600 mode would carry over to the finished file
+    tmp = os.path.join(folder, f".{name}.{uuid.uuid4().hex}.part")
+    try:
+        yield tmp
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def export_rows(
+    filename: str,
+    data: Iterable[Mapping[str, object] | Sequence[object]],
+    headers: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Stream rows to CSV or Excel depending on the file extension.
+
+    Rows go to a temporary file beside ``filename`` which replaces it only
+    once complete, so a failed or cancelled export leaves any existing
+    file untouched.
+    """
+    with atomic_output(filename) as tmp:
+        if filename.lower().endswith(".csv"):
+            export_to_csv(tmp, data, headers, progress)
+        else:
+            export_to_excel(tmp, data, headers, progress)
 
 
 def print_pdf_via_windows(pdf_path: str) -> None:
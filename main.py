@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 # os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 os.environ["QT_QPA_FONTDIR"] = os.path.abspath("ggs_accounting/fonts/ttf")
@@ -75,4 +76,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Receipt rendering uses worker processes; needed for frozen builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,93 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.ageing import compute_ageing
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def sale(mgr, day, buyer, grower, item, amount, paid=0.0):
+    mgr.create_invoice(
+        day, "Sale", buyer,
+        [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": amount}],
+        is_credit=True, amount_paid=paid,
+    )
+
+
+def test_payments_settle_oldest_invoices_first(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 1.0, 100, customer_id=grower)
+    sale(mgr, "2024-01-01", buyer, grower, item, 100.0)
+    sale(mgr, "2024-02-15", buyer, grower, item, 50.0, paid=10.0)
+    sale(mgr, "2024-03-25", buyer, grower, item, 30.0)
+    mgr.record_payment(buyer, 120.0, "2024-03-01")
+    rows = {r["customer_id"]: r for r in compute_ageing(mgr, as_of="2024-04-01")}
+    row = rows[buyer]
+    # 100 from January and 20 of February's 40 are settled
+    assert row["0-30"] == pytest.approx(30.0)
+    assert row["31-60"] == pytest.approx(20.0)
+    assert row["61-90"] == 0
+    assert row["balance"] == pytest.approx(50.0)
+    assert row["status"] == "Receivable"
+
+
+def test_purchases_age_as_payables(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item = mgr.add_item("Apple", "APL", 1.0, 0, customer_id=grower)
+    mgr.create_invoice(
+        "2023-12-01", "Purchase", grower,
+        [{"item_id": item, "customer_id": grower, "quantity": 10, "price": 8.0}],
+        is_credit=True,
+    )
+    rows = compute_ageing(mgr, as_of="2024-04-01")
+    assert rows[0]["90+"] == pytest.approx(-80.0)
+    assert rows[0]["status"] == "Payable"
+
+
+def test_back_dated_ageing_ignores_later_entries(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 1.0, 100, customer_id=grower)
+    sale(mgr, "2024-01-01", buyer, grower, item, 100.0)
+    sale(mgr, "2024-05-01", buyer, grower, item, 40.0)
+    mgr.record_payment(buyer, 100.0, "2024-04-15")
+    rows = compute_ageing(mgr, as_of="2024-03-01")
+    assert rows[0]["balance"] == pytest.approx(100.0)
+    assert rows[0]["31-60"] == pytest.approx(100.0)
+    assert rows[0]["0-30"] == 0
+
+
+def test_settled_parties_are_skipped(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 1.0, 100, customer_id=grower)
+    sale(mgr, "2024-01-01", buyer, grower, item, 100.0)
+    mgr.record_payment(buyer, 100.0, "2024-01-10")
+    assert compute_ageing(mgr, as_of="2024-04-01") == []
+
+
+def test_migration_adds_amount_paid(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "old.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE Invoices(inv_id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL,"
+        " type TEXT NOT NULL, customer_id INTEGER, subtotal REAL NOT NULL,"
+        " total_amount REAL NOT NULL, is_credit INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.commit()
+    conn.close()
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    cols = {row["name"] for row in mgr.conn.execute("PRAGMA table_info(Invoices)")}
+    assert "amount_paid" in cols
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def setup_sales(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 1.0, 100, customer_id=grower)
+    ids = []
+    for day, amount in [("2024-01-01", 100.0), ("2024-01-10", 50.0), ("2024-01-20", 30.0)]:
+        ids.append(
+            mgr.create_invoice(
+                day, "Sale", buyer,
+                [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": amount}],
+                is_credit=True,
+            )
+        )
+    return buyer, ids
+
+
+def test_payment_settles_fifo(tmp_path):
+    mgr = create_manager(tmp_path)
+    buyer, (a, b, c) = setup_sales(mgr)
+    pid = mgr.record_payment(buyer, 120.0, "2024-02-01")
+    allocs = {r["inv_id"]: r["amount"] for r in mgr.get_payment_allocations(payment_id=pid)}
+    assert allocs == {a: 100.0, b: 20.0}
+    open_bills = mgr.get_open_invoices(buyer)
+    assert [(r["inv_id"], r["balance_due"]) for r in open_bills] == [(b, 30.0), (c, 30.0)]
+
+
+def test_manual_allocation_override(tmp_path):
+    mgr = create_manager(tmp_path)
+    buyer, (a, b, c) = setup_sales(mgr)
+    pid = mgr.record_payment(buyer, 30.0, "2024-02-01", allocations={c: 30.0})
+    assert [r["inv_id"] for r in mgr.get_open_invoices(buyer)] == [a, b]
+    mgr.reallocate_payment(pid)
+    dues = {r["inv_id"]: r["balance_due"] for r in mgr.get_open_invoices(buyer)}
+    assert dues == {a: 70.0, b: 50.0, c: 30.0}
+
+
+def test_invalid_manual_allocation_rolls_back(tmp_path):
+    mgr = create_manager(tmp_path)
+    buyer, (a, b, c) = setup_sales(mgr)
+    with pytest.raises(ValueError):
+        mgr.record_payment(buyer, 10.0, "2024-02-01", allocations={a: 20.0})
+    assert mgr.get_payments() == []
+    bal = mgr.conn.execute("SELECT balance FROM Customers WHERE customer_id=?", (buyer,)).fetchone()[0]
+    assert bal == 180.0
+
+
+def test_open_invoices_use_partial_index(tmp_path):
+    mgr = create_manager(tmp_path)
+    plan = mgr.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT inv_id FROM Invoices WHERE customer_id=? AND balance_due > 0 ORDER BY date, inv_id",
+        (1,),
+    ).fetchall()
+    assert any("idx_invoices_open" in row[3] for row in plan)
+
+
+def test_migration_replays_history(tmp_path):
+    path = tmp_path / "old.sqlite"
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    buyer, (a, b, c) = setup_sales(mgr)
+    mgr.conn.execute("INSERT INTO Payments (customer_id, date, amount, received) VALUES (?, '2024-02-01', 120, 1)", (buyer,))
+    mgr.conn.execute("DROP VIEW OpenInvoices")
+    mgr.conn.execute("DROP INDEX idx_invoices_open")
+    mgr.conn.execute("ALTER TABLE Invoices DROP COLUMN balance_due")
+    mgr.conn.commit()
+    mgr.conn.close()
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    dues = {r["inv_id"]: r["balance_due"] for r in mgr.get_open_invoices(buyer)}
+    assert dues == {b: 30.0, c: 30.0}
@@ -0,0 +1,159 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.bank_import import (
+    name_tokens,
+    post_accepted,
+    propose_matches,
+    read_statement,
+)
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def setup_parties(mgr):
+    grower = mgr.add_customer("Valley Farms", customer_type="Grower")
+    ravi = mgr.add_customer("Ravi Traders")
+    kumar = mgr.add_customer("Kumar Stores")
+    item = mgr.add_item("Apple", "APL", 1.0, 1000, customer_id=grower)
+    bills = {}
+    for buyer, day, amount in [(ravi, "2024-01-01", 100.0), (ravi, "2024-01-05", 250.0), (kumar, "2024-01-03", 75.5)]:
+        bills[(buyer, amount)] = mgr.create_invoice(
+            day, "Sale", buyer,
+            [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": amount}],
+            is_credit=True,
+        )
+    return grower, ravi, kumar, bills
+
+
+def write_statement(tmp_path, text, name="statement.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_read_statement_signs_and_hashes(tmp_path):
+    path = write_statement(
+        tmp_path,
+        "Txn Date,Description,Ref No,Withdrawal,Deposit\n"
+        "05/02/2024,NEFT FROM RAVI TRADERS,UTR1,,\"1,000.00\"\n"
+        "06/02/2024,CHQ TO VALLEY FARMS,,500,\n"
+        "06/02/2024,Bank charges,,0,0\n"
+        "05/02/2024,NEFT FROM RAVI TRADERS,UTR1,,\"1,000.00\"\n",
+    )
+    lines = read_statement(path)
+    assert [(l["date"], l["amount"], l["received"]) for l in lines] == [
+        ("2024-02-05", 1000.0, True),
+        ("2024-02-06", 500.0, False),
+        ("2024-02-05", 1000.0, True),
+    ]
+    # Repeated lines are distinct transactions
+    assert lines[0]["line_hash"] != lines[2]["line_hash"]
+    assert name_tokens("NEFT FROM M/S RAVI TRADERS 1234") == ("RAVI", "TRADERS")
+
+
+def test_missing_columns(tmp_path):
+    path = write_statement(tmp_path, "Narration,Balance\nx,1\n")
+    with pytest.raises(ValueError, match="date column"):
+        read_statement(path)
+
+
+def test_match_by_reference_name_and_amount(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, ravi, kumar, bills = setup_parties(mgr)
+    ref_bill = bills[(ravi, 250.0)]
+    path = write_statement(
+        tmp_path,
+        "Date,Narration,Reference,Amount\n"
+        f"2024-02-01,IMPS settle INV-{ref_bill},,250\n"
+        "2024-02-01,NEFT RAVI TRADERS,,100\n"
+        "2024-02-02,UPI TRANSFER,,75.50\n"
+        "2024-02-02,NEFT KUMAR STORES,,40\n"
+        "2024-02-03,UNKNOWN PARTY,,12\n"
+        "2024-02-03,CHQ VALLEY FARMS,,-300\n",
+    )
+    proposals = propose_matches(mgr, read_statement(path))
+    assert [(p["method"], p["customer_id"], p["inv_id"]) for p in proposals] == [
+        ("Reference", ravi, ref_bill),
+        ("Name+Amount", ravi, bills[(ravi, 100.0)]),
+        ("Amount", kumar, bills[(kumar, 75.5)]),
+        ("Name", kumar, None),
+        ("", None, None),
+        ("Name", grower, None),
+    ]
+    assert [p["accepted"] for p in proposals] == [True, True, True, True, False, True]
+    assert proposals[0]["customer_name"] == "Ravi Traders"
+
+
+def test_post_updates_balances_and_skips_duplicates(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, ravi, kumar, bills = setup_parties(mgr)
+    path = write_statement(
+        tmp_path,
+        "Date,Narration,Reference,Amount\n"
+        f"2024-02-01,NEFT RAVI TRADERS BILL {bills[(ravi, 250.0)]},,300\n"
+        "2024-02-02,NEFT KUMAR STORES,,40\n",
+    )
+    proposals = propose_matches(mgr, read_statement(path))
+    ids = post_accepted(mgr, proposals)
+    assert len(ids) == 2
+    # The referenced bill is settled first, the rest goes FIFO
+    allocs = {r["inv_id"]: r["amount"] for r in mgr.get_payment_allocations(payment_id=ids[0])}
+    assert allocs == {bills[(ravi, 250.0)]: 250.0, bills[(ravi, 100.0)]: 50.0}
+    balances = {c["customer_id"]: c["balance"] for c in mgr.get_all_customers()}
+    assert balances[ravi] == pytest.approx(50.0)
+    assert balances[kumar] == pytest.approx(35.5)
+    assert [r["balance_due"] for r in mgr.get_open_invoices(kumar)] == [35.5]
+
+    again = propose_matches(mgr, read_statement(path))
+    assert all(p["duplicate"] and not p["accepted"] for p in again)
+    assert post_accepted(mgr, again) == []
+    assert len(mgr.get_payments()) == 2
+
+
+def test_record_payments_ids_survive_trigger_inserts(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, ravi, kumar, bills = setup_parties(mgr)
+    # Anything else inserting payments mid-batch shifts the ids
+    mgr.conn.execute(
+        """CREATE TRIGGER mirror AFTER INSERT ON Payments WHEN NEW.amount = 100
+           BEGIN INSERT INTO Payments (customer_id, date, amount, received) VALUES (NEW.customer_id, NEW.date, 0, 1); END"""
+    )
+    ids = mgr.record_payments(
+        [
+            {"customer_id": ravi, "amount": 100.0, "date": "2024-02-01", "received": True, "line_hash": "a"},
+            {"customer_id": kumar, "amount": 40.0, "date": "2024-02-02", "received": True, "line_hash": "b"},
+        ]
+    )
+    amounts = {p["payment_id"]: p["amount"] for p in mgr.get_payments()}
+    assert [amounts[i] for i in ids] == [100.0, 40.0]
+    allocs = mgr.get_payment_allocations(payment_id=ids[1])
+    assert [(r["inv_id"], r["amount"]) for r in allocs] == [(bills[(kumar, 75.5)], 40.0)]
+    hashes = dict(mgr.conn.execute("SELECT line_hash, payment_id FROM BankStatementLines").fetchall())
+    assert hashes == {"a": ids[0], "b": ids[1]}
+
+
+def test_dialog_rows_share_party_model(tmp_path):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    from ggs_accounting.ui.bank_import_dialog import BankImportDialog
+
+    mgr = create_manager(tmp_path)
+    grower, ravi, kumar, bills = setup_parties(mgr)
+    path = write_statement(
+        tmp_path,
+        "Date,Narration,Reference,Amount\n2024-02-01,NEFT RAVI TRADERS,,100\n2024-02-02,UNKNOWN,,12\n",
+    )
+    dialog = BankImportDialog(mgr)
+    dialog.load_statement(str(path))
+    first, second = dialog.table.cellWidget(0, 6), dialog.table.cellWidget(1, 6)
+    assert first.model() is second.model() is dialog.parties
+    assert (first.currentData(), second.currentData()) == (ravi, None)
+    second.setCurrentIndex(second.findData(kumar))
+    assert dialog._proposals[1]["customer_id"] == kumar
+    assert dialog.table.item(1, 7).text() == "Manual"
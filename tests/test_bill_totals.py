@@ -0,0 +1,76 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.bill_totals import BillTotals
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def test_totals_move_by_line_deltas():
+    totals = BillTotals()
+    assert totals.set_line("a", 3, 0.1, gst_rate=5)
+    assert totals.set_line("b", 2, 10.0)
+    assert not totals.set_line("b", 2, 10.0)
+    totals.set_line("a", 3, 0.2, gst_rate=5)
+    assert totals.subtotal == pytest.approx(20.6)
+    assert totals.tax == 0.03
+    totals.paid = 5.0
+    assert totals.due == pytest.approx(15.63)
+    totals.remove_line("b")
+    totals.remove_line("a")
+    assert (totals.subtotal, totals.tax, len(totals)) == (0.0, 0.0, 0)
+    assert f"{totals.due:.2f}" == "-5.00"
+
+
+def test_invoice_panel_updates_only_the_edited_line(tmp_path):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    from ggs_accounting.ui.invoice_panel import InvoicePanel
+
+    panel = InvoicePanel(create_manager(tmp_path))
+    panel._add_line()
+    panel._add_line()
+    first_total, second_total = panel.table.item(0, 6), panel.table.item(1, 6)
+    panel.table.cellWidget(0, 5).setValue(10.0)
+    panel.table.cellWidget(1, 4).setValue(4)
+    panel.table.cellWidget(1, 5).setValue(2.5)
+    # The total cells are updated in place, not replaced
+    assert panel.table.item(0, 6) is first_total
+    assert (first_total.text(), second_total.text()) == ("₹10.00", "₹10.00")
+    assert panel.subtotal_label.text() == "Subtotal: ₹20.00"
+    panel.amount_paid.setValue(5.0)
+    assert panel.due_label.text() == "Due: ₹15.00"
+    panel.table.cellWidget(0, 7).click()
+    assert panel.table.rowCount() == 1
+    assert panel.subtotal_label.text() == "Subtotal: ₹10.00"
+    assert panel.due_label.text() == "Due: ₹5.00"
+
+
+def test_invoice_panel_rows_show_their_own_stock(tmp_path):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    from ggs_accounting.ui.invoice_panel import InvoicePanel
+
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    mgr.add_item("Apple", "APL", 10.0, 5, customer_id=grower)
+    mgr.add_item("Pear", "PER", 10.0, 2, customer_id=grower)
+    panel = InvoicePanel(mgr)
+    panel.type_combo.setCurrentText("Sale")
+    panel._add_line()
+    panel._add_line()
+    for row, item in enumerate(("Apple", "Pear")):
+        panel.table.cellWidget(row, 1).setCurrentText(item)
+        panel.table.cellWidget(row, 2).setCurrentText("Grower")
+    assert [panel.table.item(row, 3).text() for row in range(2)] == ["5", "2"]
+    # The first row is deleted; the second row's widgets still update their own cell
+    panel.table.cellWidget(0, 7).click()
+    panel.table.cellWidget(0, 4).setValue(3)
+    assert panel.table.item(0, 3).text() == "2"
+    assert panel.table.item(0, 3).foreground().color().name() == "#ff0000"
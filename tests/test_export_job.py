@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.reporting import iter_customer_balances
+from ggs_accounting.ui.export_job import ExportWorker, start_export
+from ggs_accounting.ui.reports_party_balance import CustomerBalancePanel
+from ggs_accounting.utils import ExportCancelled, export_rows
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def ensure_app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def leftovers(tmp_path):
+    return [p.name for p in tmp_path.iterdir() if p.name.endswith(".part")]
+
+
+def test_failed_export_keeps_existing_file(tmp_path):
+    target = tmp_path / "out.csv"
+    target.write_text("old\n")
+
+    def rows():
+        yield ["a"]
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        export_rows(str(target), rows(), ["x"])
+    assert target.read_text() == "old\n"
+    assert leftovers(tmp_path) == []
+
+
+def test_progress_can_cancel(tmp_path):
+    seen = []
+
+    def progress(count):
+        seen.append(count)
+        raise ExportCancelled()
+
+    with pytest.raises(ExportCancelled):
+        export_rows(str(tmp_path / "out.xlsx"), ([i] for i in range(5000)), ["n"], progress=progress)
+    assert seen == [1000]
+    assert not (tmp_path / "out.xlsx").exists() and leftovers(tmp_path) == []
+
+
+def test_reader_is_read_only(tmp_path):
+    mgr = create_manager(tmp_path)
+    mgr.add_customer("A")
+    reader = mgr.open_reader()
+    assert reader.conn.execute("SELECT COUNT(*) FROM Customers").fetchone()[0] == 1
+    with pytest.raises(sqlite3.OperationalError):
+        reader.conn.execute("DELETE FROM Customers")
+    reader.conn.close()
+
+
+def test_worker_cancel(tmp_path):
+    app = ensure_app()  # noqa: F841 - keep the application alive
+    mgr = create_manager(tmp_path)
+    mgr.add_customer("A")
+    worker = ExportWorker(mgr, str(tmp_path / "out.csv"), iter_customer_balances)
+    outcome = []
+    worker.cancelled.connect(lambda: outcome.append("cancelled"))
+    worker.cancel()
+    worker.run()
+    assert outcome == ["cancelled"]
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_background_export_reports_in_status_bar(tmp_path):
+    app = ensure_app()
+    mgr = create_manager(tmp_path)
+    for name in ("A", "B", "C"):
+        mgr.add_customer(name)
+    window = QtWidgets.QMainWindow()
+    panel = CustomerBalancePanel(mgr)
+    window.setCentralWidget(panel)
+    target = tmp_path / "balances.csv"
+    worker = start_export(panel, mgr, str(target), iter_customer_balances, ["name", "balance", "status"])
+    assert worker.wait(10000)
+    app.processEvents()
+    assert target.read_text().splitlines()[0] == "name,balance,status"
+    assert len(target.read_text().splitlines()) == 4
+    assert window.statusBar().currentMessage() == f"Exported 3 rows to {target}"
+
+
+def test_detailed_receipt_job_reads_invoices_in_worker(tmp_path):
+    pytest.importorskip("reportlab")
+    ensure_app()
+    from ggs_accounting.ui.receipt_console import DetailedReceiptJob
+
+    mgr = create_manager(tmp_path)
+    buyer = mgr.add_customer("Buyer")
+    for day in ("2024-03-01", "2024-03-02", "2024-04-01"):
+        mgr.create_invoice(day, "Sale", buyer, [])
+    filters = {"start_date": "2024-03-01", "end_date": "2024-03-31", "customer_id": None, "inv_type": "Sale"}
+    outcome = []
+    job = DetailedReceiptJob(mgr, filters, str(tmp_path / "invoices.pdf"))
+    job.succeeded.connect(lambda path, count: outcome.append(count))
+    job.run()
+    assert outcome == [2]
+    assert (tmp_path / "invoices.pdf").stat().st_size > 0
+
+
+def test_job_without_work_cannot_be_created():
+    from ggs_accounting.ui.export_job import BackgroundJob
+
+    class Incomplete(BackgroundJob):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("out.csv")
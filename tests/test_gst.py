@@ -0,0 +1,63 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.tax import compute_line_taxes, gst_enabled
+from ggs_accounting.reports.gst import gst_summary
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    rice = mgr.add_item("Rice", "RIC", 10.0, 100, customer_id=grower, hsn_code="1006", gst_rate=5.0)
+    oil = mgr.add_item("Oil", "OIL", 10.0, 100, customer_id=grower, hsn_code="1508", gst_rate=18.0)
+    salt = mgr.add_item("Salt", "SLT", 10.0, 100, customer_id=grower, hsn_code="2501", gst_rate=5.0)
+    line = {"customer_id": buyer, "source_id": grower}
+    inv_id = mgr.create_invoice(
+        "2024-04-10", "Sale", buyer,
+        [
+            {**line, "item_id": rice, "quantity": 10, "price": 20.0},
+            {**line, "item_id": oil, "quantity": 2, "price": 150.0},
+            {**line, "item_id": salt, "quantity": 4, "price": 25.0},
+        ],
+        is_credit=True,
+    )
+    return buyer, inv_id
+
+
+def test_compute_line_taxes():
+    assert compute_line_taxes([100.0, 33.33], [5, 18]).tolist() == [5.0, 6.0]
+    with pytest.raises(ValueError):
+        compute_line_taxes([1.0], [5, 18])
+    assert gst_enabled("1") and gst_enabled("5")
+    assert not gst_enabled("") and not gst_enabled(None) and not gst_enabled("0")
+
+
+def test_no_tax_when_gst_disabled(tmp_path):
+    mgr = create_manager(tmp_path)
+    _, inv_id = populate(mgr)
+    inv = next(i for i in mgr.get_invoices() if i["inv_id"] == inv_id)
+    assert inv["subtotal"] == inv["total_amount"] == 600.0
+    assert gst_summary(mgr, "2024-04-01", "2024-04-30") == []
+
+
+def test_invoice_tax_and_summary(tmp_path):
+    mgr = create_manager(tmp_path)
+    mgr.set_setting("GST", "1")
+    buyer, inv_id = populate(mgr)
+    inv = next(i for i in mgr.get_invoices() if i["inv_id"] == inv_id)
+    assert inv["subtotal"] == 600.0
+    assert inv["total_amount"] == pytest.approx(600.0 + 10.0 + 54.0 + 5.0)
+    bal = mgr.conn.execute("SELECT balance FROM Customers WHERE customer_id=?", (buyer,)).fetchone()[0]
+    assert bal == pytest.approx(669.0)
+    by_rate = {r["rate"]: r for r in gst_summary(mgr, "2024-04-01", "2024-04-30")}
+    assert by_rate[5.0]["taxable_value"] == 300.0
+    assert by_rate[5.0]["tax_amount"] == 15.0
+    assert by_rate[18.0]["cgst"] == by_rate[18.0]["sgst"] == 27.0
+    by_hsn = gst_summary(mgr, "2024-04-01", "2024-04-30", by="hsn")
+    assert [r["hsn_code"] for r in by_hsn] == ["1006", "1508", "2501"]
@@ -15,3 +15,39 @@ def test_export_to_csv(tmp_path):
         rows = list(csv.reader(fh))
     assert rows[0] == ['a','b']
     assert rows[1] == ['1','2']
+
+
+def test_export_to_csv_streams_generators(tmp_path):
+    data = ({'a': i, 'b': i * 2} for i in range(3))
+    file = tmp_path/'gen.csv'
+    export_to_csv(str(file), data)
+    with open(file, newline='') as fh:
+        rows = list(csv.reader(fh))
+    assert rows == [['a', 'b'], ['0', '0'], ['1', '2'], ['2', '4']]
+
+
+def test_export_cursor_to_csv_and_excel(tmp_path):
+    import sqlite3
+    import openpyxl
+    from ggs_accounting.utils import export_rows
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t(x, y)')
+    conn.executemany('INSERT INTO t VALUES (?, ?)', [(i, f'r{i}') for i in range(5)])
+    export_rows(str(tmp_path/'c.csv'), conn.execute('SELECT * FROM t'))
+    with open(tmp_path/'c.csv', newline='') as fh:
+        rows = list(csv.reader(fh))
+    assert rows[0] == ['x', 'y'] and rows[-1] == ['4', 'r4'] and len(rows) == 6
+    export_rows(str(tmp_path/'c.xlsx'), conn.execute('SELECT * FROM t'))
+    ws = openpyxl.load_workbook(tmp_path/'c.xlsx').active
+    assert [c.value for c in ws[1]] == ['x', 'y']
+    assert ws.max_row == 6
+
+
+def test_export_to_excel_rolls_over_sheets(tmp_path, monkeypatch):
+    import openpyxl
+    from ggs_accounting.utils import export_to_excel, helpers
+    monkeypatch.setattr(helpers, 'EXCEL_MAX_ROWS', 3)
+    export_to_excel(str(tmp_path/'big.xlsx'), ([i] for i in range(5)), headers=['n'])
+    wb = openpyxl.load_workbook(tmp_path/'big.xlsx')
+    sheets = [[r[0] for r in ws.iter_rows(values_only=True)] for ws in wb.worksheets]
+    assert sheets == [['n', 0, 1], ['n', 2, 3], ['n', 4]]
@@ -0,0 +1,44 @@
+from ggs_accounting.db.db_manager import DatabaseManager
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def inventory(mgr):
+    return [
+        (r["price_excl_tax"], r["stock_qty"])
+        for r in mgr.conn.execute("SELECT price_excl_tax, stock_qty FROM Inventory ORDER BY inventory_id")
+    ]
+
+
+def test_compaction_archives_sold_out_rows(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    apple = mgr.add_item("Apple", "APL", 10.0, 0, customer_id=grower)
+    for price in (11.0, 12.0, 13.0):
+        mgr.update_item_stock(apple, grower, price, 0)
+    mgr.update_item_stock(apple, grower, 14.0, 5)
+    mgr.update_item_stock(apple, grower, 15.0, 0)
+    # A pair with only a sold-out row keeps it so the item stays listed
+    pear = mgr.add_item("Pear", "PER", 7.0, 0, customer_id=grower)
+
+    assert mgr.compact_inventory(batch_size=2) == 4
+    assert inventory(mgr) == [(14.0, 5.0), (15.0, 0.0), (7.0, 0.0)]
+    history = mgr.get_inventory_history(apple)
+    assert [r["price_excl_tax"] for r in history] == [13.0, 12.0, 11.0, 10.0]
+    assert mgr.get_inventory_history(pear) == []
+    assert mgr.compact_inventory() == 0
+
+
+def test_compaction_runs_in_bounded_batches(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item = mgr.add_item("Apple", "APL", 1.0, 0, customer_id=grower)
+    for price in range(2, 12):
+        mgr.update_item_stock(item, grower, float(price), 0)
+    assert mgr.compact_inventory(batch_size=3, max_batches=2) == 6
+    assert mgr.compact_inventory(batch_size=3) == 4
+    assert len(inventory(mgr)) == 1
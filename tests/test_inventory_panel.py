@@ -24,7 +24,7 @@ def test_inventory_loads_items(tmp_path):
     mgr.add_item("Apple", "APL", 10.0, 5, customer_id=cust)
     mgr.add_item("Carrot", "CRT", 5.0, 10, customer_id=cust)
     panel = InventoryPanel(mgr)
-    assert panel.table.rowCount() == 2
+    assert panel.model.rowCount() == 2
 
 
 def test_inventory_filter(tmp_path):
@@ -35,9 +35,33 @@ def test_inventory_filter(tmp_path):
     mgr.add_item("Carrot", "CRT", 5.0, 10, customer_id=cust)
     panel = InventoryPanel(mgr)
     panel.search_edit.setText("apple")
-    QtWidgets.QApplication.processEvents()
-    assert panel.table.rowCount() == 1
-    assert panel.table.item(0, 0).text() == "Apple"
+    # Debounced: nothing changes until the timer fires
+    assert panel.model.rowCount() == 2
+    panel._search_timer.timeout.emit()
+    assert panel.model.rowCount() == 1
+    assert panel.model.index(0, 0).data() == "Apple"
+
+
+def test_inventory_search_narrows_and_maps_rows(tmp_path):
+    ensure_app()
+    mgr = create_manager(tmp_path)
+    cust = mgr.add_customer("Grower", customer_type="Grower")
+    for name in ["Red Apple", "Green Apple", "Apricot", "Carrot"]:
+        mgr.add_item(name, name[:3].upper(), 10.0, 5, customer_id=cust)
+    panel = InventoryPanel(mgr)
+    for text in ["r", "re", "red", "red ap"]:
+        panel.search_edit.setText(text)
+        panel._apply_filter()
+    assert panel.model.rowCount() == 1
+    panel.table.selectRow(0)
+    item = panel._get_selected_item()
+    assert item["name"] == "Red Apple"
+    assert item["customer_name"] == "Grower"
+    # Going back to a shorter text widens the search again
+    panel.search_edit.setText("ap")
+    panel._apply_filter()
+    names = [panel.model.index(r, 0).data() for r in range(panel.model.rowCount())]
+    assert names == ["Apricot", "Green Apple", "Red Apple"]
 
 
 def test_inventory_panel_multiple_purchase_rows(tmp_path):
@@ -48,7 +72,7 @@ def test_inventory_panel_multiple_purchase_rows(tmp_path):
     # new purchase at different price creates separate row
     mgr.update_item_stock(item, g, 3.0, 10)
     panel = InventoryPanel(mgr)
-    names = [panel.table.item(r, 0).text() for r in range(panel.table.rowCount())]
+    names = [panel.model.index(r, 0).data() for r in range(panel.model.rowCount())]
     tomato_rows = [i for i, n in enumerate(names) if n == "Tomato"]
     assert len(tomato_rows) == 2
 
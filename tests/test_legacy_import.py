@@ -0,0 +1,113 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.db.legacy_import import LegacyImporter, main
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def write_exports(folder):
+    folder.mkdir()
+    (folder / "Customers.csv").write_text(
+        "CustomerID,Name,ContactInfo,CustomerType,Balance\n"
+        "1,Grower A,,Grower,0\n"
+        "2,Buyer B,9876,Buyer,150\n"
+        ",Nameless,,Buyer,0\n"
+    )
+    (folder / "Items.csv").write_text(
+        "ItemID,ItemName,ItemCode\n"
+        "1,Apple,APL\n"
+        "2,Pear,\n"
+        "3,Apple,DUP\n"
+    )
+    (folder / "Inventory.csv").write_text(
+        "CustomerID,ItemID,PriceExclTax,StockQty\n"
+        "1,1,10,40\n"
+        "1,2,8,12\n"
+    )
+    (folder / "Invoices.csv").write_text(
+        "InvID,InvDate,Type,CustomerID,TotalAmount,IsCredit,AmountPaid\n"
+        "1,3/15/2021 0:00:00,S,2,150,True,0\n"
+        "2,3/16/2021 0:00:00,Purchase,1,80,True,80\n"
+        "3,not a date,S,2,10,False,0\n"
+    )
+    (folder / "InvoiceItems.csv").write_text(
+        "InvID,ItemID,CustomerID,SourceID,Quantity,UnitPrice\n"
+        "1,1,,1,10,15\n"
+        "2,2,1,,10,8\n"
+    )
+    (folder / "Payments.csv").write_text(
+        "PaymentID,CustomerID,PayDate,Amount,Received\n"
+        "1,2,2021-03-20,100,-1\n"
+    )
+    return folder
+
+
+MAPPING = {
+    "Items": {"ItemName": "name"},
+    "Invoices": {"InvDate": "date"},
+    "Payments": {"PayDate": "date"},
+}
+
+
+def run(mgr, folder, **kwargs):
+    return LegacyImporter(mgr, folder, batch_size=2, mapping=MAPPING, log=lambda _m: None, **kwargs).run()
+
+
+def test_import_maps_access_exports(tmp_path):
+    mgr = create_manager(tmp_path)
+    rejects = run(mgr, write_exports(tmp_path / "exports"))
+    assert rejects == {"Customers": 1, "Items": 1, "Invoices": 1}
+    assert [c["name"] for c in mgr.get_all_customers()] == ["Grower A", "Buyer B"]
+    assert {r["name"]: r["item_code"] for r in mgr.conn.execute("SELECT name, item_code FROM Items")} == {
+        "Apple": "APL",
+        "Pear": "I2",
+    }
+    invoices = {i["inv_id"]: i for i in mgr.get_invoices()}
+    assert invoices[1]["date"] == "2021-03-15" and invoices[1]["type"] == "Sale"
+    assert invoices[1]["subtotal"] == 150.0
+    # Derived data is rebuilt: FIFO allocation, cost basis and price history
+    assert invoices[1]["balance_due"] == 50.0
+    line = mgr.get_invoice_items(1)[0]
+    assert line["customer_id"] == 2 and line["line_total"] == 150.0 and line["unit_cost"] == 10.0
+    assert mgr.get_last_price(1, 2, "Sale") == 15.0
+    tables = {r[0] for r in mgr.conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+    assert "_stage_Invoices" not in tables and "_ImportProgress" not in tables
+    assert "idx_invoices_customer_date" in tables
+
+
+def test_import_resumes_after_failure(tmp_path):
+    mgr = create_manager(tmp_path)
+    folder = write_exports(tmp_path / "exports")
+
+    def crash(message):
+        if message.startswith("Invoices: staged"):
+            raise RuntimeError("power cut")
+
+    with pytest.raises(RuntimeError):
+        LegacyImporter(mgr, folder, batch_size=2, mapping=MAPPING, log=crash).run()
+    run(mgr, folder)
+    assert mgr.conn.execute("SELECT COUNT(*) FROM Invoices").fetchone()[0] == 2
+    assert mgr.conn.execute("SELECT COUNT(*) FROM InvoiceItems").fetchone()[0] == 2
+    assert mgr.conn.execute("SELECT COUNT(*) FROM Customers").fetchone()[0] == 2
+
+
+def test_refuses_populated_database(tmp_path):
+    mgr = create_manager(tmp_path)
+    mgr.add_customer("Existing")
+    with pytest.raises(RuntimeError, match="Customers"):
+        run(mgr, write_exports(tmp_path / "exports"))
+
+
+def test_cli_reports_failure(tmp_path, capsys):
+    db_path = tmp_path / "cli.sqlite"
+    mgr = DatabaseManager(db_path)
+    mgr.init_db()
+    mgr.add_customer("Existing")
+    mgr.conn.close()
+    assert main([str(write_exports(tmp_path / "exports")), "--db", str(db_path)]) == 1
+    assert "resume" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.invoice_logic import InvoiceLogic
+from ggs_accounting.reports.margin import margin_report
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def test_sale_captures_cost_basis(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 10.0, 20, customer_id=grower)
+    logic = InvoiceLogic(mgr)
+    inv_id = logic.create_invoice(
+        "Sale",
+        buyer,
+        [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 5, "price": 15.0}],
+        date="2024-01-03",
+    )
+    # Later purchases at another price must not change the recorded cost
+    mgr.update_item_stock(item, grower, 12.0, 10)
+    assert mgr.get_invoice_items(inv_id)[0]["unit_cost"] == 10.0
+    rows = margin_report(mgr, "item")
+    assert rows[0]["revenue"] == 75.0
+    assert rows[0]["cost"] == 50.0
+    assert rows[0]["margin_pct"] == pytest.approx(100 / 3)
+
+
+def test_margin_dimensions(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 10.0, 20, customer_id=grower)
+    logic = InvoiceLogic(mgr)
+    for day in ("2024-01-03", "2024-01-04"):
+        logic.create_invoice(
+            "Sale",
+            buyer,
+            [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": 11.0}],
+            date=day,
+        )
+    assert [r["label"] for r in margin_report(mgr, "buyer")] == ["Buyer"]
+    assert [r["label"] for r in margin_report(mgr, "grower")] == ["Grower"]
+    days = margin_report(mgr, "day", "2024-01-04", "2024-01-31")
+    assert [(r["label"], r["margin"]) for r in days] == [("2024-01-04", 1.0)]
+    with pytest.raises(ValueError):
+        margin_report(mgr, "region")
+
+
+def test_backfill_migration(tmp_path):
+    path = tmp_path / "old.sqlite"
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 8.0, 20, customer_id=grower)
+    inv_id = mgr.create_invoice(
+        "2024-01-01", "Sale", buyer,
+        [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": 11.0}],
+    )
+    mgr.conn.execute("ALTER TABLE InvoiceItems DROP COLUMN unit_cost")
+    mgr.conn.commit()
+    mgr.conn.close()
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    assert mgr.get_invoice_items(inv_id)[0]["unit_cost"] == 8.0
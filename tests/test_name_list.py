@@ -0,0 +1,48 @@
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.ui.invoice_panel import InvoicePanel
+from ggs_accounting.ui.name_list import NameListModel, name_combo
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def ensure_app():
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+
+
+def test_set_names_merges_and_keeps_selection():
+    ensure_app()
+    model = NameListModel(["ravi", "Anil", "Mohan", "Anil"])
+    assert model.stringList() == ["", "Anil", "Mohan", "ravi"]
+    combo = name_combo(model)
+    combo.setCurrentIndex(3)
+    inserted = []
+    model.rowsInserted.connect(lambda _p, first, last: inserted.append((first, last)))
+    model.set_names(["ravi", "Bala", "Anil", "Zoya"])
+    assert model.stringList() == ["", "Anil", "Bala", "ravi", "Zoya"]
+    assert inserted == [(2, 2), (4, 4)]
+    assert combo.currentText() == "ravi"
+
+
+def test_invoice_rows_share_directory_models(tmp_path):
+    ensure_app()
+    mgr = create_manager(tmp_path)
+    mgr.add_customer("Buyer A", customer_type="Buyer")
+    panel = InvoicePanel(mgr)
+    panel._add_line()
+    panel._add_line()
+    first, second = panel.table.cellWidget(0, 0), panel.table.cellWidget(1, 0)
+    assert first.model() is second.model() is panel.customer_names
+    first.setCurrentIndex(first.findText("Buyer A"))
+    mgr.add_customer("Buyer B", customer_type="Buyer")
+    panel._load_customers()
+    assert second.findText("Buyer B") >= 0
+    assert first.currentText() == "Buyer A"
@@ -0,0 +1,83 @@
+import os
+import zipfile
+
+from pypdf import PdfReader
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing import print_receipts
+from ggs_accounting.printing.pdf_cache import PdfCache
+from ggs_accounting.printing.print_receipts import render_detailed
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def create_sales(mgr, count):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item_id = mgr.add_item("Apple", "APL", 10.0, 1000, customer_id=grower)
+    buyer = mgr.add_customer("Cust")
+    return [
+        mgr.create_invoice(
+            "2024-01-01", "Sale", buyer,
+            [{"item_id": item_id, "customer_id": grower, "quantity": 1, "price": 10.0 + n}],
+        )
+        for n in range(count)
+    ]
+
+
+def test_key_follows_content_and_settings():
+    header = {"inv_id": 1, "total_amount": 10.0}
+    lines = [{"name": "Apple", "quantity": 1, "unit_price": 10.0}]
+    settings = {"company_name": "GGS"}
+    key = PdfCache.key(header, lines, settings)
+    assert key == PdfCache.key(dict(header), [dict(lines[0])], dict(settings))
+    assert key != PdfCache.key(header, [dict(lines[0], quantity=2)], settings)
+    assert key != PdfCache.key(header, lines, {"company_name": "GGS Traders"})
+
+
+def test_reprint_hits_cache(tmp_path):
+    mgr = create_manager(tmp_path)
+    ids = create_sales(mgr, 3)
+    cache = PdfCache(tmp_path / "cache")
+    render_detailed(mgr, ids, str(tmp_path / "first.zip"), as_zip=True, cache=cache)
+    assert len(os.listdir(cache.directory)) == 3
+    render_detailed(mgr, ids, str(tmp_path / "again.zip"), as_zip=True, cache=cache)
+    assert len(os.listdir(cache.directory)) == 3
+    with zipfile.ZipFile(tmp_path / "again.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(f"invoice_{i}.pdf" for i in ids)
+
+    mgr.set_setting("company_name", "GGS Traders")
+    render_detailed(mgr, ids[:1], str(tmp_path / "renamed.pdf"), cache=cache)
+    assert len(os.listdir(cache.directory)) == 4
+
+
+def test_merged_reprint_hits_cache(tmp_path, monkeypatch):
+    mgr = create_manager(tmp_path)
+    ids = create_sales(mgr, 3)
+    cache = PdfCache(tmp_path / "cache")
+    rendered = []
+    story = print_receipts._invoice_story
+    monkeypatch.setattr(
+        print_receipts, "_invoice_story", lambda inv, *a: rendered.append(inv["inv_id"]) or story(inv, *a)
+    )
+    render_detailed(mgr, ids, str(tmp_path / "first.pdf"), workers=1, chunk_size=2, cache=cache)
+    assert sorted(rendered) == sorted(ids)
+    rendered.clear()
+    render_detailed(mgr, ids, str(tmp_path / "again.pdf"), workers=1, chunk_size=2, cache=cache)
+    assert rendered == []
+    assert len(PdfReader(str(tmp_path / "again.pdf")).pages) == 3
+
+
+def test_prune_drops_least_recently_used(tmp_path):
+    cache = PdfCache(tmp_path / "cache", max_bytes=250)
+    for n, key in enumerate(("old", "mid", "new")):
+        path = cache.put(key, lambda p: open(p, "wb").write(b"x" * 100))
+        os.utime(path, (n, n))
+    assert cache.get("old")  # touched, so now the newest
+    assert cache.prune() == 1
+    assert cache.get("mid") is None
+    assert cache.get("old") and cache.get("new")
+    assert cache.size() == 200
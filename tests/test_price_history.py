@@ -0,0 +1,74 @@
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.invoice_logic import InvoiceLogic
+from ggs_accounting.models.pricing import PriceSuggester
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 10.0, 100, customer_id=grower)
+    return grower, buyer, item
+
+
+def sell(mgr, day, buyer, grower, item, price):
+    line = {"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": price}
+    return mgr.create_invoice(day, "Sale", buyer, [line])
+
+
+def test_last_price_by_type_and_date(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    assert mgr.get_last_price(item, buyer, "Sale") is None
+    sell(mgr, "2024-01-05", buyer, grower, item, 15.0)
+    sell(mgr, "2024-01-02", buyer, grower, item, 13.0)  # back-dated
+    mgr.create_invoice("2024-01-03", "Purchase", grower, [{"item_id": item, "customer_id": grower, "quantity": 5, "price": 9.0}])
+    assert mgr.get_last_price(item, buyer, "Sale") == 15.0
+    assert mgr.get_last_price(item, grower, "Purchase") == 9.0
+    assert mgr.get_last_price(item, grower, "Sale") is None
+
+
+def test_backfill_from_existing_lines(tmp_path):
+    path = tmp_path / "old.sqlite"
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    grower, buyer, item = populate(mgr)
+    sell(mgr, "2024-01-05", buyer, grower, item, 15.0)
+    sell(mgr, "2024-01-06", buyer, grower, item, 16.0)
+    mgr.conn.execute("DROP TABLE PriceHistory")
+    mgr.conn.commit()
+    mgr.conn.close()
+
+    mgr = DatabaseManager(path)
+    mgr.init_db()
+    assert mgr.get_last_price(item, buyer, "Sale") == 16.0
+    # Reopening does not duplicate the history
+    mgr.init_db()
+    assert mgr.conn.execute("SELECT COUNT(*) FROM PriceHistory").fetchone()[0] == 2
+
+
+def test_suggester_caches_and_follows_saves(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    sell(mgr, "2024-01-05", buyer, grower, item, 15.0)
+    prices = PriceSuggester(mgr, maxsize=2)
+    logic = InvoiceLogic(mgr)
+    logic.add_listener(prices.on_invoice_saved)
+    assert prices.suggest(item, buyer, "Sale") == 15.0
+    assert prices.suggest(item, buyer, "Sale") == 15.0
+    assert (prices.hits, prices.misses) == (1, 1)
+    logic.create_invoice(
+        "Sale", buyer,
+        [{"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": 1, "price": 17.5}],
+        date="2024-01-06",
+    )
+    assert prices.suggest(item, buyer, "Sale") == 17.5
+    # Least recently used entries are evicted
+    prices.suggest(item, grower, "Purchase")
+    prices.suggest(item, grower, "Sale")
+    assert (item, buyer, "Sale") not in prices._cache
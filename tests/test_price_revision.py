@@ -0,0 +1,64 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.pricing import apply_price_revision, preview_price_revision
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def prices(mgr):
+    return sorted(
+        (r[0], r[1], r[2])
+        for r in mgr.conn.execute("SELECT item_id, customer_id, price_excl_tax FROM Inventory")
+    )
+
+
+def populate(mgr):
+    g1 = mgr.add_customer("Grower A", customer_type="Grower")
+    g2 = mgr.add_customer("Grower B", customer_type="Grower")
+    apple = mgr.add_item("Apple", "APL-1", 10.0, 5, customer_id=g1)
+    mgr.update_item_stock(apple, g1, 11.0, 5)
+    mgr.add_item("Apple", "APL-1", 20.0, 5, customer_id=g2)
+    pear = mgr.add_item("Pear", "PER-1", 8.0, 5, customer_id=g1)
+    return g1, g2, apple, pear
+
+
+def test_percent_revision_by_grower(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    rows = preview_price_revision(mgr, customer_id=g1, percent=10)
+    assert [(r["name"], r["old_price"], r["new_price"]) for r in rows] == [
+        ("Apple", 10.0, 11.0),
+        ("Apple", 11.0, 12.1),
+        ("Pear", 8.0, 8.8),
+    ]
+    # 10 -> 11 lands on the old price of the other lot; parking avoids a clash
+    assert apply_price_revision(mgr, rows) == 3
+    assert prices(mgr) == sorted([(apple, g1, 11.0), (apple, g1, 12.1), (apple, g2, 20.0), (pear, g1, 8.8)])
+
+
+def test_amount_revision_by_code_pattern(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    rows = preview_price_revision(mgr, code_pattern="APL%", amount=-2.5)
+    assert {r["new_price"] for r in rows} == {7.5, 8.5, 17.5}
+    apply_price_revision(mgr, rows)
+    assert (pear, g1, 8.0) in prices(mgr)
+
+
+def test_invalid_revisions(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    with pytest.raises(ValueError):
+        preview_price_revision(mgr, item_id=apple)
+    with pytest.raises(ValueError):
+        preview_price_revision(mgr, item_id=pear, amount=-8)
+    # Both lots round to the same new price
+    mgr.update_item_stock(pear, g1, 3.001, 1)
+    mgr.update_item_stock(pear, g1, 3.004, 1)
+    with pytest.raises(ValueError):
+        preview_price_revision(mgr, item_id=pear, percent=0)
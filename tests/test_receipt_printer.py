@@ -35,3 +35,78 @@ def test_summary_pdf(tmp_path):
     invoices = printer.fetch_invoices("2024-01-01", "2024-01-02", None, None)
     pdf = printer.print_summary(invoices)
     assert os.path.exists(pdf)
+
+
+def create_sales(mgr, count):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item_id = mgr.add_item("Apple", "APL", 10.0, 1000, customer_id=grower)
+    buyer = mgr.add_customer("Cust")
+    return [
+        mgr.create_invoice(
+            "2024-01-01", "Sale", buyer,
+            [{"item_id": item_id, "customer_id": grower, "quantity": 1, "price": 10.0 + n}],
+        )
+        for n in range(count)
+    ]
+
+
+def test_detailed_zip_in_worker_processes(tmp_path):
+    import zipfile
+    from ggs_accounting.printing.print_receipts import render_detailed
+    mgr = create_manager(tmp_path)
+    ids = create_sales(mgr, 5)
+    seen = []
+    out = render_detailed(mgr, ids, str(tmp_path / "out.zip"), as_zip=True, workers=2, chunk_size=2,
+                          progress=seen.append)
+    with zipfile.ZipFile(out) as zf:
+        names = sorted(zf.namelist())
+        assert names == sorted(f"invoice_{i}.pdf" for i in ids)
+        assert zf.read(names[0]).startswith(b"%PDF")
+    assert sorted(seen) == seen and seen[-1] == 5
+
+
+def test_detailed_pdf_and_cancel(tmp_path):
+    from ggs_accounting.printing.print_receipts import render_detailed
+    from ggs_accounting.utils import ExportCancelled
+    mgr = create_manager(tmp_path)
+    ids = create_sales(mgr, 3)
+    out = render_detailed(mgr, ids, str(tmp_path / "out.pdf"))
+    assert open(out, "rb").read(4) == b"%PDF"
+
+    def cancel(done):
+        raise ExportCancelled()
+
+    with pytest.raises(ExportCancelled):
+        render_detailed(mgr, ids, str(tmp_path / "never.pdf"), as_zip=True, workers=1, chunk_size=1, progress=cancel)
+    assert not any(p.name.startswith((".never", "never")) for p in tmp_path.iterdir())
+
+
+def test_streaming_summary_pages_and_totals(tmp_path, monkeypatch):
+    import re
+    from ggs_accounting.printing import print_receipts
+    mgr = create_manager(tmp_path)
+    ids = create_sales(mgr, 7)
+    rows = list(print_receipts.iter_summary_rows(mgr, "2024-01-01", "2024-01-31", fetch_size=2))
+    assert [r[1] for r in rows] == ids and rows[0][2] == "Cust"
+    pages = []
+    original = print_receipts._summary_page
+
+    def spy(chunk, page_total, running_total):
+        pages.append((len(chunk), page_total, running_total))
+        return original(chunk, page_total, running_total)
+
+    monkeypatch.setattr(print_receipts, "_summary_page", spy)
+    out = tmp_path / "summary.pdf"
+    seen = []
+    count = print_receipts.write_summary_pdf(str(out), iter(rows), rows_per_page=3, progress=seen.append)
+    assert count == 7 and seen == [3, 6, 7]
+    # Totals are 10..16 per invoice
+    assert pages == [(3, 33.0, 33.0), (3, 42.0, 75.0), (1, 16.0, 91.0)]
+    assert len(re.findall(rb"/Type /Page\b", out.read_bytes())) == 3
+
+
+def test_streaming_summary_empty(tmp_path):
+    from ggs_accounting.printing.print_receipts import write_summary_pdf
+    out = tmp_path / "empty.pdf"
+    assert write_summary_pdf(str(out), []) == 0
+    assert out.read_bytes().startswith(b"%PDF")
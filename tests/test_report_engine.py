@@ -0,0 +1,78 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports import engine
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    apple = mgr.add_item("Apple", "APL", 10.0, 100, customer_id=grower)
+    pear = mgr.add_item("Pear", "PER", 5.0, 100, customer_id=grower)
+    line = {"customer_id": buyer, "source_id": grower}
+    mgr.create_invoice("2024-01-01", "Sale", buyer, [
+        {**line, "item_id": apple, "quantity": 2, "price": 10.0},
+        {**line, "item_id": pear, "quantity": 1, "price": 5.5},
+    ])
+    mgr.create_invoice("2024-02-03", "Sale", buyer, [{**line, "item_id": apple, "quantity": 3, "price": 12.0}])
+    mgr.create_invoice("2024-01-05", "Purchase", grower, [{"item_id": pear, "customer_id": grower, "quantity": 10, "price": 4.0}])
+    return grower, buyer
+
+
+def test_load_invoice_lines_compact_dtypes(tmp_path):
+    mgr = create_manager(tmp_path)
+    populate(mgr)
+    df = engine.load_invoice_lines(mgr, chunksize=2)
+    assert len(df) == 4
+    assert df["item_id"].dtype == "int32"
+    assert df["amount"].dtype == "int64"
+    assert isinstance(df["party"].dtype, pd.CategoricalDtype)
+    assert set(df["item"]) == {"Apple", "Pear"}
+
+
+def test_registers(tmp_path):
+    mgr = create_manager(tmp_path)
+    populate(mgr)
+    df = engine.load_invoice_lines(mgr)
+    sales = engine.sales_register(df)
+    assert list(sales["amount"]) == [25.5, 36.0]
+    assert list(sales["lines"]) == [2, 1]
+    purchases = engine.purchase_register(df)
+    assert purchases["amount"].tolist() == [40.0]
+    monthly = engine.register_by_period(df, "Sale", "month")
+    assert monthly["amount"].tolist() == [25.5, 36.0]
+
+
+def test_pivots(tmp_path):
+    mgr = create_manager(tmp_path)
+    populate(mgr)
+    df = engine.load_invoice_lines(mgr)
+    items = engine.item_pivot(df, period="month")
+    assert items.loc["Apple"].tolist() == [20.0, 36.0]
+    assert items.loc["Pear"].tolist() == [5.5, 0.0]
+    parties = engine.party_pivot(df, period="day", value="quantity")
+    assert parties.loc["Buyer"].sum() == pytest.approx(6.0)
+    with pytest.raises(ValueError):
+        engine.item_pivot(df, period="year")
+
+
+def test_party_pivot_keeps_parties_sharing_a_name(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer = populate(mgr)
+    namesake = mgr.add_customer("Buyer")
+    apple = mgr.conn.execute("SELECT item_id FROM Items WHERE name='Apple'").fetchone()[0]
+    mgr.create_invoice("2024-01-09", "Sale", namesake, [
+        {"customer_id": namesake, "source_id": grower, "item_id": apple, "quantity": 1, "price": 7.0},
+    ])
+    df = engine.load_invoice_lines(mgr)
+    parties = engine.party_pivot(df, period="month")
+    assert list(parties.index) == ["Buyer", "Buyer"]
+    assert parties.sum(axis=1).tolist() == [61.5, 7.0]
@@ -61,3 +61,23 @@ def test_inventory_value_multiple_prices(tmp_path):
     values = sorted((d["price"], d["stock"]) for d in data if d["item_id"] == item)
     assert values == [(2.0, 5), (3.0, 10)]
     assert total == pytest.approx(5 * 2.0 + 10 * 3.0)
+
+
+def test_inventory_value_stream_filters_in_sql(tmp_path):
+    mgr = create_manager(tmp_path)
+    c1 = mgr.add_customer("G1", customer_type="Grower")
+    c2 = mgr.add_customer("G2", customer_type="Grower")
+    apple = mgr.add_item("Apple", "APL", 2.0, 5, customer_id=c1)
+    mgr.add_item("Banana", "BAN", 3.0, 4, customer_id=c2)
+    rows = list(reporting.iter_inventory_values(mgr, item_id=apple))
+    assert [(r["name"], r["value"]) for r in rows] == [("Apple", 10.0)]
+
+
+def test_stream_raw_query(tmp_path):
+    mgr = create_manager(tmp_path)
+    mgr.add_customer("Cust")
+    cols, cur = mgr.stream_raw_query("SELECT name FROM Customers")
+    assert cols == ["name"]
+    assert [r[0] for r in cur] == ["Cust"]
+    with pytest.raises(ValueError):
+        mgr.stream_raw_query("UPDATE Customers SET name = 'x'")
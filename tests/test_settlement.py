@@ -0,0 +1,87 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.reports.settlement import compute_settlements, settlement_lines
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    g1 = mgr.add_customer("G1", customer_type="Grower")
+    g2 = mgr.add_customer("G2", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    apple = mgr.add_item("Apple", "APL", 1.0, 100, customer_id=g1)
+    pear = mgr.add_item("Pear", "PER", 1.0, 100, customer_id=g2)
+    mgr.create_invoice("2024-03-02", "Sale", buyer, [
+        {"item_id": apple, "customer_id": buyer, "source_id": g1, "quantity": 10, "price": 20.0},
+        {"item_id": pear, "customer_id": buyer, "source_id": g2, "quantity": 5, "price": 8.0},
+        {"item_id": apple, "customer_id": buyer, "source_id": g1, "quantity": 10, "price": 10.0},
+    ])
+    mgr.create_invoice("2024-04-02", "Sale", buyer, [
+        {"item_id": apple, "customer_id": buyer, "source_id": g1, "quantity": 1, "price": 99.0},
+    ])
+    return g1, g2
+
+
+def test_settlement_per_grower(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2 = populate(mgr)
+    df = compute_settlements(mgr, "2024-03-01", "2024-03-31", commission_rate=10, charge_per_unit=0.5)
+    rows = {r["grower_id"]: r for r in df.to_dict("records")}
+    assert rows[g1]["gross"] == pytest.approx(300.0)
+    assert rows[g1]["commission"] == pytest.approx(30.0)
+    assert rows[g1]["charges"] == pytest.approx(10.0)
+    assert rows[g1]["net_payable"] == pytest.approx(260.0)
+    assert rows[g2]["net_payable"] == pytest.approx(40.0 - 4.0 - 2.5)
+
+
+def test_settlement_uses_settings(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, _ = populate(mgr)
+    mgr.set_setting("commission_rate", "5")
+    df = compute_settlements(mgr, "2024-03-01", "2024-03-31")
+    assert df.set_index("grower_id").loc[g1, "commission"] == pytest.approx(15.0)
+
+
+def test_settlement_lines_rate(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, _ = populate(mgr)
+    lines = settlement_lines(mgr, "2024-03-01", "2024-03-31")
+    apple = lines[(lines["grower_id"] == g1) & (lines["item"] == "Apple")].iloc[0]
+    assert apple["quantity"] == 20
+    assert apple["rate"] == pytest.approx(15.0)
+
+
+def test_write_settlement_pdfs(tmp_path):
+    pytest.importorskip("reportlab")
+    from ggs_accounting.printing.print_settlements import write_settlement_pdfs
+
+    mgr = create_manager(tmp_path)
+    populate(mgr)
+    paths = write_settlement_pdfs(mgr, "2024-03-01", "2024-03-31", tmp_path / "out")
+    assert len(paths) == 2
+    assert all(p.exists() and p.stat().st_size > 0 for p in paths)
+
+
+def test_settlements_job_reports_progress(tmp_path):
+    pytest.importorskip("reportlab")
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    from ggs_accounting.ui.receipt_console import SettlementsJob
+
+    mgr = create_manager(tmp_path)
+    populate(mgr)
+    outcome = []
+    job = SettlementsJob(mgr, tmp_path / "out", "2024-03-01", "2024-03-31")
+    job.succeeded.connect(lambda path, count: outcome.append(count))
+    job.progressed.connect(lambda count: outcome.append(f"progress {count}"))
+    job.run()
+    assert outcome == ["progress 1", "progress 2", 2]
+    assert len(list((tmp_path / "out").glob("settlement_*.pdf"))) == 2
@@ -0,0 +1,77 @@
+import csv
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing.print_statements import write_statements
+from ggs_accounting.reports.statements import iter_statements
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def create_activity(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item_id = mgr.add_item("Apple", "APL", 10.0, 1000, customer_id=grower)
+    buyer = mgr.add_customer("Buyer")
+    idle = mgr.add_customer("Idle")
+
+    def sale(day, customer, price):
+        mgr.create_invoice(
+            day, "Sale", customer,
+            [{"item_id": item_id, "customer_id": grower, "quantity": 1, "price": price}],
+            is_credit=True,
+        )
+
+    sale("2024-03-20", buyer, 100.0)
+    sale("2024-04-05", buyer, 50.0)
+    mgr.record_payment(buyer, 120.0, "2024-04-10")
+    sale("2024-07-01", buyer, 999.0)
+    sale("2024-01-01", idle, 0.0)
+    return buyer, idle
+
+
+def test_statement_opening_lines_and_closing(tmp_path):
+    mgr = create_manager(tmp_path)
+    buyer, idle = create_activity(mgr)
+    statements = list(iter_statements(mgr, "2024-04-01", "2024-06-30"))
+    assert [st["customer_id"] for st in statements] == [buyer]
+    st = statements[0]
+    assert st["opening"] == 100.0
+    assert [(line["debit"], line["credit"], line["balance"]) for line in st["lines"]] == [
+        (50.0, 0.0, 150.0),
+        (0.0, 120.0, 30.0),
+    ]
+    assert st["closing"] == 30.0
+
+
+def test_write_statements_with_index(tmp_path):
+    mgr = create_manager(tmp_path)
+    buyer, _idle = create_activity(mgr)
+    seen = []
+    index = write_statements(mgr, "2024-04-01", "2024-06-30", tmp_path / "out", progress=seen.append)
+    with open(index, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [int(r["customer_id"]) for r in rows] == [buyer]
+    assert float(rows[0]["closing"]) == 30.0
+    assert (tmp_path / "out" / rows[0]["file"]).read_bytes().startswith(b"%PDF")
+    assert seen == [1]
+
+
+def test_write_statements_in_worker_processes(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    item_id = mgr.add_item("Apple", "APL", 10.0, 1000, customer_id=grower)
+    buyers = [mgr.add_customer(f"Buyer {n}") for n in range(5)]
+    for buyer in buyers:
+        mgr.create_invoice(
+            "2024-04-02", "Sale", buyer,
+            [{"item_id": item_id, "customer_id": grower, "quantity": 1, "price": 10.0}],
+            is_credit=True,
+        )
+    index = write_statements(mgr, "2024-04-01", "2024-06-30", tmp_path / "out", workers=2, batch_size=2)
+    with open(index, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [int(r["customer_id"]) for r in rows] == buyers
+    assert len(list((tmp_path / "out").glob("*.pdf"))) == 5
@@ -0,0 +1,97 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.invoice_logic import InvoiceLogic
+from ggs_accounting.models.stock import StockIndex
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    buyer = mgr.add_customer("Buyer")
+    item = mgr.add_item("Apple", "APL", 10.0, 5, customer_id=grower)
+    # A second price row for the same pair
+    mgr.update_item_stock(item, grower, 12.0, 3)
+    return grower, buyer, item
+
+
+def sale_line(item, buyer, grower, qty):
+    return {"item_id": item, "customer_id": buyer, "source_id": grower, "quantity": qty, "price": 15.0}
+
+
+def test_index_sums_price_rows(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    index = StockIndex(mgr)
+    assert index.available(item, grower) == 8.0
+    assert index.available(item, buyer) == 0.0
+    assert index.shortfalls([(item, grower, 10.0, -9.0)]) == [(item, grower, 9.0, 8.0)]
+    # Lines for the same pair are checked together
+    assert index.shortfalls([(item, grower, 10.0, -5.0), (item, grower, 10.0, -4.0)])
+
+
+def test_sale_updates_index_and_rejects_oversell(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    logic = InvoiceLogic(mgr)
+    logic.create_invoice("Sale", buyer, [sale_line(item, buyer, grower, 6)], date="2024-01-02")
+    assert logic.stock.available(item, grower) == 2.0
+    with pytest.raises(ValueError, match="Apple from Grower"):
+        logic.create_invoice("Sale", buyer, [sale_line(item, buyer, grower, 3)], date="2024-01-03")
+    assert len(mgr.get_invoices()) == 1
+    logic.create_invoice(
+        "Purchase", grower,
+        [{"item_id": item, "customer_id": grower, "quantity": 4, "price": 10.0}],
+        date="2024-01-04",
+    )
+    assert logic.stock.available(item, grower) == 6.0
+
+
+def test_stale_index_caught_in_transaction(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    logic = InvoiceLogic(mgr)
+    assert logic.stock.available(item, grower) == 8.0
+    # Stock consumed behind the index's back
+    mgr.update_item_stock(item, grower, 10.0, -5)
+    with pytest.raises(ValueError):
+        logic.create_invoice("Sale", buyer, [sale_line(item, buyer, grower, 4)], date="2024-01-02")
+    assert mgr.get_invoices() == []
+    total = mgr.conn.execute("SELECT SUM(stock_qty) FROM Inventory").fetchone()[0]
+    assert total == 3.0
+    # The failed save drops the stale quantities
+    assert logic.stock.available(item, grower) == 3.0
+
+
+def test_index_showing_too_little_is_reloaded(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    logic = InvoiceLogic(mgr)
+    assert logic.stock.available(item, grower) == 8.0
+    # Stock received behind the index's back
+    mgr.update_item_stock(item, grower, 10.0, 5)
+    logic.create_invoice("Sale", buyer, [sale_line(item, buyer, grower, 10)], date="2024-01-02")
+    assert logic.stock.available(item, grower) == 3.0
+
+
+def test_sale_spreads_across_lots(tmp_path):
+    mgr = create_manager(tmp_path)
+    grower, buyer, item = populate(mgr)
+    mgr.conn.execute("UPDATE Inventory SET stock_qty = 10 WHERE price_excl_tax = 10")
+    mgr.conn.execute("UPDATE Inventory SET stock_qty = 2 WHERE price_excl_tax = 12")
+    mgr.conn.commit()
+    logic = InvoiceLogic(mgr)
+    # Two lines of the same pair see each other's takes
+    inv_id = logic.create_invoice(
+        "Sale", buyer, [sale_line(item, buyer, grower, 1), sale_line(item, buyer, grower, 4)], date="2024-01-02"
+    )
+    lots = mgr.conn.execute("SELECT price_excl_tax, stock_qty FROM Inventory ORDER BY inventory_id").fetchall()
+    assert [tuple(r) for r in lots] == [(10.0, 7.0), (12.0, 0.0)]
+    costs = mgr.conn.execute("SELECT unit_cost FROM InvoiceItems WHERE inv_id=? ORDER BY id", (inv_id,))
+    assert [r[0] for r in costs] == [12.0, pytest.approx((12.0 + 3 * 10.0) / 4)]
+    assert logic.stock.available(item, grower) == 7.0
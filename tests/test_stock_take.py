@@ -0,0 +1,101 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.models.stock_take import (
+    compute_variances,
+    post_variances,
+    read_count_sheet,
+    variance_report,
+)
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def populate(mgr):
+    g1 = mgr.add_customer("Grower A", customer_type="Grower")
+    g2 = mgr.add_customer("Grower B", customer_type="Grower")
+    apple = mgr.add_item("Apple", "APL", 10.0, 5, customer_id=g1)
+    mgr.update_item_stock(apple, g1, 12.0, 3)
+    pear = mgr.add_item("Pear", "PER", 8.0, 4, customer_id=g2)
+    return g1, g2, apple, pear
+
+
+def write_sheet(tmp_path, text):
+    path = tmp_path / "counts.csv"
+    path.write_text(text)
+    return path
+
+
+def stock(mgr, item, grower):
+    return mgr.conn.execute(
+        "SELECT SUM(stock_qty) FROM Inventory WHERE item_id=? AND customer_id=?", (item, grower)
+    ).fetchone()[0]
+
+
+def test_variances_and_statuses(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    sheet = write_sheet(
+        tmp_path,
+        "Item_Code,Grower,Counted,Notes\n"
+        "APL,Grower A,6,shelf 1\n"
+        "PER,Grower B,4,\n"
+        "XXX,Grower A,1,\n"
+        "PER,Nobody,1,\n"
+        "APL,Grower A,2,\n"
+        "PER,Grower A,abc,\n"
+        "APL,Grower B,2,\n",
+    )
+    rows = compute_variances(mgr, read_count_sheet(sheet))
+    assert [r["status"] for r in rows] == [
+        "OK", "OK", "Unknown item", "Unknown grower", "Duplicate of line 1", "Bad count", "OK",
+    ]
+    first = rows[0]
+    assert (first["system_qty"], first["variance"], first["price"], first["value"]) == (8.0, -2.0, 12.0, -24.0)
+    assert rows[1]["variance"] == 0
+    # No stock yet for Apple from Grower B
+    assert rows[6]["system_qty"] == 0 and rows[6]["variance"] == 2.0
+    assert rows[6]["price"] == 12.0
+    report = variance_report(rows)
+    assert list(report["status"])[:2] == ["OK", "OK"]
+
+
+def test_post_sets_counts_and_audits(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    sheet = write_sheet(tmp_path, "item_code,grower,counted\nAPL,Grower A,6\nPER,Grower B,4\nAPL,Grower B,2\n")
+    rows = compute_variances(mgr, read_count_sheet(sheet))
+    # Stock moves between review and posting; the count still wins
+    mgr.update_item_stock(apple, g1, 12.0, -1)
+    assert post_variances(mgr, rows, "2024-03-31", "March count") == 2
+    assert stock(mgr, apple, g1) == 6.0
+    assert stock(mgr, apple, g2) == 2.0
+    audit = mgr.get_stock_adjustments("2024-03-01", "2024-03-31")
+    assert [(a["item_name"], a["customer_name"], a["system_qty"], a["adjustment"]) for a in audit] == [
+        ("Apple", "Grower A", 7.0, -1.0),
+        ("Apple", "Grower B", 0.0, 2.0),
+    ]
+    assert audit[0]["price_excl_tax"] == 12.0 and audit[0]["reference"] == "March count"
+
+
+def test_loss_larger_than_newest_lot_spills_to_older(tmp_path):
+    mgr = create_manager(tmp_path)
+    g1, g2, apple, pear = populate(mgr)
+    # Lots of 5 at 10.0 and 3 at 12.0; counting 2 loses 6
+    sheet = write_sheet(tmp_path, "item_code,grower,counted\nAPL,Grower A,2\n")
+    post_variances(mgr, compute_variances(mgr, read_count_sheet(sheet)), "2024-03-31")
+    lots = mgr.conn.execute(
+        "SELECT price_excl_tax, stock_qty FROM Inventory WHERE item_id=? AND customer_id=? ORDER BY price_excl_tax",
+        (apple, g1),
+    ).fetchall()
+    assert [tuple(lot) for lot in lots] == [(10.0, 2.0), (12.0, 0.0)]
+
+
+def test_missing_columns(tmp_path):
+    sheet = write_sheet(tmp_path, "code,qty\nAPL,1\n")
+    with pytest.raises(ValueError, match="item_code"):
+        read_count_sheet(sheet)
@@ -0,0 +1,190 @@
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6.QtCore import Qt
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.ui.table_model import (
+    Column,
+    IndexedRowsModel,
+    PagedQueryModel,
+    RowsModel,
+    TableModel,
+    filter_proxy,
+)
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def ensure_app():
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    return QtWidgets.QApplication.instance()
+
+
+def add_customers(mgr, names):
+    mgr.conn.executemany("INSERT INTO Customers (name, customer_type) VALUES (?, 'Buyer')", [(n,) for n in names])
+    mgr.conn.commit()
+
+
+def test_query_pages_search_and_totals(tmp_path):
+    mgr = create_manager(tmp_path)
+    add_customers(mgr, ["Apple 100%", "Apple 100 Co", "Banana"])
+    sql = "SELECT customer_id, name FROM Customers;"
+    count, totals = mgr.summarize_query(sql, search="100%", search_columns=["name"], totals=["customer_id"])
+    assert (count, totals) == (1, {"customer_id": 1.0})
+    page = mgr.fetch_query_page(sql, order_by="name", descending=True, limit=2, offset=1)
+    assert [r["name"] for r in page] == ["Apple 100%", "Apple 100 Co"]
+    with pytest.raises(ValueError):
+        mgr.fetch_query_page("DELETE FROM Customers")
+
+
+def test_paged_model_reads_only_visited_pages(tmp_path, monkeypatch):
+    ensure_app()
+    mgr = create_manager(tmp_path)
+    add_customers(mgr, [f"Party {n:04d}" for n in range(1000)])
+    fetched = []
+    real = mgr.fetch_query_page
+
+    def spy(*args, **kwargs):
+        fetched.append(kwargs["offset"])
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(mgr, "fetch_query_page", spy)
+    model = PagedQueryModel(mgr, "SELECT customer_id, name FROM Customers", [Column("Name", "name")], page_size=100)
+    model.refresh()
+    assert model.rowCount() == 1000 and fetched == []
+    assert model.index(950, 0).data() == "Party 0950"
+    assert fetched == [900]
+
+    model.sort(0, Qt.SortOrder.DescendingOrder)
+    assert model.index(0, 0).data() == "Party 0999"
+    model.set_search("party 00")
+    assert model.rowCount() == 100
+
+
+def test_paged_model_ties_and_nulls_span_pages(tmp_path, monkeypatch):
+    ensure_app()
+    mgr = create_manager(tmp_path)
+    # Ten rows share each sort value, so every page boundary falls inside a tie
+    mgr.conn.executemany(
+        "INSERT INTO Customers (name, customer_type, contact_info) VALUES (?, 'Buyer', ?)",
+        [(f"P{n:02d}", None if n % 5 == 0 else str(n % 3)) for n in range(30)],
+    )
+    mgr.conn.commit()
+    seeks = []
+    real = mgr.fetch_query_page
+
+    def spy(*args, **kwargs):
+        seeks.append(kwargs["after"])
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(mgr, "fetch_query_page", spy)
+    sql = "SELECT customer_id, name, contact_info FROM Customers"
+    columns = [Column("Contact", "contact_info"), Column("Name", "name")]
+    for key in ("customer_id", None):
+        model = PagedQueryModel(mgr, sql, columns, key=key, page_size=4)
+        for order in (Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder):
+            model.sort(0, order)
+            names = [model.index(r, 1).data() for r in range(model.rowCount())]
+            assert sorted(names) == [f"P{n:02d}" for n in range(30)]
+    assert any(after is not None and after[0] is None for after in seeks)
+
+
+def test_rows_model_sorts_numbers_and_filters():
+    ensure_app()
+    model = RowsModel(
+        [Column("Name", "name"), Column("Amount", "amount", "₹{:.2f}")],
+        [{"name": "b", "amount": 10.0}, {"name": "a", "amount": 9.5}, {"name": "c", "amount": 100.0}],
+    )
+    proxy = filter_proxy(model)
+    proxy.sort(1, Qt.SortOrder.AscendingOrder)
+    assert [proxy.index(r, 1).data() for r in range(3)] == ["₹9.50", "₹10.00", "₹100.00"]
+    proxy.setFilterFixedString("C")
+    assert proxy.rowCount() == 1 and proxy.index(0, 0).data() == "c"
+
+
+def test_payment_panel_pages_and_totals(tmp_path):
+    ensure_app()
+    from ggs_accounting.ui.payment_panel import PaymentPanel
+
+    mgr = create_manager(tmp_path)
+    ram = mgr.add_customer("Ram")
+    shyam = mgr.add_customer("Shyam")
+    mgr.record_payment(ram, 100.0, "2024-01-01")
+    mgr.record_payment(shyam, 50.0, "2024-01-02")
+    panel = PaymentPanel(mgr)
+    assert panel.model.rowCount() == 2
+    assert panel.model.index(0, 1).data() == "Shyam"  # newest first
+    panel.search_edit.setText("ram")
+    assert panel.model.rowCount() == 1
+    assert panel.total_label.text() == "1 payments, total ₹100.00"
+
+
+def test_report_panels_page_from_sql(tmp_path):
+    ensure_app()
+    from ggs_accounting.ui.reports_inventory import InventoryValuationPanel
+    from ggs_accounting.ui.reports_party_balance import CustomerBalancePanel
+
+    mgr = create_manager(tmp_path)
+    ram = mgr.add_customer("Ram", customer_type="Grower")
+    mgr.add_customer("Shyam")
+    mgr.add_item("Apple", "A1", 10.0, 5.0, ram)
+    mgr.add_item("Pear", "P1", 2.0, 3.0, ram)
+
+    balances = CustomerBalancePanel(mgr)
+    assert isinstance(balances.model, PagedQueryModel)
+    assert balances.model.rowCount() == 2
+    balances.search_edit.setText("shy")
+    assert balances.model.rowCount() == 1 and balances.model.index(0, 0).data() == "Shyam"
+
+    values = InventoryValuationPanel(mgr)
+    assert isinstance(values.model, PagedQueryModel)
+    assert values.model.rowCount() == 2
+    assert values.total_label.text() == "Totals - Stock: 8.00 Price: ₹12.00 Value: ₹56.00"
+    values.item_combo.setCurrentIndex(values.item_combo.findText("Pear"))
+    assert values.model.rowCount() == 1
+    assert values.total_label.text().startswith("Totals - Stock: 3.00")
+
+
+def test_sql_console_with_repeated_column_names(tmp_path):
+    ensure_app()
+    from ggs_accounting.ui.reports_panel import ReportsPanel
+
+    mgr = create_manager(tmp_path)
+    add_customers(mgr, ["Ram"])
+    panel = ReportsPanel(mgr)
+    panel.sql_edit.setPlainText("SELECT name, name FROM Customers")
+    panel._run_query()
+    assert panel.model.rowCount() == 1
+    assert [panel.model.index(0, c).data() for c in range(2)] == ["Ram", "Ram"]
+    panel.table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+    assert panel.model.index(0, 1).data() == "Ram"
+
+
+def test_indexed_model_sorts_and_keeps_search_on_reload():
+    ensure_app()
+    columns = [Column("Name", "name"), Column("Stock", "stock")]
+    rows = [{"name": "Pear", "stock": 3}, {"name": "Apple", "stock": None}, {"name": "Apple", "stock": 1}]
+    model = IndexedRowsModel(columns, "name", rows)
+    model.sort(1, Qt.SortOrder.AscendingOrder)
+    assert [model.row(n)["stock"] for n in range(3)] == [None, 1, 3]
+    model.set_search("APP")
+    assert model.rowCount() == 2 and model.total == 3
+    model.set_rows(rows + [{"name": "Crab apple", "stock": 0}])
+    assert [model.row(n)["stock"] for n in range(model.rowCount())] == [None, 0, 1]
+
+
+def test_model_without_row_cannot_be_created():
+    ensure_app()
+
+    class Incomplete(TableModel):
+        def rowCount(self, parent=None):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete([Column("Name", "name")])
@@ -0,0 +1,96 @@
+import pytest
+
+from ggs_accounting.db.db_manager import DatabaseManager
+from ggs_accounting.printing.thermal import (
+    FEED_CUT,
+    INIT,
+    PAPER_COLUMNS,
+    ThermalPrinter,
+    fetch_slip,
+    slip_template,
+)
+
+
+def create_manager(tmp_path):
+    mgr = DatabaseManager(tmp_path / "test.sqlite")
+    mgr.init_db()
+    return mgr
+
+
+def create_sale(mgr):
+    grower = mgr.add_customer("Grower", customer_type="Grower")
+    apple = mgr.add_item("Apple", "APL", 10.0, 100, customer_id=grower)
+    long_name = mgr.add_item("Kinnaur Royal Delicious Apples Grade A", "KRD", 10.0, 100, customer_id=grower)
+    buyer = mgr.add_customer("Ramesh Traders")
+    return mgr.create_invoice(
+        "2024-01-01", "Sale", buyer,
+        [
+            {"item_id": apple, "customer_id": grower, "quantity": 2, "price": 12.5},
+            {"item_id": long_name, "customer_id": grower, "quantity": 1, "price": 40.0},
+        ],
+        is_credit=True,
+        amount_paid=20.0,
+    )
+
+
+@pytest.mark.parametrize("paper_mm", sorted(PAPER_COLUMNS))
+def test_text_fits_paper(tmp_path, paper_mm):
+    mgr = create_manager(tmp_path)
+    mgr.set_setting("company_name", "GGS Fruit Co")
+    header, lines = fetch_slip(mgr, create_sale(mgr))
+    text = slip_template(paper_mm).text(header, lines, {"company_name": "GGS Fruit Co"})
+    rows = text.splitlines()
+    assert max(len(r) for r in rows) <= PAPER_COLUMNS[paper_mm]
+    assert "Ramesh Traders" in rows
+    assert rows[-3].startswith("TOTAL") and rows[-3].endswith("65.00")
+    assert rows[-1].startswith("Due") and rows[-1].endswith("45.00")
+
+
+def test_unknown_paper_width():
+    with pytest.raises(ValueError):
+        slip_template(72)
+
+
+def test_print_to_device_file_and_spool(tmp_path):
+    mgr = create_manager(tmp_path)
+    inv_id = create_sale(mgr)
+    device = tmp_path / "lp0"
+    printer = ThermalPrinter(mgr, target=device, paper_mm=58)
+    printer.print_invoice(inv_id)
+    printer.print_invoice(inv_id)
+    data = device.read_bytes()
+    assert data.startswith(INIT) and data.endswith(FEED_CUT)
+    assert data.count(INIT) == 2
+
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    mgr.set_setting("thermal_printer", str(spool))
+    path = ThermalPrinter(mgr).print_invoice(inv_id)
+    assert [p.name for p in spool.iterdir()] == [path.rsplit("/", 1)[-1]]
+
+
+def test_unconfigured_printer(tmp_path):
+    mgr = create_manager(tmp_path)
+    with pytest.raises(RuntimeError):
+        ThermalPrinter(mgr).print_invoice(1)
+
+
+def test_slip_choice_survives_tab_switch(tmp_path):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    if QtWidgets.QApplication.instance() is None:
+        QtWidgets.QApplication([])
+    from ggs_accounting.ui.invoice_panel import InvoicePanel
+
+    mgr = create_manager(tmp_path)
+    mgr.set_setting("thermal_printer", str(tmp_path / "lp0"))
+    panel = InvoicePanel(mgr)
+    panel.show()
+    assert panel.slip_check.isEnabled() and panel.slip_check.isChecked()
+    panel.slip_check.setChecked(False)
+    panel.hide()
+    panel.show()
+    assert not panel.slip_check.isChecked()
+    mgr.set_setting("thermal_printer", "")
+    panel.hide()
+    panel.show()
+    assert not panel.slip_check.isEnabled() and not panel.slip_check.isChecked()